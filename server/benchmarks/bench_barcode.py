@@ -0,0 +1,77 @@
+"""Benchmark do codigo de barras: PNG via python-barcode/Pillow contra barras vetoriais desenhadas no FPDF.
+
+Uso: python server/benchmarks/bench_barcode.py [--receipts 200]
+"""
+import argparse
+import json
+import logging
+import os
+import sys
+import tempfile
+import time
+
+from fpdf import FPDF
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from server.src.services.generate_pdf import code128_modules, generate_barcode
+from server.src.services.receipt_template import PAGE_WIDTH, draw_code128
+from server.src.utils.utils import ean13_check_digit
+
+BARCODE_WIDTH = 50
+BARCODE_HEIGHT = 15
+
+def barcodes(n: int) -> list[str]:
+    codes = []
+    for sequence in range(n):
+        digits = f"200{sequence:09d}"
+        codes.append(digits + ean13_check_digit(digits))
+    return codes
+
+def new_page() -> FPDF:
+    pdf = FPDF(unit='mm', format=(PAGE_WIDTH, 40))
+    pdf.add_page()
+    return pdf
+
+def raster_receipt(code: str, work_dir: str) -> bytes:
+    barcode_path = generate_barcode(code, work_dir)
+    pdf = new_page()
+    pdf.image(barcode_path, x=15, y=10, w=BARCODE_WIDTH, h=BARCODE_HEIGHT)
+    return bytes(pdf.output())
+
+def vector_receipt(code: str) -> bytes:
+    pdf = new_page()
+    draw_code128(pdf, code128_modules(code), 15, 10, BARCODE_WIDTH, BARCODE_HEIGHT)
+    return bytes(pdf.output())
+
+def measure(render, codes: list[str]) -> dict:
+    sizes = []
+    t0 = time.perf_counter()
+    for code in codes:
+        sizes.append(len(render(code)))
+    elapsed = time.perf_counter() - t0
+    return {
+        "ms_per_receipt": round(elapsed / len(codes) * 1000, 3),
+        "avg_pdf_bytes": round(sum(sizes) / len(sizes))
+    }
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--receipts', type=int, default=200)
+    args = parser.parse_args()
+    logging.disable(logging.INFO)
+
+    codes = barcodes(args.receipts)
+    with tempfile.TemporaryDirectory() as work_dir:
+        raster = measure(lambda code: raster_receipt(code, work_dir), codes)
+    vector = measure(vector_receipt, codes)
+
+    print(json.dumps({
+        "receipts": args.receipts,
+        "raster_png": raster,
+        "vector_fpdf": vector,
+        "speedup": round(raster["ms_per_receipt"] / vector["ms_per_receipt"], 1)
+    }, indent=2))
+
+if __name__ == '__main__':
+    main()
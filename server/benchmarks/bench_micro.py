@@ -0,0 +1,86 @@
+"""Microbenchmarks das funcoes quentes do backend: comprovante HTML/PDF, codigo de barras, ids,
+chaves de API, senha e hash de usuario.
+
+Uso: python server/benchmarks/bench_micro.py [--repeat 5] [--output resultado.json]
+"""
+import argparse
+import json
+import logging
+import os
+import subprocess
+import sys
+import tempfile
+import timeit
+
+ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, ROOT)
+os.environ.setdefault('FAKE_FIRESTORE', 'true')
+os.environ.setdefault('BARCODE_SHARD', '0')
+
+def git_commit() -> str | None:
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True, check=True, cwd=ROOT
+        ).stdout.strip()
+    except Exception:
+        return None
+
+def measure(fn, repeat: int) -> dict:
+    timer = timeit.Timer(fn)
+    number, _ = timer.autorange()
+    runs = sorted(t / number for t in timer.repeat(repeat=repeat, number=number))
+    return {
+        "calls_per_run": number,
+        "us_median": round(runs[len(runs) // 2] * 1e6, 2),
+        "us_min": round(runs[0] * 1e6, 2)
+    }
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--output')
+    args = parser.parse_args()
+    logging.disable(logging.INFO)
+
+    from server.benchmarks.bench_pdf_profiles import sample_receipt
+    from server.src.models.user_model import User
+    from server.src.services import key_service
+    from server.src.services.comprovante_service import format_sales_receipt
+    from server.src.services.generate_pdf import generate_barcode, generate_html, generate_qrcode
+    from server.src.services.register_service import validate_password
+    from server.src.utils.utils import generate_numeric_id_from_string
+
+    comprovante = sample_receipt(10)
+    api_key = key_service.generate_key()
+    key_service.save_key_to_db(api_key, minutes=60)
+    user = User(id=1, username='bench')
+    user.set_password('Bench@12345')
+
+    results = {}
+    with tempfile.TemporaryDirectory() as work_dir:
+        qrcode_path = generate_qrcode(work_dir) or ""
+        barcode_path = generate_barcode(comprovante.barcode_str, work_dir) or ""
+        html = generate_html(comprovante, "Operador", qrcode_path, barcode_path)
+
+        cases = {
+            "generate_html": lambda: generate_html(comprovante, "Operador", qrcode_path, barcode_path),
+            "format_sales_receipt": lambda: format_sales_receipt(html, work_dir),
+            "generate_barcode": lambda: generate_barcode(comprovante.barcode_str, work_dir),
+            "generate_numeric_id_from_string": lambda: generate_numeric_id_from_string(
+                "Cliente", "", comprovante.transaction_id
+            ),
+            "validate_key": lambda: key_service.validate_key(api_key),
+            "validate_password": lambda: validate_password('Bench@12345'),
+            "User.check_password": lambda: user.check_password('Bench@12345')
+        }
+        for name, fn in cases.items():
+            results[name] = measure(fn, args.repeat)
+
+    report = {"commit": git_commit(), "benchmarks": results}
+    print(json.dumps(report, indent=2))
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,80 @@
+"""Tamanho dos comprovantes por perfil de saida: HTML legado com PNGs, template padrao e template compacto.
+
+Uso: python server/benchmarks/bench_pdf_profiles.py [--items 1 10 50]
+"""
+import argparse
+import json
+import logging
+import os
+import sys
+import tempfile
+from decimal import Decimal
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from server.src.models.comprovante_model import Comprovante, MetodoPagamento
+from server.src.services.comprovante_service import format_sales_receipt
+from server.src.services.generate_pdf import generate_barcode, generate_html, generate_qrcode
+from server.src.services.receipt_template import ReceiptTemplate
+
+SAMPLE_BARCODE = '2000000000015'
+
+def sample_receipt(n_items: int) -> Comprovante:
+    items = [
+        {"sweetName": f"Brigadeiro {i}", "quantity": 2, "priceAtSale": 3.5, "subtotal": 7.0,
+         "itemDiscount": 10 if i % 3 == 0 else 0, "discountedAmount": 0.7 if i % 3 == 0 else 0}
+        for i in range(n_items)
+    ]
+    subtotal = Decimal(str(sum(item["subtotal"] for item in items)))
+    discounts = Decimal(str(round(sum(item["discountedAmount"] for item in items), 2)))
+    return Comprovante(
+        qtd=0,
+        value=subtotal - discounts,
+        payment_type=MetodoPagamento.PIX,
+        payer={"nome": "Cliente"},
+        receiver={"nome": "Sweet Home"},
+        barcode_str=SAMPLE_BARCODE,
+        items=items,
+        subtotal=subtotal,
+        itemDiscountsTotal=discounts,
+        globalDiscountPercent=Decimal(0),
+        globalDiscountAmount=Decimal(0),
+        totalAmount=subtotal - discounts
+    )
+
+def legacy_size(comprovante: Comprovante) -> int | None:
+    with tempfile.TemporaryDirectory() as work_dir:
+        qrcode_path = generate_qrcode(work_dir) or ""
+        barcode_path = generate_barcode(comprovante.barcode_str, work_dir) or ""
+        html = generate_html(comprovante, "Operador", qrcode_path, barcode_path)
+        pdf_path = format_sales_receipt(html, work_dir)
+        return os.path.getsize(pdf_path) if pdf_path else None
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--items', type=int, nargs='+', default=[1, 10, 50])
+    args = parser.parse_args()
+    logging.disable(logging.INFO)
+
+    standard = ReceiptTemplate(compact=False)
+    compact = ReceiptTemplate(compact=True)
+
+    results = []
+    for n_items in args.items:
+        comprovante = sample_receipt(n_items)
+        standard_bytes = len(standard.render(comprovante, "Operador"))
+        compact_bytes = len(compact.render(comprovante, "Operador"))
+        legacy_bytes = legacy_size(comprovante)
+        results.append({
+            "items": n_items,
+            "legacy_html_png_bytes": legacy_bytes,
+            "standard_bytes": standard_bytes,
+            "compact_bytes": compact_bytes,
+            "saved_vs_standard": standard_bytes - compact_bytes,
+            "saved_vs_legacy": legacy_bytes - compact_bytes if legacy_bytes else None
+        })
+
+    print(json.dumps(results, indent=2))
+
+if __name__ == '__main__':
+    main()
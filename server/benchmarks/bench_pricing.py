@@ -0,0 +1,93 @@
+"""Microbenchmark do calculo de totais em Decimal para carrinhos grandes.
+
+Uso: python server/benchmarks/bench_pricing.py [--items 100 1000 10000] [--repeat 20]
+"""
+import argparse
+import json
+import logging
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from server.src.models.comprovante_model import Comprovante, MetodoPagamento
+from server.src.services.pricing import price_sale, mismatched_totals
+
+def synthetic_cart(n_items: int, seed: int = 42) -> tuple[list[dict], dict]:
+    rng = random.Random(seed)
+    items = []
+    for i in range(n_items):
+        quantity = rng.randint(1, 12)
+        price = rng.choice((2.5, 3.0, 4.75, 6.9, 12.0))
+        discount = rng.choice((0, 0, 0, 5, 10))
+        items.append({
+            "sweetId": f"sweet_{i % 200}",
+            "sweetName": f"Doce {i % 200}",
+            "quantity": quantity,
+            "priceAtSale": price,
+            "subtotal": price * quantity,
+            "itemDiscount": discount,
+            "discountedAmount": price * quantity * discount / 100,
+            "cost": price * 0.4,
+            "costTotal": price * 0.4 * quantity
+        })
+    subtotal = sum(item["subtotal"] for item in items)
+    item_discounts = sum(item["discountedAmount"] for item in items)
+    global_discount = (subtotal - item_discounts) * 0.05
+    totals = {
+        "subtotal": subtotal,
+        "itemDiscountsTotal": item_discounts,
+        "globalDiscountPercent": 5,
+        "globalDiscountAmount": global_discount,
+        "totalAmount": subtotal - item_discounts - global_discount
+    }
+    return items, totals
+
+def price_and_build(items: list[dict], totals: dict) -> Comprovante:
+    priced = price_sale(items, totals["globalDiscountPercent"])
+    if mismatched_totals(priced, totals):
+        raise RuntimeError('Totais sinteticos divergentes')
+    return Comprovante(
+        qtd=priced.qtd,
+        value=priced.totalAmount,
+        payment_type=MetodoPagamento.PIX,
+        payer={"nome": "Cliente"},
+        receiver={"nome": "Sweet Home"},
+        items=priced.items,
+        subtotal=priced.subtotal,
+        itemDiscountsTotal=priced.itemDiscountsTotal,
+        globalDiscountPercent=priced.globalDiscountPercent,
+        globalDiscountAmount=priced.globalDiscountAmount,
+        totalAmount=priced.totalAmount
+    )
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--items', type=int, nargs='+', default=[100, 1000, 10000])
+    parser.add_argument('--repeat', type=int, default=20)
+    args = parser.parse_args()
+    logging.disable(logging.INFO)
+
+    results = []
+    for n_items in args.items:
+        items, totals = synthetic_cart(n_items)
+        price_and_build(items, totals)
+        timings = []
+        for _ in range(args.repeat):
+            t0 = time.perf_counter()
+            price_and_build(items, totals)
+            timings.append(time.perf_counter() - t0)
+        timings.sort()
+        results.append({
+            "items": n_items,
+            "median_ms": round(timings[len(timings) // 2] * 1000, 3),
+            "best_ms": round(timings[0] * 1000, 3),
+            "us_per_item": round(timings[len(timings) // 2] / n_items * 1e6, 3)
+        })
+
+    print(json.dumps(results, indent=2))
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,77 @@
+"""Benchmark da reconstrucao vetorizada de rollups com dados sinteticos.
+
+Uso: python server/benchmarks/bench_rollup_rebuild.py [--lines 1000000] [--days 365] [--sweets 200]
+"""
+import argparse
+import datetime
+import json
+import os
+import random
+import resource
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from server.src.jobs.rebuild_rollups import RollupAggregator, PAGE_SIZE
+
+def synthetic_pages(lines: int, days: int, sweets: int, start: datetime.date, seed: int = 42):
+    rng = random.Random(seed)
+    dates = [(start + datetime.timedelta(days=i)).isoformat() for i in range(days)]
+    produced = 0
+    page = []
+    while produced < lines:
+        n_items = min(rng.randint(1, 5), lines - produced)
+        items = []
+        total = 0.0
+        for _ in range(n_items):
+            sweet = rng.randrange(sweets)
+            quantity = rng.randint(1, 12)
+            price = 2.5 + sweet % 7
+            items.append({"sweetId": f"sweet_{sweet}", "sweetName": f"Doce {sweet}", "quantity": quantity, "priceAtSale": price})
+            total += quantity * price
+        cost = total * 0.4
+        page.append({"date": rng.choice(dates), "items": items, "totalAmount": total, "totalCost": cost, "totalProfit": total - cost})
+        produced += n_items
+        if len(page) == PAGE_SIZE:
+            yield page
+            page = []
+    if page:
+        yield page
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--lines', type=int, default=1_000_000)
+    parser.add_argument('--days', type=int, default=365)
+    parser.add_argument('--sweets', type=int, default=200)
+    args = parser.parse_args()
+
+    start = datetime.date(2025, 1, 1)
+    aggregator = RollupAggregator(start, start + datetime.timedelta(days=args.days - 1))
+
+    aggregate_seconds = 0.0
+    wall_start = time.perf_counter()
+    for page in synthetic_pages(args.lines, args.days, args.sweets, start):
+        t0 = time.perf_counter()
+        aggregator.add_page(page)
+        aggregate_seconds += time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    rollups = sum(1 for _, rollup in aggregator.rollups() if rollup)
+    summary = aggregator.summarize('mes')
+    finalize_seconds = time.perf_counter() - t0
+
+    print(json.dumps({
+        "line_items": args.lines,
+        "days": args.days,
+        "sweets": args.sweets,
+        "aggregate_seconds": round(aggregate_seconds, 3),
+        "finalize_seconds": round(finalize_seconds, 3),
+        "wall_seconds_including_generation": round(time.perf_counter() - wall_start, 3),
+        "daily_rollups": rollups,
+        "periods": len(summary),
+        "max_rss_mb": round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1)
+    }, indent=2))
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,64 @@
+"""Mede o custo de importar server.main (cold start de cada worker) com -X importtime.
+
+Falha quando o tempo acumulado passa do orcamento ou quando uma dependencia pesada, que deveria ser
+importada so no primeiro uso, aparece na importacao do app.
+
+Uso: python server/benchmarks/check_import_time.py [--budget-ms 800] [--output resultado.json]
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, ROOT)
+
+from server.benchmarks.bench_micro import git_commit
+
+TARGET_MODULE = 'server.main'
+LAZY_MODULES = ('fpdf', 'firebase_admin', 'google.cloud.firestore', 'barcode', 'qrcode', 'PIL', 'email_validator')
+
+def import_times(module: str) -> dict[str, int]:
+    """Tempo acumulado em microssegundos de cada modulo importado por `module`."""
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', f'import {module}'],
+        capture_output=True, text=True, cwd=ROOT, check=True
+    )
+    times = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        _, cumulative, name = line[len('import time:'):].split('|')
+        times[name.strip()] = int(cumulative)
+    return times
+
+def main() -> int:
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--budget-ms', type=float, default=float(os.getenv('IMPORT_BUDGET_MS', '800')))
+    parser.add_argument('--runs', type=int, default=3)
+    parser.add_argument('--output')
+    args = parser.parse_args()
+
+    runs = [import_times(TARGET_MODULE) for _ in range(args.runs)]
+    best = min(runs, key=lambda times: times.get(TARGET_MODULE, 0))
+    total_ms = best.get(TARGET_MODULE, 0) / 1000
+    eager = sorted(name for name in LAZY_MODULES if name in best)
+    slowest = sorted(best.items(), key=lambda item: item[1], reverse=True)[1:11]
+
+    report = {
+        "commit": git_commit(),
+        "module": TARGET_MODULE,
+        "import_ms": round(total_ms, 1),
+        "budget_ms": args.budget_ms,
+        "eager_heavy_modules": eager,
+        "slowest_ms": {name: round(us / 1000, 1) for name, us in slowest}
+    }
+    print(json.dumps(report, indent=2))
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+    return 1 if total_ms > args.budget_ms or eager else 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,161 @@
+"""Carga ponta a ponta na API rodando no mesmo processo, contra o Firestore simulado.
+
+Dispara /api/auth/login, /api/keys/validate e /api/sales/finish com N clientes concorrentes e
+mede vazao, latencia p50/p95/p99 por rota e o atraso do event loop. A latencia do backend vem
+do Firestore simulado (FAKE_FIRESTORE_*), entao resultados de commits diferentes sao comparaveis.
+
+Uso: python server/benchmarks/load_test.py [--concurrency 16] [--duration 10] [--latency-ms 20]
+"""
+import argparse
+import asyncio
+import itertools
+import json
+import logging
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from server.benchmarks.bench_micro import git_commit
+
+ENDPOINTS = ('login', 'validate_key', 'finish_sale')
+SWEET_IDS = [f'bench-{i}' for i in range(20)]
+LAG_INTERVAL = 0.01
+
+def percentile(values: list[float], q: float) -> float | None:
+    if not values:
+        return None
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(q / 100 * len(ordered)))]
+
+def latency_summary(latencies: list[float], errors: int, elapsed: float) -> dict:
+    return {
+        "requests": len(latencies),
+        "errors": errors,
+        "throughput_rps": round(len(latencies) / elapsed, 1),
+        "p50_ms": round(percentile(latencies, 50) * 1000, 2) if latencies else None,
+        "p95_ms": round(percentile(latencies, 95) * 1000, 2) if latencies else None,
+        "p99_ms": round(percentile(latencies, 99) * 1000, 2) if latencies else None
+    }
+
+def sale_payload(n: int) -> dict:
+    items = [
+        {"sweetId": SWEET_IDS[(n + i) % len(SWEET_IDS)], "sweetName": f"Doce {i}", "quantity": 1 + i % 3, "priceAtSale": 4.5}
+        for i in range(3)
+    ]
+    return {
+        "payment_type": "PIX",
+        "payer": {"nome": "Cliente"},
+        "receiver": {"nome": "Sweet Home"},
+        "items": items,
+        "totalAmount": sum(item["quantity"] * item["priceAtSale"] for item in items)
+    }
+
+async def monitor_loop_lag(lags: list[float], stop: asyncio.Event):
+    while not stop.is_set():
+        start = time.perf_counter()
+        await asyncio.sleep(LAG_INTERVAL)
+        lags.append(max(0.0, time.perf_counter() - start - LAG_INTERVAL))
+
+async def run(args) -> dict:
+    from server.main import app
+    from server.src.services import key_service
+    from server.src.services.firebase_auth_service import get_firebase_db
+
+    firebase_db = get_firebase_db()
+
+    for sweet_id in SWEET_IDS:
+        firebase_db.collection('sweets').document(sweet_id).set({"name": sweet_id, "stock": 10 ** 9})
+    api_key = key_service.generate_key()
+    key_service.save_key_to_db(api_key, minutes=60)
+    credentials = {"username": "admin", "password": os.environ['ADMIN_PASSWORD']}
+
+    async with app.test_app() as test_app:
+        client = test_app.test_client()
+        response = await client.post('/api/auth/login', json=credentials)
+        token = (await response.get_json()).get('access_token')
+        auth = {"Authorization": f"Bearer {token}"}
+        firebase_db.stats.clear()
+
+        requests = {
+            "login": lambda n: client.post('/api/auth/login', json=credentials),
+            "validate_key": lambda n: client.post('/api/keys/validate', json={"api_key": api_key}),
+            "finish_sale": lambda n: client.post('/api/sales/finish', json=sale_payload(n), headers=auth)
+        }
+        mix = [name for name in ENDPOINTS for _ in range(args.weights[ENDPOINTS.index(name)])]
+        latencies = {name: [] for name in ENDPOINTS}
+        errors = {name: 0 for name in ENDPOINTS}
+        counter = itertools.count()
+
+        async def worker(deadline: float):
+            while time.perf_counter() < deadline:
+                n = next(counter)
+                name = mix[n % len(mix)]
+                start = time.perf_counter()
+                response = await requests[name](n)
+                await response.get_data()
+                latencies[name].append(time.perf_counter() - start)
+                if response.status_code >= 400:
+                    errors[name] += 1
+
+        lags, stop = [], asyncio.Event()
+        monitor = asyncio.create_task(monitor_loop_lag(lags, stop))
+        started = time.perf_counter()
+        await asyncio.gather(*(worker(started + args.duration) for _ in range(args.concurrency)))
+        elapsed = time.perf_counter() - started
+        stop.set()
+        await monitor
+
+    everything = [latency for values in latencies.values() for latency in values]
+    return {
+        "commit": git_commit(),
+        "config": {
+            "concurrency": args.concurrency,
+            "duration_s": args.duration,
+            "weights": dict(zip(ENDPOINTS, args.weights)),
+            "firestore_latency_ms": args.latency_ms,
+            "firestore_jitter_ms": args.jitter_ms,
+            "firestore_error_rate": args.error_rate
+        },
+        "total": latency_summary(everything, sum(errors.values()), elapsed),
+        "endpoints": {name: latency_summary(latencies[name], errors[name], elapsed) for name in ENDPOINTS},
+        "event_loop_lag_ms": {
+            "p50": round(percentile(lags, 50) * 1000, 2) if lags else None,
+            "p99": round(percentile(lags, 99) * 1000, 2) if lags else None,
+            "max": round(max(lags) * 1000, 2) if lags else None
+        },
+        "firestore_calls": dict(firebase_db.stats)
+    }
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--concurrency', type=int, default=16)
+    parser.add_argument('--duration', type=float, default=10)
+    parser.add_argument('--weights', type=int, nargs=3, default=[1, 4, 2], metavar=('LOGIN', 'VALIDATE', 'FINISH'))
+    parser.add_argument('--latency-ms', type=float, default=20)
+    parser.add_argument('--jitter-ms', type=float, default=10)
+    parser.add_argument('--error-rate', type=float, default=0)
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--output')
+    args = parser.parse_args()
+
+    os.environ.update({
+        "FAKE_FIRESTORE": "true",
+        "BARCODE_SHARD": os.getenv('BARCODE_SHARD', '0'),
+        "ADMIN_PASSWORD": os.getenv('ADMIN_PASSWORD', 'Admin@12345'),
+        "FAKE_FIRESTORE_LATENCY_MS": str(args.latency_ms),
+        "FAKE_FIRESTORE_JITTER_MS": str(args.jitter_ms),
+        "FAKE_FIRESTORE_ERROR_RATE": str(args.error_rate),
+        "FAKE_FIRESTORE_SEED": str(args.seed)
+    })
+    logging.disable(logging.WARNING)
+
+    report = asyncio.run(run(args))
+    print(json.dumps(report, indent=2))
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+
+if __name__ == '__main__':
+    main()
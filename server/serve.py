@@ -0,0 +1,59 @@
+"""Servidor de producao: Hypercorn com varios processos, uvloop quando instalado e drenagem no SIGTERM.
+
+Uso: python server/serve.py
+Cada worker importa server.main:app e roda os hooks before_serving/after_serving pelo lifespan.
+No SIGTERM/SIGINT os workers param de aceitar conexoes, esperam as requisicoes em andamento
+(inclusive renderizacoes de comprovante) por ate GRACEFUL_TIMEOUT segundos e so entao executam
+o after_serving, que encerra o pool de renderizacao aguardando os processos.
+"""
+import importlib.util
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from dotenv import load_dotenv
+from hypercorn.config import Config
+from hypercorn.run import run
+
+from server.src.utils.logger import log_info
+
+load_dotenv()
+
+APPLICATION_PATH = 'server.main:app'
+
+def worker_class() -> str:
+    configured = os.getenv('WORKER_CLASS')
+    if configured:
+        return configured
+    return 'uvloop' if importlib.util.find_spec('uvloop') else 'asyncio'
+
+def build_config() -> Config:
+    workers = int(os.getenv('SERVER_WORKERS', '0')) or os.cpu_count() or 1
+
+    config = Config()
+    config.application_path = APPLICATION_PATH
+    config.bind = [f"{os.getenv('HOST', '0.0.0.0')}:{int(os.getenv('PORT', '3001'))}"]
+    config.workers = workers
+    config.worker_class = worker_class()
+    config.backlog = int(os.getenv('BACKLOG', '2048'))
+    config.keep_alive_timeout = float(os.getenv('KEEP_ALIVE_TIMEOUT', '75'))
+    config.keep_alive_max_requests = int(os.getenv('KEEP_ALIVE_MAX_REQUESTS', '1000'))
+    config.graceful_timeout = float(os.getenv('GRACEFUL_TIMEOUT', '30'))
+    config.accesslog = '-' if os.getenv('ACCESS_LOG', 'False').lower() == 'true' else None
+    config.errorlog = '-'
+    return config
+
+def main() -> int:
+    config = build_config()
+    if not os.getenv('RECEIPT_WORKERS'):
+        # Cada worker tem seu proprio pool de renderizacao; dividir os nucleos evita N x CPUs processos.
+        os.environ['RECEIPT_WORKERS'] = str(max(1, (os.cpu_count() or 1) // config.workers))
+    log_info(
+        f"Servidor de producao em {', '.join(config.bind)}: {config.workers} workers {config.worker_class}, "
+        f"{os.environ['RECEIPT_WORKERS']} processos de renderizacao por worker"
+    )
+    return run(config)
+
+if __name__ == '__main__':
+    sys.exit(main())
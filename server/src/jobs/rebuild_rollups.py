@@ -0,0 +1,225 @@
+"""Reconstruir os rollups diarios de vendas a partir do historico, no armazenamento configurado.
+
+Uso: python -m server.src.jobs.rebuild_rollups --start 2025-01-01 --end 2025-12-31 [--dry-run]
+
+O servidor pode continuar vendendo: so as vendas gravadas ate um corte (inicio do job menos
+CUTOFF_MARGIN_SECONDS) entram na varredura, e cada lote de BATCH_DAYS dias e trocado numa transacao que
+soma de novo as vendas desses dias gravadas depois do corte. Um incremento concorrente nunca e
+sobrescrito nem contado duas vezes.
+
+Precisa do numpy (extra "jobs"): pip install ".[jobs]".
+"""
+import argparse
+import datetime
+import json
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))))
+
+from server.src.services import reports_service
+from server.src.storage.backend import get_storage
+from server.src.storage.rollups import created_after
+from server.src.utils.logger import log_info, log_error
+
+PAGE_SIZE = 500
+CUTOFF_MARGIN_SECONDS = 60
+# Dias por transacao de escrita: uma escrita por dia, abaixo do limite de 500 do Firestore.
+BATCH_DAYS = 200
+
+np = None  # numpy, importado por load_numpy() so quando o job roda
+
+def load_numpy():
+    global np
+    if np is None:
+        try:
+            import numpy
+        except ImportError:
+            raise RuntimeError('numpy nao instalado: pip install ".[jobs]"') from None
+        np = numpy
+    return np
+
+class RollupAggregator:
+    """Acumula vendas em arrays colunares por dia; a memoria depende de dias x doces, nao do numero de vendas."""
+
+    def __init__(self, start_date: datetime.date, end_date: datetime.date, cutoff: datetime.datetime | None = None):
+        load_numpy()
+        self.start_date = start_date
+        self.cutoff = cutoff
+        self.n_days = (end_date - start_date).days + 1
+        self.day_index = {
+            (start_date + datetime.timedelta(days=i)).isoformat(): i for i in range(self.n_days)
+        }
+        self.sales = np.zeros(self.n_days, dtype=np.int64)
+        self.revenue = np.zeros(self.n_days, dtype=np.float64)
+        self.cost = np.zeros(self.n_days, dtype=np.float64)
+        self.profit = np.zeros(self.n_days, dtype=np.float64)
+        self.sweet_codes: dict[str, int] = {}
+        self.sweet_ids: list[str] = []
+        self.sweet_names: list[str] = []
+        self.quantities = np.zeros((self.n_days, 64), dtype=np.int64)
+
+    def _sweet_code(self, sweet_id: str, name: str) -> int:
+        code = self.sweet_codes.get(sweet_id)
+        if code is None:
+            code = self.sweet_codes[sweet_id] = len(self.sweet_ids)
+            self.sweet_ids.append(sweet_id)
+            self.sweet_names.append(name)
+            if code >= self.quantities.shape[1]:
+                grown = np.zeros((self.n_days, self.quantities.shape[1] * 2), dtype=np.int64)
+                grown[:, :self.quantities.shape[1]] = self.quantities
+                self.quantities = grown
+        else:
+            self.sweet_names[code] = name
+        return code
+
+    def add_page(self, sales: list[dict]):
+        sale_days, revenue, cost, profit = [], [], [], []
+        line_days, line_sweets, line_qty = [], [], []
+        day_index = self.day_index
+        cutoff = self.cutoff
+
+        for sale in sales:
+            day = day_index.get(sale.get('date'))
+            if day is None or (cutoff and created_after(sale, cutoff)):
+                continue
+            sale_days.append(day)
+            revenue.append(sale.get('totalAmount') or 0)
+            cost.append(sale.get('totalCost') or 0)
+            profit.append(sale.get('totalProfit') or 0)
+            for item in sale.get('items') or ():
+                name = item.get('sweetName') or 'Produto Desconhecido'
+                line_days.append(day)
+                line_sweets.append(self._sweet_code(str(item.get('sweetId') or name), name))
+                line_qty.append(item.get('quantity') or 0)
+
+        if not sale_days:
+            return
+
+        days = np.asarray(sale_days, dtype=np.int64)
+        self.sales += np.bincount(days, minlength=self.n_days)
+        self.revenue += np.bincount(days, weights=np.asarray(revenue, dtype=np.float64), minlength=self.n_days)
+        self.cost += np.bincount(days, weights=np.asarray(cost, dtype=np.float64), minlength=self.n_days)
+        self.profit += np.bincount(days, weights=np.asarray(profit, dtype=np.float64), minlength=self.n_days)
+        if line_days:
+            np.add.at(
+                self.quantities,
+                (np.asarray(line_days, dtype=np.int64), np.asarray(line_sweets, dtype=np.int64)),
+                np.asarray(line_qty, dtype=np.int64)
+            )
+
+    def date_of(self, day: int) -> str:
+        return (self.start_date + datetime.timedelta(days=day)).isoformat()
+
+    def rollups(self):
+        """Gerar (data, documento) para cada dia do intervalo; documento None indica dia sem vendas."""
+        for day in range(self.n_days):
+            date = self.date_of(day)
+            if not self.sales[day]:
+                yield date, None
+                continue
+            sold = np.flatnonzero(self.quantities[day, :len(self.sweet_ids)])
+            yield date, {
+                "date": date,
+                "vendas": int(self.sales[day]),
+                "total": float(self.revenue[day]),
+                "custo": float(self.cost[day]),
+                "lucro": float(self.profit[day]),
+                "itens": {
+                    self.sweet_ids[code]: {"nome": self.sweet_names[code], "quantidade": int(self.quantities[day, code])}
+                    for code in sold
+                }
+            }
+
+    def summarize(self, period_type: str) -> list[dict]:
+        keys = [reports_service.period_key(self.date_of(day), period_type) for day in range(self.n_days)]
+        periods, inverse = np.unique(np.asarray(keys), return_inverse=True)
+        n_periods = len(periods)
+
+        sales = np.bincount(inverse, weights=self.sales, minlength=n_periods)
+        revenue = np.bincount(inverse, weights=self.revenue, minlength=n_periods)
+        cost = np.bincount(inverse, weights=self.cost, minlength=n_periods)
+        profit = np.bincount(inverse, weights=self.profit, minlength=n_periods)
+        margin = np.divide(profit * 100, revenue, out=np.zeros(n_periods), where=revenue > 0)
+
+        n_sweets = len(self.sweet_ids)
+        quantities = np.zeros((n_periods, max(n_sweets, 1)), dtype=np.int64)
+        np.add.at(quantities, inverse, self.quantities[:, :max(n_sweets, 1)])
+        top = quantities.argmax(axis=1)
+
+        return [
+            {
+                "periodo": str(periods[i]),
+                "vendas": int(sales[i]),
+                "receita": round(float(revenue[i]), 2),
+                "custo": round(float(cost[i]), 2),
+                "lucro": round(float(profit[i]), 2),
+                "margem": round(float(margin[i]), 2),
+                "maisVendido": {
+                    "sweetId": self.sweet_ids[top[i]],
+                    "nome": self.sweet_names[top[i]],
+                    "quantidade": int(quantities[i, top[i]])
+                } if n_sweets and quantities[i, top[i]] > 0 else None
+            }
+            for i in range(n_periods)
+            if sales[i] > 0
+        ]
+
+def write_rollups(aggregator: RollupAggregator, storage=None) -> int:
+    """Trocar cada dia do intervalo pelo rollup reconstruido, BATCH_DAYS dias por transacao."""
+    rollups = (storage or get_storage()).rollups
+    written = 0
+    batch = {}
+    for date, rollup in aggregator.rollups():
+        batch[date] = rollup
+        if rollup:
+            written += 1
+        if len(batch) >= BATCH_DAYS:
+            rollups.replace_days(batch, aggregator.cutoff)
+            batch = {}
+    if batch:
+        rollups.replace_days(batch, aggregator.cutoff)
+    return written
+
+def rebuild(start_date: datetime.date, end_date: datetime.date, dry_run: bool = False, period_type: str = 'mes') -> list[dict]:
+    storage = get_storage()
+    cutoff = datetime.datetime.now(datetime.timezone.utc) - datetime.timedelta(seconds=CUTOFF_MARGIN_SECONDS)
+    aggregator = RollupAggregator(start_date, end_date, cutoff)
+    pages = 0
+    for page in storage.sales.iter_pages(start_date.isoformat(), end_date.isoformat(), PAGE_SIZE):
+        aggregator.add_page(page)
+        pages += 1
+    log_info(f'{pages} paginas de vendas processadas ({storage.name}), corte em {cutoff.isoformat()}')
+
+    if not dry_run:
+        written = write_rollups(aggregator, storage)
+        log_info(f'{written} rollups diarios gravados')
+    return aggregator.summarize(period_type)
+
+def main(argv=None):
+    today = datetime.date.today()
+    parser = argparse.ArgumentParser(description='Reconstruir rollups diarios de vendas')
+    parser.add_argument('--start', type=datetime.date.fromisoformat, default=today - datetime.timedelta(days=365))
+    parser.add_argument('--end', type=datetime.date.fromisoformat, default=today)
+    parser.add_argument('--period', choices=reports_service.PERIOD_TYPES, default='mes')
+    parser.add_argument('--dry-run', action='store_true')
+    args = parser.parse_args(argv)
+
+    if args.start > args.end:
+        log_error('Periodo invalido')
+        return 1
+    try:
+        load_numpy()
+    except RuntimeError as e:
+        log_error(str(e))
+        return 1
+    if not args.dry_run and get_storage().name == 'memory':
+        log_error('Reconstrucao de rollups precisa de armazenamento persistente (STORAGE_BACKEND=firestore ou sqlite)')
+        return 1
+
+    summary = rebuild(args.start, args.end, dry_run=args.dry_run, period_type=args.period)
+    print(json.dumps(summary, ensure_ascii=False, indent=2))
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -1,4 +1,6 @@
+import datetime
 import uuid
+import zoneinfo
 from dataclasses import field, dataclass
 from decimal import Decimal
 from enum import Enum
@@ -22,7 +24,7 @@ class Comprovante:
     timestamp: str = field(default_factory=timestamp)
     currency: str = "BRL"
     description: Optional[str] = None
-    barcode_str: str = field(init=False)
+    barcode_str: str = ""
     items: Optional[List[Dict[str, Any]]] = None
     subtotal: Optional[Decimal] = None
     itemDiscountsTotal: Optional[Decimal] = None
@@ -31,15 +33,9 @@ class Comprovante:
     totalAmount: Optional[Decimal] = None
 
     def __post_init__(self):
-        payer_name = self.payer.get("nome", "")
-        self.barcode_str = generate_numeric_id_from_string(
-            payer_name,
-            str(uuid.uuid4()),
-            str(self.transaction_id)
-        )
-        
         if self.items:
-            self.qtd = sum(item.get('quantity', 0) for item in self.items)
+            if not self.qtd:
+                self.qtd = sum(item.get('quantity', 0) for item in self.items)
             self.value = Decimal(str(self.totalAmount)) if self.totalAmount else Decimal(0)
 
     @property
@@ -64,4 +60,55 @@ class Comprovante:
             "globalDiscountPercent": float(self.globalDiscountPercent) if self.globalDiscountPercent else None,
             "globalDiscountAmount": float(self.globalDiscountAmount) if self.globalDiscountAmount else None,
             "totalAmount": float(self.totalAmount) if self.totalAmount else None
-        }
\ No newline at end of file
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "Comprovante":
+        """Reconstruir um comprovante a partir de uma venda armazenada."""
+        try:
+            payment_type = MetodoPagamento[str(data.get("payment_type") or data.get("paymentMethod") or "PIX").upper()]
+        except KeyError:
+            payment_type = MetodoPagamento.PIX
+
+        transaction_id = data.get("transaction_id") or data.get("id") or uuid.uuid4()
+        try:
+            transaction_id = uuid.UUID(str(transaction_id))
+        except ValueError:
+            transaction_id = str(transaction_id)
+
+        total_amount = _optional_decimal(data.get("totalAmount"))
+        comprovante = cls(
+            qtd=int(data.get("qtd", 0) or 0),
+            value=Decimal(str(data.get("value") or total_amount or 0)),
+            payment_type=payment_type,
+            payer=data.get("payer") or {"nome": "Cliente"},
+            receiver=data.get("receiver") or {"nome": "Sweet Home"},
+            transaction_id=transaction_id,
+            timestamp=stored_timestamp(data.get("timestamp")),
+            currency=data.get("currency") or "BRL",
+            description=data.get("description"),
+            barcode_str=str(data.get("barcode_str") or generate_numeric_id_from_string(
+                (data.get("payer") or {}).get("nome", ""), "", str(transaction_id)
+            )),
+            items=data.get("items") or None,
+            subtotal=_optional_decimal(data.get("subtotal")),
+            itemDiscountsTotal=_optional_decimal(data.get("itemDiscountsTotal")),
+            globalDiscountPercent=_optional_decimal(data.get("globalDiscountPercent")),
+            globalDiscountAmount=_optional_decimal(data.get("globalDiscountAmount")),
+            totalAmount=total_amount
+        )
+        return comprovante
+
+def _optional_decimal(value) -> Optional[Decimal]:
+    if value is None:
+        return None
+    return Decimal(str(value))
+
+def stored_timestamp(value) -> str:
+    if isinstance(value, (int, float)):
+        return datetime.datetime.fromtimestamp(
+            value / 1000, zoneinfo.ZoneInfo("America/Sao_Paulo")
+        ).strftime("%Y-%m-%d %H:%M:%S")
+    if isinstance(value, datetime.datetime):
+        return value.astimezone(zoneinfo.ZoneInfo("America/Sao_Paulo")).strftime("%Y-%m-%d %H:%M:%S")
+    return str(value) if value else timestamp()
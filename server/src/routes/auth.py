@@ -1,10 +1,11 @@
 from quart import Blueprint, request, jsonify
-from quart_jwt_extended import create_access_token, jwt_required, get_jwt_identity
+from quart_jwt_extended import create_access_token, jwt_required, get_jwt_identity, get_raw_jwt
 import os
 from datetime import datetime, timedelta
 
 from server.src.services import firebase_auth_service as auth_service
-from server.src.services.register_service import validate_username, is_email_valid, validate_password, timestamp
+from server.src.services.token_denylist import token_denylist
+from server.src.services.register_service import validate_username, is_email_valid_async, validate_password, timestamp
 from server.src.utils.logger import log_info, log_warn, log_error, log_debug
 
 auth_bp = Blueprint("auth", __name__)
@@ -22,7 +23,7 @@ async def register():
     
     if not username or not validate_username(username):
         return jsonify({"msg": "Nome de usuario invalido"}), 400
-    if not email or not is_email_valid(email)[0]:
+    if not email or not (await is_email_valid_async(email))[0]:
         return jsonify({"msg": "Email invalido"}), 400
     if not password or not validate_password(password):
         return jsonify({"msg": "Senha invalida"}), 400
@@ -95,6 +96,8 @@ async def dashboard():
 @auth_bp.route('/logout', methods=["POST", "OPTIONS"])
 @jwt_required
 async def logout():
+    if not token_denylist.revoke(get_raw_jwt()):
+        return jsonify({"msg": "Erro ao encerrar sessao"}), 500
     return jsonify({"msg": "Logout bem-sucedido"}), 200
 
 @auth_bp.route('/refresh', methods=["POST", "OPTIONS"])
@@ -111,6 +114,8 @@ async def refresh_token():
             identity=current_user,
             expires_delta=jwt_expires
         )
+        if not token_denylist.revoke(get_raw_jwt()):
+            return jsonify({"msg": "Erro ao renovar token"}), 500
         
         log_info(f'Token renovado para usuario: {current_user["id"]}')
         return jsonify({"access_token": new_token}), 200
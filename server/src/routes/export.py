@@ -0,0 +1,58 @@
+from datetime import date
+
+from quart import Blueprint, Response, request, jsonify
+from quart_jwt_extended import jwt_required
+
+from server.src.services.export_service import EXPORT_COLUMNS, EXPORT_FORMATS, export_available, stream_export
+from server.src.utils.utils import is_iso_date
+from server.src.utils.logger import log_info, log_error
+
+export = Blueprint('export', __name__)
+
+def accepts_gzip() -> bool:
+    if request.args.get('gzip', '').lower() == 'false':
+        return False
+    return 'gzip' in request.headers.get('Accept-Encoding', '').lower()
+
+@export.get('/<dataset>')
+@jwt_required
+async def export_dataset(dataset: str):
+    """Baixar vendas, doces ou ingredientes inteiros em CSV ou NDJSON (format=csv|ndjson)."""
+    if dataset not in EXPORT_COLUMNS:
+        return jsonify({"msg": "Exportacao invalida"}), 404
+    if not export_available(dataset):
+        return jsonify({"msg": "Estoque indisponivel no armazenamento configurado"}), 409
+
+    output_format = request.args.get('format', 'csv').lower()
+    if output_format not in EXPORT_FORMATS:
+        return jsonify({"msg": "Formato invalido"}), 400
+
+    start_date = request.args.get('start_date') or None
+    end_date = request.args.get('end_date') or None
+    for value in (start_date, end_date):
+        if value and not is_iso_date(value):
+            return jsonify({"msg": "Periodo invalido"}), 400
+    if start_date and end_date and start_date > end_date:
+        return jsonify({"msg": "Periodo invalido"}), 400
+
+    compress = accepts_gzip()
+    try:
+        headers = {
+            "Content-Disposition": f'attachment; filename="{dataset}_{date.today().isoformat()}.{output_format}"',
+            "Vary": "Accept-Encoding"
+        }
+        if compress:
+            headers["Content-Encoding"] = "gzip"
+
+        log_info(f"Exportacao de {dataset} em {output_format}{' com gzip' if compress else ''}")
+        response = Response(
+            stream_export(dataset, output_format, start_date, end_date, compress=compress),
+            mimetype=EXPORT_FORMATS[output_format],
+            headers=headers
+        )
+        response.timeout = None
+        return response
+
+    except Exception as e:
+        log_error(f"Erro na exportacao: {str(e)}")
+        return jsonify({"msg": "Erro interno do servidor"}), 500
@@ -0,0 +1,62 @@
+from quart import Blueprint, request, jsonify
+from quart_jwt_extended import jwt_required
+
+from server.src.services import reports_service
+from server.src.utils.utils import is_iso_date
+from server.src.utils.logger import log_error
+
+reports = Blueprint('reports', __name__)
+
+MAX_TOP_LIMIT = 100
+
+def period_filters():
+    period_type = request.args.get('period', 'dia')
+    start_date = request.args.get('start_date') or None
+    end_date = request.args.get('end_date') or None
+    if period_type not in reports_service.PERIOD_TYPES:
+        return None
+    for value in (start_date, end_date):
+        if value and not is_iso_date(value):
+            return None
+    return period_type, start_date, end_date
+
+@reports.get('/sales')
+@jwt_required
+async def sales_by_period():
+    filters = period_filters()
+    if not filters:
+        return jsonify({"msg": "Filtros invalidos"}), 400
+    try:
+        return jsonify({"periods": reports_service.sales_by_period(*filters)}), 200
+    except Exception as e:
+        log_error(f"Erro no relatorio de vendas: {str(e)}")
+        return jsonify({"msg": "Erro interno do servidor"}), 500
+
+@reports.get('/profit')
+@jwt_required
+async def profit_margin_by_period():
+    filters = period_filters()
+    if not filters:
+        return jsonify({"msg": "Filtros invalidos"}), 400
+    try:
+        return jsonify({"periods": reports_service.profit_margin_by_period(*filters)}), 200
+    except Exception as e:
+        log_error(f"Erro no relatorio de lucro: {str(e)}")
+        return jsonify({"msg": "Erro interno do servidor"}), 500
+
+@reports.get('/top-products')
+@jwt_required
+async def top_selling_products():
+    filters = period_filters()
+    if not filters:
+        return jsonify({"msg": "Filtros invalidos"}), 400
+    try:
+        limit = min(max(int(request.args.get('limit', 10)), 1), MAX_TOP_LIMIT)
+    except ValueError:
+        return jsonify({"msg": "Limite invalido"}), 400
+    _, start_date, end_date = filters
+    try:
+        return jsonify({"products": reports_service.top_selling_products(limit, start_date, end_date)}), 200
+    except Exception as e:
+        log_error(f"Erro no relatorio de produtos: {str(e)}")
+        return jsonify({"msg": "Erro interno do servidor"}), 500
@@ -1,26 +1,201 @@
+import asyncio
 import io
-import pathlib
-from decimal import Decimal, InvalidOperation
+import json
 from datetime import datetime
 
-from quart import Blueprint, request, jsonify, send_file
+from quart import Blueprint, Response, request, jsonify, send_file
 from quart_jwt_extended import jwt_required, get_jwt_identity
 
-from server.src.models.comprovante_model import Comprovante, MetodoPagamento
-from server.src.services.comprovante_service import format_sales_receipt
-from server.src.services.generate_pdf import generate_html, generate_qrcode, generate_barcode
-from server.src.utils.utils import read_bytes
+from server.src.models.comprovante_model import Comprovante, MetodoPagamento, stored_timestamp
+from server.src.services.barcode_ids import next_barcode, next_barcodes
+from server.src.services.comprovante_service import render_sales_receipt
+from server.src.services.escpos_receipt import ESCPOS_MIMETYPE, render_escpos
+from server.src.services.inventory_service import valid_document_id
+from server.src.services.pricing import PricedSale, price_sale, mismatched_totals
+from server.src.services.receipt_batch import MAX_BATCH_SIZE, render_merged, render_single, stream_zip
+from server.src.services.receipt_cache import content_hash, receipt_cache
+from server.src.services.receipt_template import get_receipt_template
+from server.src.services.sales_store import (
+    build_sale_document, find_idempotent_sale, find_sale_by_barcode, get_sales_by_ids, get_sales_by_date_range,
+    save_sale, save_sales_batch
+)
+from server.src.storage.base import AlreadyStored
+from server.src.utils.utils import is_iso_date, is_valid_ean13
 from server.src.utils.logger import log_info, log_error, log_warn
 
 sales = Blueprint('sales', __name__)
 
-def safe_decimal(value, default=Decimal('0')):
+MAX_IDEMPOTENCY_KEY_LENGTH = 128
+MAX_BULK_SALES = 5000
+MAX_BULK_LINE_BYTES = 256 * 1024
+MAX_TRANSACTION_ID_LENGTH = 100
+
+def pdf_response(pdf_bytes: bytes, etag: str, filename: str) -> Response:
+    response = Response(pdf_bytes, mimetype='application/pdf')
+    response.headers['Content-Disposition'] = f'attachment; filename="{filename}"'
+    response.headers['Cache-Control'] = 'private, no-cache'
+    response.set_etag(etag)
+    return response
+
+def escpos_response(payload: bytes, filename: str) -> Response:
+    response = Response(payload, mimetype=ESCPOS_MIMETYPE)
+    response.headers['Content-Disposition'] = f'attachment; filename="{filename}"'
+    response.headers['Cache-Control'] = 'private, no-cache'
+    response.set_etag(content_hash(payload))
+    return response
+
+def wants_escpos(data: dict | None = None) -> bool:
+    """Formato ESC/POS pedido por ?format=escpos, campo format no corpo ou Accept: application/vnd.escpos."""
+    requested = request.args.get('format') or (data or {}).get('format')
+    if requested:
+        return str(requested).lower() == 'escpos'
+    return request.accept_mimetypes.best_match(['application/pdf', ESCPOS_MIMETYPE]) == ESCPOS_MIMETYPE
+
+def comprovante_from_payload(data: dict, **fields) -> tuple[Comprovante, PricedSale]:
+    """Validar o payload de uma venda e montar o comprovante; lanca ValueError com a mensagem para o cliente."""
+    required_fields = ['payer', 'receiver', 'payment_type']
+    if any(f not in data for f in required_fields):
+        raise ValueError("Campos obrigatorios ausentes")
+
+    try:
+        payment_type = MetodoPagamento[str(data.get('payment_type', 'PIX')).upper()]
+    except KeyError:
+        raise ValueError("Metodo de pagamento invalido")
+
+    items = data.get('items', [])
+    if not isinstance(items, list) or len(items) == 0:
+        raise ValueError("Itens obrigatorios")
+
+    priced = price_sale(items, data.get('globalDiscountPercent', 0))
+    mismatched = mismatched_totals(priced, data)
+    if mismatched:
+        raise ValueError("Totais divergentes", mismatched)
+    if priced.totalAmount <= 0:
+        raise ValueError("Total deve ser maior que zero")
+
+    comprovante = Comprovante(
+        qtd=priced.qtd,
+        value=priced.totalAmount,
+        payment_type=payment_type,
+        payer={"nome": str(data.get('payer', {}).get('nome', 'Cliente'))[:100]},
+        receiver={"nome": str(data.get('receiver', {}).get('nome', 'Sweet Home'))[:100]},
+        description=str(data.get('description', 'Venda'))[:100],
+        items=priced.items,
+        subtotal=priced.subtotal,
+        itemDiscountsTotal=priced.itemDiscountsTotal,
+        globalDiscountPercent=priced.globalDiscountPercent,
+        globalDiscountAmount=priced.globalDiscountAmount,
+        totalAmount=priced.totalAmount,
+        **fields
+    )
+    return comprovante, priced
+
+def invalid_sale_response(error: ValueError):
+    msg = error.args[0] if error.args else "Venda invalida"
+    log_warn(f"Venda invalida: {msg}")
+    body = {"msg": msg}
+    if len(error.args) > 1:
+        body["campos"] = error.args[1]
+    return jsonify(body), 400
+
+async def ndjson_lines(body):
+    """Ler o corpo da requisicao linha a linha, sem esperar o upload inteiro."""
+    buffer = b''
+    async for chunk in body:
+        buffer += chunk
+        *lines, buffer = buffer.split(b'\n')
+        for line in lines:
+            yield line
+        if len(buffer) > MAX_BULK_LINE_BYTES:
+            raise ValueError("Linha excede o tamanho maximo")
+    if buffer:
+        yield buffer
+
+def line_error(line_number: int, error: ValueError) -> dict:
+    body = {"line": line_number, "msg": error.args[0] if error.args else "Venda invalida"}
+    if len(error.args) > 1:
+        body["campos"] = error.args[1]
+    return body
+
+def bulk_timestamp(value) -> str:
+    """Horario da venda offline: epoch em ms ou texto "%Y-%m-%d %H:%M:%S"; lanca ValueError se invalido."""
+    if isinstance(value, bool) or not isinstance(value, (int, float, str, type(None))):
+        raise ValueError("timestamp invalido")
     try:
-        if value is None:
-            return default
-        return Decimal(str(value))
-    except (InvalidOperation, ValueError, TypeError):
-        return default
+        if isinstance(value, str) and value:
+            datetime.strptime(value, "%Y-%m-%d %H:%M:%S")
+        return stored_timestamp(value)
+    except (ValueError, OverflowError, OSError):
+        raise ValueError("timestamp invalido")
+
+def not_modified(etag: str) -> Response:
+    response = Response(status=304)
+    response.set_etag(etag)
+    return response
+
+async def receipt_for_transaction(transaction_id: str, username: str) -> tuple[str, bytes] | None:
+    cached = receipt_cache.get(transaction_id)
+    if cached:
+        log_info("Comprovante servido do cache")
+        return cached
+
+    loop = asyncio.get_running_loop()
+    stored_sales = await loop.run_in_executor(None, get_sales_by_ids, [transaction_id])
+    if not stored_sales:
+        return None
+
+    _, pdf_bytes = await render_single(stored_sales[0], username)
+    if not pdf_bytes:
+        return None
+    return receipt_cache.put(transaction_id, pdf_bytes), pdf_bytes
+
+async def escpos_for_transaction(transaction_id: str, username: str) -> bytes | None:
+    loop = asyncio.get_running_loop()
+    stored_sales = await loop.run_in_executor(None, get_sales_by_ids, [transaction_id])
+    if not stored_sales:
+        return None
+    sale = stored_sales[0]
+    return render_escpos(Comprovante.from_dict(sale), sale.get('operatorName') or username)
+
+def receipt_failed_response(transaction_id: str, barcode: str | None = None):
+    """A venda ja foi gravada: devolver a transacao com o erro do comprovante, que pode ser
+    reimpresso em /receipts/<transaction_id>, em vez de um 500 que esconderia a venda.
+    """
+    log_error(f"Venda gravada sem comprovante: {transaction_id}")
+    body = {"transaction_id": transaction_id, "msg": "Venda registrada, erro ao gerar comprovante"}
+    if barcode:
+        body["barcode"] = barcode
+    response = jsonify(body)
+    response.headers['X-Transaction-Id'] = transaction_id
+    response.headers['X-Receipt-Status'] = 'failed'
+    return response, 201
+
+async def replay_sale(transaction_id: str, username: str, wants_receipt: bool, escpos: bool = False):
+    log_info(f"Venda repetida, retornando resultado original: {transaction_id}")
+    if not wants_receipt:
+        response = jsonify({"transaction_id": transaction_id})
+    elif escpos:
+        try:
+            payload = await escpos_for_transaction(transaction_id, username)
+        except Exception as e:
+            log_error(f"Erro ao gerar ESC/POS: {str(e)}")
+            payload = None
+        if not payload:
+            response, status = receipt_failed_response(transaction_id)
+            response.headers['Idempotent-Replayed'] = 'true'
+            return response, status
+        response = escpos_response(payload, "comprovante.bin")
+    else:
+        receipt = await receipt_for_transaction(transaction_id, username)
+        if not receipt:
+            response, status = receipt_failed_response(transaction_id)
+            response.headers['Idempotent-Replayed'] = 'true'
+            return response, status
+        etag, pdf_bytes = receipt
+        response = pdf_response(pdf_bytes, etag, "comprovante.pdf")
+    response.headers['X-Transaction-Id'] = transaction_id
+    response.headers['Idempotent-Replayed'] = 'true'
+    return response
 
 @sales.post('/finish')
 @jwt_required
@@ -36,91 +211,259 @@ async def finish_sale():
     if not data:
         return jsonify({"msg": "Corpo da requisicao vazio"}), 400
 
+    idempotency_key = request.headers.get('Idempotency-Key')
+    if idempotency_key is not None and (not idempotency_key.strip() or len(idempotency_key) > MAX_IDEMPOTENCY_KEY_LENGTH):
+        return jsonify({"msg": "Idempotency-Key invalida"}), 400
+
+    wants_receipt = data.get('receipt', True) is not False
+    escpos = wants_escpos(data)
+
     try:
-        required_fields = ['payer', 'receiver', 'payment_type']
-        missing_fields = [f for f in required_fields if f not in data]
-        
-        if missing_fields:
-            log_error(f"Campos obrigatorios ausentes")
-            return jsonify({"msg": "Campos obrigatorios ausentes"}), 400
-
-        payment_method_str = str(data.get('payment_type', 'PIX')).upper()
-        
+        loop = asyncio.get_running_loop()
+        if idempotency_key:
+            existing_id = await loop.run_in_executor(None, find_idempotent_sale, user_id, idempotency_key)
+            if existing_id:
+                return await replay_sale(existing_id, username, wants_receipt, escpos)
+
+        barcode = await loop.run_in_executor(None, next_barcode)
         try:
-            payment_type = MetodoPagamento[payment_method_str]
-        except KeyError:
-            log_error(f"Metodo de pagamento invalido")
-            return jsonify({"msg": "Metodo de pagamento invalido"}), 400
-        
-        items = data.get('items', [])
-        if not isinstance(items, list) or len(items) == 0:
-            return jsonify({"msg": "Itens obrigatorios"}), 400
-        
-        subtotal = safe_decimal(data.get('subtotal', 0))
-        item_discounts_total = safe_decimal(data.get('itemDiscountsTotal', 0))
-        global_discount_percent = safe_decimal(data.get('globalDiscountPercent', 0))
-        global_discount_amount = safe_decimal(data.get('globalDiscountAmount', 0))
-        total_amount = safe_decimal(data.get('totalAmount', 0))
-        
-        if subtotal < 0 or item_discounts_total < 0 or global_discount_percent < 0 or global_discount_amount < 0:
-            return jsonify({"msg": "Valores nao podem ser negativos"}), 400
-        
-        if global_discount_percent > 100:
-            return jsonify({"msg": "Percentual de desconto nao pode exceder 100%"}), 400
-        
-        if total_amount <= 0:
-            return jsonify({"msg": "Total deve ser maior que zero"}), 400
-        
-        payer_nome = str(data.get('payer', {}).get('nome', 'Cliente'))[:100]
-        receiver_nome = str(data.get('receiver', {}).get('nome', 'Sweet Home'))[:100]
-        description = str(data.get('description', 'Venda'))[:100]
-        
-        comprovante = Comprovante(
-            qtd=sum(item.get('quantity', 0) for item in items) if items else int(data.get('qtd', 1)),
-            value=total_amount,
-            payment_type=payment_type,
-            payer={"nome": payer_nome},
-            receiver={"nome": receiver_nome},
-            description=description,
-            items=items,
-            subtotal=subtotal,
-            itemDiscountsTotal=item_discounts_total,
-            globalDiscountPercent=global_discount_percent,
-            globalDiscountAmount=global_discount_amount,
-            totalAmount=total_amount
-        )
+            comprovante, priced = comprovante_from_payload(data, barcode_str=barcode)
+        except ValueError as e:
+            return invalid_sale_response(e)
+
+        if wants_receipt and not escpos and not get_receipt_template().fits_page(comprovante):
+            log_warn("Comprovante excede altura maxima")
+            return jsonify({"msg": "Comprovante excede altura maxima, finalize com receipt=false"}), 422
 
         log_info(f"Comprovante criado")
 
-        path = str(pathlib.Path(__file__).parent.resolve())
-        qrcode_path = generate_qrcode(path)
-        barcode_path = generate_barcode(comprovante.barcode_str, path)
-        
-        if not qrcode_path:
-            log_warn("Geracao de QR code falhou")
-        if not barcode_path:
-            log_warn("Geracao de barcode falhou")
-        
-        html_content = generate_html(comprovante, username, qrcode_path or "", barcode_path or "")
-        pdf_path = format_sales_receipt(html_content, path)
-        
-        if not pdf_path:
-            log_error("Geracao de PDF retornou None")
-            return jsonify({"msg": "Erro ao gerar comprovante"}), 500
-        
-        pdf_bytes = read_bytes(pdf_path)
+        sale = build_sale_document(comprovante, data, user_id, username, total_cost=priced.totalCost)
+        try:
+            transaction_id, created = await loop.run_in_executor(None, save_sale, sale, user_id, idempotency_key)
+        except AlreadyStored:
+            return jsonify({"msg": "Venda ja registrada com este transaction_id ou codigo de barras"}), 409
+        if not transaction_id:
+            return jsonify({"msg": "Erro ao registrar venda"}), 500
+        if not created:
+            return await replay_sale(transaction_id, username, wants_receipt, escpos)
+
+        if not wants_receipt:
+            response = jsonify({"transaction_id": transaction_id, "barcode": comprovante.barcode_str})
+            response.headers['X-Transaction-Id'] = transaction_id
+            return response, 201
+
+        if escpos:
+            try:
+                response = escpos_response(render_escpos(comprovante, username), "comprovante.bin")
+            except Exception as e:
+                log_error(f"Erro ao gerar ESC/POS: {str(e)}")
+                return receipt_failed_response(transaction_id, comprovante.barcode_str)
+            response.headers['X-Transaction-Id'] = transaction_id
+            return response
+
+        pdf_bytes = await loop.run_in_executor(None, render_sales_receipt, comprovante, username)
         if not pdf_bytes:
-            return jsonify({"msg": "Falha ao ler arquivo PDF"}), 500
-            
-        pdf_buffer = io.BytesIO(pdf_bytes)
+            return receipt_failed_response(transaction_id, comprovante.barcode_str)
+
+        etag = receipt_cache.put(transaction_id, pdf_bytes)
+        response = pdf_response(pdf_bytes, etag, "comprovante.pdf")
+        response.headers['X-Transaction-Id'] = transaction_id
+        return response
+
+    except Exception as e:
+        log_error(f"Erro inesperado")
+        return jsonify({"msg": "Erro interno do servidor"}), 500
+
+@sales.post('/receipts/batch')
+@jwt_required
+async def batch_receipts():
+    current_user = get_jwt_identity()
+    if not current_user:
+        return jsonify({"msg": "Nao autorizado"}), 401
+
+    username = current_user.get('username', 'Usuario')
+
+    data = await request.get_json()
+    if not isinstance(data, dict):
+        return jsonify({"msg": "Corpo da requisicao vazio"}), 400
+
+    output_format = str(data.get('format', 'pdf')).lower()
+    if output_format not in ('pdf', 'zip'):
+        return jsonify({"msg": "Formato invalido"}), 400
+
+    try:
+        loop = asyncio.get_running_loop()
+        transaction_ids = data.get('transaction_ids')
+        start_date = data.get('start_date')
+        end_date = data.get('end_date')
+
+        if transaction_ids is not None:
+            if not isinstance(transaction_ids, list) or not all(isinstance(t, str) and t for t in transaction_ids):
+                return jsonify({"msg": "transaction_ids invalido"}), 400
+            if len(transaction_ids) > MAX_BATCH_SIZE:
+                return jsonify({"msg": f"Maximo de {MAX_BATCH_SIZE} comprovantes por lote"}), 400
+            stored_sales = await loop.run_in_executor(None, get_sales_by_ids, list(dict.fromkeys(transaction_ids)))
+        elif is_iso_date(start_date) and is_iso_date(end_date):
+            if start_date > end_date:
+                return jsonify({"msg": "Periodo invalido"}), 400
+            stored_sales = await loop.run_in_executor(
+                None, get_sales_by_date_range, start_date, end_date, MAX_BATCH_SIZE + 1
+            )
+            if len(stored_sales) > MAX_BATCH_SIZE:
+                return jsonify({"msg": f"Maximo de {MAX_BATCH_SIZE} comprovantes por lote"}), 400
+        else:
+            return jsonify({"msg": "Informe transaction_ids ou start_date e end_date"}), 400
+
+        if not stored_sales:
+            return jsonify({"msg": "Nenhuma venda encontrada"}), 404
+
+        log_info(f"Reimpressao em lote de {len(stored_sales)} comprovantes ({output_format})")
+
+        if output_format == 'zip':
+            response = Response(
+                stream_zip(stored_sales, username),
+                mimetype='application/zip',
+                headers={"Content-Disposition": 'attachment; filename="comprovantes.zip"'}
+            )
+            response.timeout = None
+            return response
+
+        pdf_bytes = await render_merged(stored_sales, username)
+        if not pdf_bytes:
+            return jsonify({"msg": "Erro ao gerar comprovantes"}), 500
 
         return await send_file(
-            filename_or_io=pdf_buffer,
+            filename_or_io=io.BytesIO(pdf_bytes),
             mimetype='application/pdf',
-            attachment_filename="comprovante.pdf",
-            as_attachment=True 
+            attachment_filename="comprovantes.pdf",
+            as_attachment=True
         )
 
     except Exception as e:
-        log_error(f"Erro inesperado")
-        return jsonify({"msg": "Erro interno do servidor"}), 500
\ No newline at end of file
+        log_error(f"Erro na reimpressao em lote: {str(e)}")
+        return jsonify({"msg": "Erro interno do servidor"}), 500
+
+@sales.get('/receipts/<transaction_id>')
+@jwt_required
+async def reprint_receipt(transaction_id: str):
+    current_user = get_jwt_identity()
+    if not current_user:
+        return jsonify({"msg": "Nao autorizado"}), 401
+
+    if not transaction_id or len(transaction_id) > 64:
+        return jsonify({"msg": "transaction_id invalido"}), 400
+
+    try:
+        if wants_escpos():
+            payload = await escpos_for_transaction(transaction_id, current_user.get('username', 'Usuario'))
+            if not payload:
+                return jsonify({"msg": "Comprovante nao encontrado"}), 404
+            etag = content_hash(payload)
+            if request.if_none_match.contains(etag):
+                return not_modified(etag)
+            return escpos_response(payload, f"comprovante_{transaction_id}.bin")
+
+        receipt = await receipt_for_transaction(transaction_id, current_user.get('username', 'Usuario'))
+        if not receipt:
+            return jsonify({"msg": "Comprovante nao encontrado"}), 404
+
+        etag, pdf_bytes = receipt
+        if request.if_none_match.contains(etag):
+            return not_modified(etag)
+        return pdf_response(pdf_bytes, etag, f"comprovante_{transaction_id}.pdf")
+
+    except Exception as e:
+        log_error(f"Erro na reimpressao: {str(e)}")
+        return jsonify({"msg": "Erro interno do servidor"}), 500
+
+@sales.get('/barcode/<barcode>')
+@jwt_required
+async def sale_by_barcode(barcode: str):
+    current_user = get_jwt_identity()
+    if not current_user:
+        return jsonify({"msg": "Nao autorizado"}), 401
+
+    if not is_valid_ean13(barcode):
+        return jsonify({"msg": "Codigo de barras invalido"}), 400
+
+    try:
+        loop = asyncio.get_running_loop()
+        transaction_id = await loop.run_in_executor(None, find_sale_by_barcode, barcode)
+        sales_found = await loop.run_in_executor(None, get_sales_by_ids, [transaction_id]) if transaction_id else []
+        if not sales_found:
+            return jsonify({"msg": "Venda nao encontrada"}), 404
+        return jsonify({"transaction_id": transaction_id, "sale": sales_found[0]}), 200
+
+    except Exception as e:
+        log_error(f"Erro na busca por codigo de barras: {str(e)}")
+        return jsonify({"msg": "Erro interno do servidor"}), 500
+
+@sales.post('/bulk')
+@jwt_required
+async def bulk_ingest():
+    """Receber vendas feitas offline em NDJSON, uma venda por linha, e grava-las em lotes."""
+    current_user = get_jwt_identity()
+    if not current_user:
+        return jsonify({"msg": "Nao autorizado"}), 401
+
+    user_id = current_user.get('id')
+    username = current_user.get('username', 'Usuario')
+    wants_receipts = request.args.get('receipt', 'false').lower() == 'true'
+
+    parsed, duplicates, errors = {}, [], []
+    try:
+        line_number = 0
+        async for line in ndjson_lines(request.body):
+            line_number += 1
+            if not line.strip():
+                continue
+            if len(parsed) + len(duplicates) + len(errors) >= MAX_BULK_SALES:
+                return jsonify({"msg": f"Maximo de {MAX_BULK_SALES} vendas por envio"}), 413
+            try:
+                data = json.loads(line)
+                if not isinstance(data, dict):
+                    raise ValueError("Venda invalida")
+                transaction_id = str(data.get('transaction_id') or data.get('saleId') or '')
+                if len(transaction_id) > MAX_TRANSACTION_ID_LENGTH or not valid_document_id(transaction_id):
+                    raise ValueError("transaction_id invalido")
+                if transaction_id in parsed:
+                    duplicates.append(transaction_id)
+                    continue
+                parsed[transaction_id] = (line_number, data, bulk_timestamp(data.get('timestamp')))
+            except json.JSONDecodeError:
+                errors.append({"line": line_number, "msg": "JSON invalido"})
+            except ValueError as e:
+                errors.append(line_error(line_number, e))
+    except ValueError as e:
+        log_error(f"Erro ao ler lote de vendas: {str(e)}")
+        return jsonify({"msg": str(e)}), 413
+
+    try:
+        loop = asyncio.get_running_loop()
+        barcodes = await loop.run_in_executor(None, next_barcodes, len(parsed))
+        pending = {}
+        for (transaction_id, (line_number, data, issued_at)), barcode in zip(parsed.items(), barcodes):
+            try:
+                comprovante, priced = comprovante_from_payload(
+                    data, transaction_id=transaction_id, timestamp=issued_at, barcode_str=barcode
+                )
+                pending[transaction_id] = build_sale_document(comprovante, data, user_id, username, total_cost=priced.totalCost)
+            except ValueError as e:
+                errors.append(line_error(line_number, e))
+        errors.sort(key=lambda error: error["line"])
+
+        created, stored_duplicates, failed = await loop.run_in_executor(None, save_sales_batch, list(pending.values()))
+        duplicates = list(dict.fromkeys(duplicates + stored_duplicates))
+
+        if wants_receipts and created:
+            rendered = await asyncio.gather(*(render_single(pending[tid], username) for tid in created))
+            for transaction_id, pdf_bytes in rendered:
+                if pdf_bytes:
+                    receipt_cache.put(transaction_id, pdf_bytes)
+
+        log_info(f"Lote offline processado: {len(created)} criadas, {len(errors)} invalidas")
+        return jsonify({"created": created, "duplicates": duplicates, "failed": failed, "errors": errors}), 200
+
+    except Exception as e:
+        log_error(f"Erro na importacao em lote: {str(e)}")
+        return jsonify({"msg": "Erro interno do servidor"}), 500
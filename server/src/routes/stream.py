@@ -0,0 +1,51 @@
+import asyncio
+import json
+
+from quart import Blueprint, Response, jsonify
+from quart_jwt_extended import jwt_required
+
+from server.src.services.sales_stream import STREAM_HEARTBEAT_SECONDS, sales_broker, sales_snapshot
+from server.src.utils.logger import log_info, log_error
+
+stream = Blueprint('stream', __name__)
+
+def sse_event(event: str, data: dict) -> bytes:
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False, separators=(',', ':'))}\n\n".encode()
+
+@stream.get('/sales')
+@jwt_required
+async def sales_stream():
+    """Server-Sent Events: um `snapshot` com o resumo do dia e depois um `sale` por venda gravada."""
+    try:
+        snapshot = sales_snapshot()
+    except Exception as e:
+        log_error(f"Erro ao carregar resumo de vendas: {str(e)}")
+        return jsonify({"msg": "Erro interno do servidor"}), 500
+
+    queue = sales_broker.subscribe()
+    if queue is None:
+        return jsonify({"msg": "Limite de conexoes atingido"}), 503
+    log_info(f"Stream de vendas aberto ({len(sales_broker)} clientes)")
+
+    async def events():
+        try:
+            yield sse_event('snapshot', snapshot)
+            while True:
+                try:
+                    event = await asyncio.wait_for(queue.get(), timeout=STREAM_HEARTBEAT_SECONDS)
+                except asyncio.TimeoutError:
+                    yield b": ping\n\n"
+                    continue
+                if event is None:
+                    return
+                yield sse_event('sale', event)
+        finally:
+            sales_broker.unsubscribe(queue)
+
+    response = Response(
+        events(),
+        mimetype='text/event-stream',
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+    response.timeout = None
+    return response
@@ -0,0 +1,76 @@
+import os
+import threading
+
+from server.src.storage.backend import get_storage
+from server.src.utils.utils import ean13_check_digit
+from server.src.utils.logger import log_info, log_error
+
+BARCODE_PREFIX = '2'
+SHARD_DIGITS = 2
+SEQUENCE_DIGITS = 9
+SEQUENCE_BLOCK = int(os.getenv('BARCODE_SEQUENCE_BLOCK', '100'))
+
+def configured_shard() -> int:
+    """Shard de BARCODE_SHARD (0 a 99). Obrigatorio: instancias que nao dividem o armazenamento
+    precisam de shards diferentes para nao gerar os mesmos codigos.
+    """
+    configured = os.getenv('BARCODE_SHARD', '').strip()
+    if not configured.isdigit() or int(configured) >= 10 ** SHARD_DIGITS:
+        raise RuntimeError(f'BARCODE_SHARD deve ser um numero de 0 a {10 ** SHARD_DIGITS - 1}')
+    return int(configured)
+
+class BarcodeSequence:
+    """Sequencia monotonica por shard, reservada em blocos no armazenamento configurado.
+
+    Codigo: prefixo 2 (uso interno EAN) + shard (2 digitos) + sequencia (9 digitos) + verificador.
+    Os blocos sao reservados em transacao no armazenamento, entao workers com o mesmo shard e
+    reinicios do processo nunca repetem um codigo.
+    """
+
+    def __init__(self, shard: int | None = None, block_size: int = SEQUENCE_BLOCK):
+        self._shard = shard
+        self.block_size = block_size
+        self._next = 0
+        self._limit = 0
+        self._lock = threading.Lock()
+
+    @property
+    def shard(self) -> int:
+        if self._shard is None:
+            self._shard = configured_shard()
+        return self._shard
+
+    def next_barcode(self) -> str:
+        with self._lock:
+            if self._next >= self._limit:
+                self._next = self._lease_block()
+                self._limit = self._next + self.block_size
+            sequence = self._next
+            self._next += 1
+
+        if sequence >= 10 ** SEQUENCE_DIGITS:
+            raise RuntimeError('Sequencia de codigos de barras esgotada')
+        digits = f"{BARCODE_PREFIX}{self.shard:0{SHARD_DIGITS}d}{sequence:0{SEQUENCE_DIGITS}d}"
+        return digits + ean13_check_digit(digits)
+
+    def _lease_block(self) -> int:
+        try:
+            start = get_storage().sequences.lease(f"{self.shard:0{SHARD_DIGITS}d}", self.block_size)
+            log_info(f'Bloco de codigos de barras reservado: shard {self.shard}, inicio {start}')
+            return start
+        except Exception as e:
+            log_error(f'Erro ao reservar bloco de codigos de barras: {str(e)}')
+            raise
+
+barcode_sequence = BarcodeSequence()
+
+def start_barcode_sequence():
+    """Validar o shard na subida do servidor em vez de falhar na primeira venda."""
+    log_info(f'Codigos de barras no shard {barcode_sequence.shard}')
+
+def next_barcode() -> str:
+    """Proximo codigo de barras; pode reservar um bloco no armazenamento, entao nao chamar no event loop."""
+    return barcode_sequence.next_barcode()
+
+def next_barcodes(count: int) -> list[str]:
+    return [barcode_sequence.next_barcode() for _ in range(count)]
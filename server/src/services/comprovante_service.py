@@ -1,11 +1,18 @@
 import os
 from decimal import Decimal
 from pathlib import Path
-from fpdf import FPDF
+from server.src.services.receipt_template import get_receipt_template
 from server.src.utils.logger import log_debug, log_info, log_error
 
 MAX_PDF_SIZE = 5 * 1024 * 1024
 MAX_HTML_SIZE = 500 * 1024
+# Tamanho do comprovante no caminho legado (HTML + PNGs), ajustado com benchmarks/bench_pdf_profiles.py.
+LEGACY_PDF_BASE_BYTES = 6170
+LEGACY_PDF_ITEM_BYTES = 76
+
+def legacy_pdf_size(comprovante) -> int:
+    """Estimativa do tamanho que o caminho legado geraria para o comprovante."""
+    return LEGACY_PDF_BASE_BYTES + LEGACY_PDF_ITEM_BYTES * len(comprovante.items or [])
 
 def sanitize_html_for_pdf(html_string):
     if not isinstance(html_string, str):
@@ -40,25 +47,11 @@ def format_sales_receipt(html_string: str, base_path: str) -> str | None:
             log_error("HTML falhou na sanitizacao")
             return None
         
-        if not isinstance(base_path, str):
-            log_error('Base path invalido')
-            return None
-        
-        comprovante_dir = os.path.join(str(base_path), 'comprovante')
-        
-        if '..' in comprovante_dir or comprovante_dir.count('..') > 0:
-            log_error('Path traversal detectado')
-            return None
-        
-        if not os.path.exists(comprovante_dir):
-            os.makedirs(comprovante_dir, mode=0o700)
-        
-        pdf_path = os.path.join(comprovante_dir, 'comprovante.pdf')
-        
-        if len(pdf_path) > 260:
-            log_error('Caminho do PDF muito longo')
+        pdf_path = _receipt_output_path(base_path)
+        if not pdf_path:
             return None
 
+        from fpdf import FPDF
         pdf = FPDF(orientation='P', unit='mm', format=[80, 200])
         pdf.add_page()
         pdf.set_auto_page_break(auto=True, margin=5)
@@ -66,21 +59,62 @@ def format_sales_receipt(html_string: str, base_path: str) -> str | None:
         
         pdf.write_html(sanitized_html)
         pdf.output(pdf_path)
+        return _finalize_receipt_file(pdf_path)
         
-        if not os.path.exists(pdf_path):
-            log_error(f"Arquivo PDF nao foi criado")
-            return None
-        
-        file_size = os.path.getsize(pdf_path)
-        if file_size > MAX_PDF_SIZE:
-            os.remove(pdf_path)
-            log_error(f"PDF excede tamanho maximo")
+    except Exception as e:
+        log_error(f"Erro ao gerar PDF: {str(e)}")
+        return None
+
+def render_sales_receipt(comprovante, username: str) -> bytes | None:
+    try:
+        pdf_bytes = get_receipt_template().render(comprovante, username)
+        if len(pdf_bytes) > MAX_PDF_SIZE:
+            log_error("PDF excede tamanho maximo")
             return None
-        
-        os.chmod(pdf_path, 0o600)
-        log_info(f"PDF salvo com sucesso")
-        return pdf_path
-        
+
+        legacy_bytes = legacy_pdf_size(comprovante)
+        log_info(
+            f"PDF gerado com sucesso: {len(pdf_bytes)} bytes "
+            f"(legado estimado: {legacy_bytes} bytes, {100 - 100 * len(pdf_bytes) // legacy_bytes}% menor)"
+        )
+        return pdf_bytes
+
     except Exception as e:
         log_error(f"Erro ao gerar PDF: {str(e)}")
-        return None
\ No newline at end of file
+        return None
+
+def _receipt_output_path(base_path: str) -> str | None:
+    if not isinstance(base_path, str):
+        log_error('Base path invalido')
+        return None
+    
+    comprovante_dir = os.path.join(str(base_path), 'comprovante')
+    
+    if '..' in comprovante_dir or comprovante_dir.count('..') > 0:
+        log_error('Path traversal detectado')
+        return None
+    
+    if not os.path.exists(comprovante_dir):
+        os.makedirs(comprovante_dir, mode=0o700)
+    
+    pdf_path = os.path.join(comprovante_dir, 'comprovante.pdf')
+    
+    if len(pdf_path) > 260:
+        log_error('Caminho do PDF muito longo')
+        return None
+    return pdf_path
+
+def _finalize_receipt_file(pdf_path: str) -> str | None:
+    if not os.path.exists(pdf_path):
+        log_error(f"Arquivo PDF nao foi criado")
+        return None
+    
+    file_size = os.path.getsize(pdf_path)
+    if file_size > MAX_PDF_SIZE:
+        os.remove(pdf_path)
+        log_error(f"PDF excede tamanho maximo")
+        return None
+    
+    os.chmod(pdf_path, 0o600)
+    log_info(f"PDF salvo com sucesso")
+    return pdf_path
@@ -0,0 +1,151 @@
+import threading
+
+from server.src.services.firebase_auth_service import get_firebase_db
+from server.src.storage.base import INGREDIENTS_COLLECTION, SWEETS_COLLECTION
+from server.src.utils.logger import log_info, log_warn, log_error
+
+RECIPES_COLLECTION = 'recipes'
+
+class CostEngine:
+    """Custo unitario de cada doce, pre-calculado a partir de indices de ingredientes e receitas.
+
+    Um indice reverso ingrediente -> doces permite recalcular apenas os doces afetados
+    quando o preco de um ingrediente muda. Os ids de doces e ingredientes existentes tambem ficam
+    indexados para a baixa de estoque nao apontar para documentos apagados.
+    """
+
+    def __init__(self):
+        self._sweet_ids: set[str] = set()
+        self._ingredient_ids: set[str] = set()
+        self._ingredient_costs: dict[str, float] = {}
+        self._recipes: dict[str, tuple[tuple[str, float], ...]] = {}
+        self._used_by: dict[str, set[str]] = {}
+        self._unit_costs: dict[str, float] = {}
+        self._lock = threading.Lock()
+        self.loaded = False
+
+    def load(self, ingredients: list[dict], recipes: list[dict], sweets: list[dict] = ()):
+        with self._lock:
+            self._sweet_ids = {str(sweet['id']) for sweet in sweets}
+            self._ingredient_ids = {str(ingredient['id']) for ingredient in ingredients}
+            self._ingredient_costs = {
+                str(ingredient['id']): float(ingredient['costPerBaseUnit'])
+                for ingredient in ingredients
+                if isinstance(ingredient.get('costPerBaseUnit'), (int, float))
+            }
+            self._recipes = {}
+            self._used_by = {}
+            for recipe in recipes:
+                self._index_recipe(str(recipe['id']), recipe.get('ingredients') or [])
+            self._unit_costs = {sweet_id: self._compute(sweet_id) for sweet_id in self._recipes}
+            self.loaded = True
+        log_info(f'Custos calculados para {len(self._unit_costs)} doces')
+
+    def set_sweet(self, sweet_id: str, exists: bool):
+        with self._lock:
+            if exists:
+                self._sweet_ids.add(str(sweet_id))
+            else:
+                self._sweet_ids.discard(str(sweet_id))
+
+    def set_ingredient_cost(self, ingredient_id: str, cost_per_base_unit: float | None,
+                            exists: bool = True) -> set[str]:
+        """Atualizar o custo de um ingrediente e recalcular so os doces que o usam."""
+        ingredient_id = str(ingredient_id)
+        with self._lock:
+            if exists:
+                self._ingredient_ids.add(ingredient_id)
+            else:
+                self._ingredient_ids.discard(ingredient_id)
+            if isinstance(cost_per_base_unit, (int, float)):
+                self._ingredient_costs[ingredient_id] = float(cost_per_base_unit)
+            else:
+                self._ingredient_costs.pop(ingredient_id, None)
+            affected = set(self._used_by.get(ingredient_id, ()))
+            for sweet_id in affected:
+                self._unit_costs[sweet_id] = self._compute(sweet_id)
+        return affected
+
+    def set_recipe(self, sweet_id: str, lines: list[dict] | None):
+        sweet_id = str(sweet_id)
+        with self._lock:
+            for ingredient_id, _ in self._recipes.pop(sweet_id, ()):
+                self._used_by.get(ingredient_id, set()).discard(sweet_id)
+            if lines is None:
+                self._unit_costs.pop(sweet_id, None)
+                return
+            self._index_recipe(sweet_id, lines)
+            self._unit_costs[sweet_id] = self._compute(sweet_id)
+
+    def exists(self, collection: str, doc_id: str) -> bool:
+        """Se o doce ou ingrediente existe no Firestore, segundo o indice carregado."""
+        ids = self._sweet_ids if collection == SWEETS_COLLECTION else self._ingredient_ids
+        return str(doc_id) in ids
+
+    def unit_cost(self, sweet_id) -> float | None:
+        return self._unit_costs.get(str(sweet_id))
+
+    def recipe_lines(self, sweet_id) -> tuple[tuple[str, float], ...]:
+        """Pares (ingrediente, quantidade na unidade base) da receita de um doce."""
+        return self._recipes.get(str(sweet_id), ())
+
+    def _index_recipe(self, sweet_id: str, lines: list[dict]):
+        parsed = []
+        for line in lines:
+            ingredient_id = str(line.get('ingredientId'))
+            parsed.append((ingredient_id, float(line.get('quantityInBaseUnit', 0) or 0)))
+            self._used_by.setdefault(ingredient_id, set()).add(sweet_id)
+        self._recipes[sweet_id] = tuple(parsed)
+
+    def _compute(self, sweet_id: str) -> float:
+        total = 0.0
+        for ingredient_id, quantity in self._recipes.get(sweet_id, ()):
+            cost = self._ingredient_costs.get(ingredient_id)
+            if cost is None:
+                continue
+            total += quantity * cost
+        return round(total * 10000) / 10000
+
+cost_engine = CostEngine()
+_watches = []
+
+def start_cost_engine():
+    """Carregar doces, ingredientes e receitas e acompanhar alteracoes pelos listeners do Firestore."""
+    firebase_db = get_firebase_db()
+    if not firebase_db:
+        log_warn('Firebase não inicializado, custos ficam a cargo do cliente')
+        return
+
+    try:
+        ingredients = [{"id": doc.id, **doc.to_dict()} for doc in firebase_db.collection(INGREDIENTS_COLLECTION).stream()]
+        recipes = [{"id": doc.id, **doc.to_dict()} for doc in firebase_db.collection(RECIPES_COLLECTION).stream()]
+        sweets = [{"id": doc.id} for doc in firebase_db.collection(SWEETS_COLLECTION).stream()]
+        cost_engine.load(ingredients, recipes, sweets)
+
+        _watches.append(firebase_db.collection(SWEETS_COLLECTION).on_snapshot(_on_sweets_change))
+        _watches.append(firebase_db.collection(INGREDIENTS_COLLECTION).on_snapshot(_on_ingredients_change))
+        _watches.append(firebase_db.collection(RECIPES_COLLECTION).on_snapshot(_on_recipes_change))
+    except Exception as e:
+        log_error(f'Erro ao iniciar motor de custos: {str(e)}')
+
+def stop_cost_engine():
+    while _watches:
+        _watches.pop().unsubscribe()
+
+def _on_sweets_change(_snapshot, changes, _read_time):
+    for change in changes:
+        cost_engine.set_sweet(change.document.id, change.type.name != 'REMOVED')
+
+def _on_ingredients_change(_snapshot, changes, _read_time):
+    for change in changes:
+        data = None if change.type.name == 'REMOVED' else change.document.to_dict()
+        affected = cost_engine.set_ingredient_cost(
+            change.document.id, (data or {}).get('costPerBaseUnit'), exists=data is not None
+        )
+        if affected:
+            log_info(f'Custo recalculado para {len(affected)} doces')
+
+def _on_recipes_change(_snapshot, changes, _read_time):
+    for change in changes:
+        lines = None if change.type.name == 'REMOVED' else (change.document.to_dict().get('ingredients') or [])
+        cost_engine.set_recipe(change.document.id, lines)
@@ -0,0 +1,117 @@
+import os
+
+from server.src.services.generate_pdf import QRCODE_URL
+
+ESCPOS_MIMETYPE = 'application/vnd.escpos'
+ESCPOS_COLUMNS = int(os.getenv('ESCPOS_COLUMNS', '48'))
+ESCPOS_ENCODING = 'cp860'
+
+ESC = b'\x1b'
+GS = b'\x1d'
+LF = b'\n'
+
+INIT = ESC + b'@'
+CODEPAGE_PC860 = ESC + b't\x03'
+ALIGN_LEFT = ESC + b'a\x00'
+ALIGN_CENTER = ESC + b'a\x01'
+BOLD_ON = ESC + b'E\x01'
+BOLD_OFF = ESC + b'E\x00'
+DOUBLE_SIZE = GS + b'!\x11'
+NORMAL_SIZE = GS + b'!\x00'
+FEED_AND_CUT = GS + b'V\x42\x03'
+
+BARCODE_HEIGHT = 80
+BARCODE_MODULE_WIDTH = 2
+QRCODE_MODULE_SIZE = 6
+
+QTY_WIDTH = 7
+PRICE_WIDTH = 10
+
+def render_escpos(comprovante, username: str, columns: int = ESCPOS_COLUMNS) -> bytes:
+    """Cupom em comandos ESC/POS, com codigo de barras e QR code gerados pela propria impressora."""
+    out = bytearray(INIT + CODEPAGE_PC860)
+    rule = _text('-' * columns) + LF
+
+    out += ALIGN_CENTER + BOLD_ON + DOUBLE_SIZE + _text("Sweet Home") + LF + NORMAL_SIZE
+    out += _text(f"Operador: {str(username)[:50] if username else 'Operador'}") + LF
+    out += _text(f"Cliente: {comprovante.payer.get('nome', 'Cliente')}") + LF
+    out += _text(f"ID {comprovante.transaction_id}") + LF
+    out += _text("CUPOM FISCAL ELETRONICO") + LF + BOLD_OFF
+    out += ALIGN_LEFT + rule
+
+    name_width = columns - QTY_WIDTH - 2 * PRICE_WIDTH
+    out += BOLD_ON + _row(("DESCRICAO", "QTD", "VL. UNIT.", "VL. ITEM"), name_width) + BOLD_OFF
+    for item in comprovante.items or []:
+        quantity = item.get('quantity', 0)
+        unit_price = float(item.get('priceAtSale', 0) or 0)
+        subtotal = float(item.get('subtotal', 0) or 0)
+        discount = float(item.get('itemDiscount', 0) or 0)
+        name = str(item.get('sweetName', 'Produto'))
+        out += _row((name, f"{quantity} UN", f"{unit_price:.2f}", f"{subtotal:.2f}"), name_width)
+        if discount > 0:
+            discounted = float(item.get('discountedAmount', 0) or 0)
+            out += _pair(f"  Desconto item ({discount}%)", f"-{discounted:.2f}", columns)
+    out += rule
+
+    out += _pair("Subtotal", f"{float(comprovante.subtotal or 0):.2f}", columns)
+    if comprovante.itemDiscountsTotal and comprovante.itemDiscountsTotal > 0:
+        out += _pair("Desconto em itens", f"-{float(comprovante.itemDiscountsTotal):.2f}", columns)
+    if comprovante.globalDiscountPercent and comprovante.globalDiscountPercent > 0:
+        out += _pair(
+            f"Desconto global ({float(comprovante.globalDiscountPercent)}%)",
+            f"-{float(comprovante.globalDiscountAmount or 0):.2f}",
+            columns
+        )
+    total_amount = float(comprovante.totalAmount or 0)
+    out += _pair(comprovante.payment_type.value, f"{total_amount:.2f}", columns)
+    out += BOLD_ON + _pair(f"TOTAL R$: {total_amount:.2f}", comprovante.timestamp, columns) + BOLD_OFF
+    out += rule
+
+    out += ALIGN_CENTER + _code128(comprovante.barcode_str) + LF
+    out += _qrcode(QRCODE_URL) + LF
+    out += FEED_AND_CUT
+    return bytes(out)
+
+def _text(value: str) -> bytes:
+    return value.encode(ESCPOS_ENCODING, 'replace')
+
+def _row(values: tuple, name_width: int) -> bytes:
+    name, quantity, unit_price, subtotal = values
+    return _text(
+        name[:name_width].ljust(name_width)
+        + quantity[:QTY_WIDTH].rjust(QTY_WIDTH)
+        + unit_price[:PRICE_WIDTH].rjust(PRICE_WIDTH)
+        + subtotal[:PRICE_WIDTH].rjust(PRICE_WIDTH)
+    ) + LF
+
+def _pair(label: str, amount: str, columns: int) -> bytes:
+    label = label[:columns - len(amount) - 1]
+    return _text(label + amount.rjust(columns - len(label))) + LF
+
+def _code128(code: str) -> bytes:
+    """GS k 73: Code128 com o conjunto C para os pares de digitos e B para o digito restante."""
+    digits = ''.join(filter(str.isdigit, str(code or '')))
+    if not digits:
+        return b''
+    even = len(digits) - len(digits) % 2
+    data = bytearray(b'{C' + bytes(int(digits[i:i + 2]) for i in range(0, even, 2)))
+    if even < len(digits):
+        data += b'{B' + digits[even:].encode('ascii')
+    return (
+        GS + b'h' + bytes([BARCODE_HEIGHT])
+        + GS + b'w' + bytes([BARCODE_MODULE_WIDTH])
+        + GS + b'H\x02'
+        + GS + b'k\x49' + bytes([len(data)]) + bytes(data)
+    )
+
+def _qrcode(url: str) -> bytes:
+    """GS ( k: modelo 2, tamanho do modulo, correcao M, armazenar e imprimir."""
+    data = url.encode('ascii')
+    store_length = len(data) + 3
+    return (
+        GS + b'(k\x04\x001A2\x00'
+        + GS + b'(k\x03\x001C' + bytes([QRCODE_MODULE_SIZE])
+        + GS + b'(k\x03\x001E1'
+        + GS + b'(k' + bytes([store_length % 256, store_length // 256]) + b'1P0' + data
+        + GS + b'(k\x03\x001Q0'
+    )
@@ -0,0 +1,97 @@
+"""Exportacao de vendas e estoque em CSV ou NDJSON, gerada pagina a pagina.
+
+Cada pagina e lida do armazenamento fora do event loop, convertida e enviada antes da proxima,
+entao a memoria usada nao depende do tamanho do historico.
+"""
+import asyncio
+import csv
+import io
+import json
+import zlib
+
+from server.src.services.inventory_service import iter_inventory_pages
+from server.src.services.sales_store import iter_sales_pages
+from server.src.storage.backend import get_storage
+from server.src.storage.base import INGREDIENTS_COLLECTION, SWEETS_COLLECTION
+
+EXPORT_PAGE_SIZE = 500
+EXPORT_FORMATS = {'csv': 'text/csv', 'ndjson': 'application/x-ndjson'}
+
+# Mesmas colunas do csvService.js do frontend, para o arquivo poder ser importado de volta.
+EXPORT_COLUMNS = {
+    'sales': (
+        'id', 'date', 'timestamp', 'itemCount', 'totalAmount',
+        'totalCost', 'totalProfit', 'operatorName', 'items'
+    ),
+    SWEETS_COLLECTION: (
+        'id', 'name', 'stock', 'price', 'expiry_date',
+        'unitName', 'unitWeight', 'image', 'observations'
+    ),
+    INGREDIENTS_COLLECTION: (
+        'id', 'name', 'brand', 'purchaseDate', 'expiryDate',
+        'stockInBaseUnit', 'baseUnit', 'displayUnit', 'displayUnitFactor',
+        'displayUnitPrice', 'costPerBaseUnit', 'observations'
+    ),
+}
+
+def export_available(dataset: str) -> bool:
+    """Vendas sempre; doces e ingredientes so quando o armazenamento guarda o estoque atual."""
+    return dataset == 'sales' or get_storage().inventory.tracks_stock
+
+def export_pages(dataset: str, start_date: str | None = None, end_date: str | None = None,
+                 page_size: int = EXPORT_PAGE_SIZE):
+    if dataset == 'sales':
+        return iter_sales_pages(start_date, end_date, page_size=page_size)
+    return iter_inventory_pages(dataset, page_size=page_size)
+
+def csv_row(dataset: str, document: dict) -> list:
+    if dataset == 'sales':
+        document = {
+            **document,
+            "id": document.get('id') or document.get('transaction_id') or '',
+            "itemCount": len(document.get('items') or []),
+            "items": json.dumps(document.get('items') or [], ensure_ascii=False, default=str)
+        }
+    row = []
+    for column in EXPORT_COLUMNS[dataset]:
+        value = document.get(column)
+        if isinstance(value, (dict, list)):
+            value = json.dumps(value, ensure_ascii=False, default=str)
+        row.append('' if value is None else value)
+    return row
+
+def encode_page(dataset: str, output_format: str, page: list[dict]) -> bytes:
+    if output_format == 'ndjson':
+        return ''.join(
+            json.dumps(document, ensure_ascii=False, default=str, separators=(',', ':')) + '\n' for document in page
+        ).encode('utf-8')
+    buffer = io.StringIO()
+    writer = csv.writer(buffer, lineterminator='\n')
+    writer.writerows(csv_row(dataset, document) for document in page)
+    return buffer.getvalue().encode('utf-8')
+
+async def stream_export(dataset: str, output_format: str, start_date: str | None = None,
+                        end_date: str | None = None, compress: bool = False):
+    """Gerar o arquivo em pedacos: um por pagina, comprimidos com gzip quando `compress`."""
+    loop = asyncio.get_running_loop()
+    pages = export_pages(dataset, start_date, end_date)
+    compressor = zlib.compressobj(wbits=31) if compress else None
+
+    def emit(data: bytes) -> bytes:
+        return compressor.compress(data) if compressor else data
+
+    if output_format == 'csv':
+        buffer = io.StringIO()
+        csv.writer(buffer, lineterminator='\n').writerow(EXPORT_COLUMNS[dataset])
+        yield emit(buffer.getvalue().encode('utf-8'))
+
+    while True:
+        page = await loop.run_in_executor(None, next, pages, None)
+        if page is None:
+            break
+        chunk = emit(encode_page(dataset, output_format, page))
+        if chunk:
+            yield chunk
+
+    if compressor:
+        yield compressor.flush()
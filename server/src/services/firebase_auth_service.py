@@ -1,13 +1,22 @@
 import os
-import firebase_admin
-from firebase_admin import credentials, firestore
+import threading
 from server.src.models.user_model import User
+from server.src.storage.backend import get_storage
+from server.src.storage.base import AlreadyStored
 from server.src.utils.logger import log_info, log_warn, log_error
 import traceback
 import asyncio
 
+FAKE_FIRESTORE = os.getenv('FAKE_FIRESTORE', 'False').lower() == 'true'
+
 def init_firebase():
+    if FAKE_FIRESTORE:
+        from server.src.storage.fake_firestore import FakeFirestore
+        return FakeFirestore.from_env()
     try:
+        import firebase_admin
+        from firebase_admin import credentials, firestore
+
         config_paths = [
             'serviceAccountKey.json',
             '../../../serviceAccountKey.json',
@@ -36,10 +45,27 @@ def init_firebase():
         log_error(f'Erro ao inicializar Firebase: {str(e)}')
         return None
 
-firebase_db = init_firebase()
-USERS_COLLECTION = 'users'
+firebase_db = None
+_firebase_started = False
+_firebase_lock = threading.Lock()
 last_error: str | None = None
 
+def get_firebase_db():
+    """Cliente do Firestore, criado na primeira chamada; o servidor chama no before_serving."""
+    global firebase_db, _firebase_started
+    if not _firebase_started:
+        with _firebase_lock:
+            if not _firebase_started:
+                firebase_db = init_firebase()
+                _firebase_started = True
+    return firebase_db
+
+def start_auth_backend():
+    """Conectar ao Firebase, abrir o armazenamento e garantir o usuario admin antes da primeira requisicao."""
+    get_firebase_db()
+    get_storage()
+    init_default_admin()
+
 def get_last_error() -> str | None:
     return last_error
 
@@ -47,53 +73,30 @@ def clear_last_error() -> None:
     global last_error
     last_error = None
 
+def user_from_document(user_data: dict) -> User:
+    user = User(
+        id=user_data.get('id'),
+        username=user_data.get('username'),
+        email=user_data.get('email')
+    )
+    user.password_hashed = user_data.get('password_hashed', '')
+    return user
+
 async def get_user_by_username(username: str) -> User | None:
-    if not firebase_db:
-        global last_error
-        last_error = 'Firebase não inicializado'
-        log_error(last_error)
-        return None
-    
+    global last_error
     try:
-        docs = firebase_db.collection(USERS_COLLECTION).where('username', '==', username).limit(1).stream()
-        
-        for doc in docs:
-            user_data = doc.to_dict()
-            user = User(
-                id=user_data.get('id'),
-                username=user_data.get('username'),
-                email=user_data.get('email')
-            )
-            user.password_hashed = user_data.get('password_hashed', '')
-            return user
-        
-        return None
+        user_data = get_storage().users.get_by_username(username)
+        return user_from_document(user_data) if user_data else None
     except Exception as e:
         last_error = f'Erro ao buscar usuário: {str(e)}'
         log_error(last_error)
         return None
 
 async def get_user_by_id(user_id: int) -> User | None:
-    if not firebase_db:
-        global last_error
-        last_error = 'Firebase não inicializado'
-        log_error(last_error)
-        return None
-    
+    global last_error
     try:
-        doc = firebase_db.collection(USERS_COLLECTION).document(str(user_id)).get()
-        
-        if not doc.exists:
-            return None
-        
-        user_data = doc.to_dict()
-        user = User(
-            id=user_data.get('id'),
-            username=user_data.get('username'),
-            email=user_data.get('email')
-        )
-        user.password_hashed = user_data.get('password_hashed', '')
-        return user
+        user_data = get_storage().users.get_by_id(user_id)
+        return user_from_document(user_data) if user_data else None
     except Exception as e:
         last_error = f'Erro ao buscar usuário por ID: {str(e)}'
         log_error(last_error)
@@ -102,11 +105,6 @@ async def get_user_by_id(user_id: int) -> User | None:
 async def create_user(user_id: int, username: str, email: str, password: str) -> bool:
     global last_error
     clear_last_error()
-    if not firebase_db:
-        last_error = 'Firebase não inicializado'
-        log_error(last_error)
-        return False
-    
     if not isinstance(user_id, int) or user_id <= 0:
         last_error = 'user_id inválido'
         log_error(last_error)
@@ -134,31 +132,26 @@ async def create_user(user_id: int, username: str, email: str, password: str) ->
         user = User(id=user_id, username=username, email=email)
         user.set_password(password)
         
-        user_data = {
+        get_storage().users.create({
             'id': user_id,
             'username': username,
             'email': email,
             'password_hashed': user.password_hashed,
-            'created_at': firestore.SERVER_TIMESTAMP,
-            'updated_at': firestore.SERVER_TIMESTAMP,
             'active': True
-        }
-        
-        firebase_db.collection(USERS_COLLECTION).document(str(user_id)).set(user_data)
-        log_info(f'Usuário criado no Firebase: {username}')
+        })
+        log_info(f'Usuário criado: {username}')
         return True
+    except AlreadyStored:
+        last_error = f'Usuário já existe: {user_id}'
+        log_warn(last_error)
+        return False
     except Exception as e:
         last_error = f'Erro ao criar usuário: {str(e)}'
         log_error(last_error)
         return False
 
 async def authenticate(username: str, password: str) -> User | None:
-    if not firebase_db:
-        global last_error
-        last_error = 'Firebase não inicializado'
-        log_error(last_error)
-        return None
-    
+    global last_error
     if not isinstance(username, str) or not isinstance(password, str):
         log_warn('Tentativa de autenticação com tipos inválidos')
         return None
@@ -190,46 +183,36 @@ async def authenticate(username: str, password: str) -> User | None:
         return None
 
 def init_default_admin():
+    """Criar o usuario admin com a senha de ADMIN_PASSWORD. Sem ela so o Firestore recebe a senha
+    padrao historica; memoria e SQLite ficam sem admin em vez de expor uma credencial conhecida.
+    """
     try:
-        if not firebase_db:
-            log_error('Firebase não inicializado')
-            return
-        
-        docs = firebase_db.collection(USERS_COLLECTION).where('username', '==', 'admin').limit(1).stream()
-        
-        admin_exists = False
-        for doc in docs:
-            admin_exists = True
-            break
-        
-        if not admin_exists:
+        storage = get_storage()
+        users = storage.users
+        if not users.get_by_username('admin'):
+            password = os.getenv('ADMIN_PASSWORD')
+            if not password:
+                if storage.name != 'firestore':
+                    log_warn('Usuario admin nao criado: defina ADMIN_PASSWORD')
+                    return
+                password = 'Admin@12345'
             admin_user = User(id=1, username='admin', email='admin@sweethome.local')
-            admin_user.set_password('Admin@12345')
+            admin_user.set_password(password)
             
-            user_data = {
+            users.create({
                 'id': 1,
                 'username': 'admin',
                 'email': 'admin@sweethome.local',
                 'password_hashed': admin_user.password_hashed,
-                'created_at': firestore.SERVER_TIMESTAMP,
-                'updated_at': firestore.SERVER_TIMESTAMP,
                 'active': True,
                 'is_admin': True
-            }
-            
-            firebase_db.collection(USERS_COLLECTION).document('1').set(user_data)
-            log_info('Admin user created in Firebase')
+            })
+            log_info('Admin user created')
         else:
-            log_info('Admin user already exists in Firebase')
+            log_info('Admin user already exists')
     except Exception as e:
         log_error(f'Erro ao inicializar admin: {str(e)}')
 
-if firebase_db:
-    try:
-        init_default_admin()
-    except Exception as e:
-        log_error(f'Erro ao inicializar admin na importação: {str(e)}')
-
 def register_user(user_id: int, username: str, email: str, password: str) -> bool:
     global last_error
     clear_last_error()
@@ -1,13 +1,13 @@
 import os
-import barcode
-import qrcode
+from functools import lru_cache
+
 from pathlib import Path
-from barcode.writer import ImageWriter
 from server.src.utils.logger import log_debug, log_error
 
 MAX_FILENAME_LENGTH = 255
 MAX_PATH_LENGTH = 1000
 MAX_URL_LENGTH = 500
+QRCODE_URL = "https://mg-sweets.web.app/"
 
 def sanitize_path(path_str):
     if not path_str or not isinstance(path_str, str):
@@ -68,7 +68,7 @@ def generate_qrcode(base_path):
             log_error('Base path invalido para QR code')
             return None
         
-        url = "https://mg-sweets.web.app/"
+        url = QRCODE_URL
         save_dir = os.path.join(str(sanitized_path), 'barcodes')
         
         if not os.path.exists(save_dir):
@@ -80,6 +80,7 @@ def generate_qrcode(base_path):
             log_error('QR code path eh symlink')
             return None
         
+        import qrcode
         qrcode_img = qrcode.make(
             data=url,
             version=1,
@@ -95,6 +96,38 @@ def generate_qrcode(base_path):
         log_error('Erro ao gerar QR code')
         return None
 
+@lru_cache(maxsize=2)
+def qrcode_image(box_size: int = 1):
+    """QR code em 1 bit gerado em memoria uma vez por processo; o FPDF o embute como um unico XObject."""
+    import qrcode
+    return qrcode.make(data=QRCODE_URL, version=1, box_size=box_size, border=1).get_image()
+
+def clean_barcode_code(code) -> str | None:
+    if not code or len(str(code)) < 3:
+        log_error('Codigo do barcode muito curto')
+        return None
+
+    clean_code = ''.join(filter(str.isdigit, str(code)))
+    if len(clean_code) < 3:
+        clean_code = clean_code.zfill(12)
+
+    if len(clean_code) > 18:
+        log_error('Codigo do barcode muito longo')
+        return None
+    return clean_code
+
+def code128_modules(code) -> str | None:
+    """Modulos Code128 ('1' barra, '0' espaco) do codigo, sem gerar imagem."""
+    clean_code = clean_barcode_code(code)
+    if not clean_code:
+        return None
+    try:
+        import barcode
+        return barcode.get('code128', clean_code).build()[0]
+    except Exception as e:
+        log_error(f'Erro ao codificar barcode: {str(e)}')
+        return None
+
 def generate_barcode(code, base_path):
     try:
         sanitized_path = sanitize_path(base_path)
@@ -102,20 +135,14 @@ def generate_barcode(code, base_path):
             log_error('Base path invalido para barcode')
             return None
         
-        if not code or len(str(code)) < 3:
-            log_error('Codigo do barcode muito curto')
-            return None
-            
-        clean_code = ''.join(filter(str.isdigit, str(code)))
-        if len(clean_code) < 3:
-            clean_code = clean_code.zfill(12)
-        
-        if len(clean_code) > 18:
-            log_error('Codigo do barcode muito longo')
+        clean_code = clean_barcode_code(code)
+        if not clean_code:
             return None
         
         log_debug('Gerando barcode')
         
+        import barcode
+        from barcode.writer import ImageWriter
         code39 = barcode.get('code128', clean_code, writer=ImageWriter())
         
         save_dir = os.path.join(str(sanitized_path), 'barcodes')
@@ -0,0 +1,57 @@
+import os
+
+from server.src.services.cost_engine import cost_engine
+from server.src.storage.backend import get_storage
+from server.src.storage.base import INGREDIENTS_COLLECTION, SWEETS_COLLECTION
+from server.src.utils.logger import log_warn
+
+DEDUCT_INGREDIENTS = os.getenv('INVENTORY_DEDUCT_INGREDIENTS', 'False').lower() == 'true'
+MAX_DOCUMENT_ID_BYTES = 1500
+
+def valid_document_id(doc_id: str) -> bool:
+    """Id que pode ser usado como caminho de documento: sem '/', nao reservado e dentro do limite."""
+    return (
+        bool(doc_id) and '/' not in doc_id and doc_id not in ('.', '..')
+        and not (doc_id.startswith('__') and doc_id.endswith('__'))
+        and len(doc_id.encode('utf-8')) <= MAX_DOCUMENT_ID_BYTES
+    )
+
+def known_document(collection: str, doc_id: str) -> bool:
+    if not valid_document_id(doc_id):
+        return False
+    return not cost_engine.loaded or cost_engine.exists(collection, doc_id)
+
+def inventory_deltas(items: list[dict], deduct_ingredients: bool = DEDUCT_INGREDIENTS) -> dict[str, dict[str, float]]:
+    """Baixas de estoque da venda, somadas por documento: itens repetidos viram uma unica escrita.
+
+    Doces e ingredientes desconhecidos (id invalido ou ausente do indice do motor de custos) sao
+    ignorados: atualizar um documento inexistente falharia a venda inteira.
+    """
+    sweets, skipped = {}, set()
+    for item in items or []:
+        sweet_id = item.get('sweetId')
+        quantity = item.get('quantity', 0) or 0
+        if sweet_id is None or quantity <= 0:
+            continue
+        sweet_id = str(sweet_id)
+        if not known_document(SWEETS_COLLECTION, sweet_id):
+            skipped.add(sweet_id)
+            continue
+        sweets[sweet_id] = sweets.get(sweet_id, 0) + quantity
+
+    ingredients = {}
+    if deduct_ingredients:
+        for sweet_id, quantity in sweets.items():
+            for ingredient_id, per_unit in cost_engine.recipe_lines(sweet_id):
+                if not known_document(INGREDIENTS_COLLECTION, ingredient_id):
+                    skipped.add(ingredient_id)
+                    continue
+                ingredients[ingredient_id] = ingredients.get(ingredient_id, 0) + per_unit * quantity
+
+    if skipped:
+        log_warn(f'Baixa de estoque ignorada para {len(skipped)} itens desconhecidos')
+    return {SWEETS_COLLECTION: sweets, INGREDIENTS_COLLECTION: ingredients}
+
+def iter_inventory_pages(collection: str, page_size: int = 500):
+    """Percorrer doces ou ingredientes em paginas ordenadas pelo id do documento."""
+    return get_storage().inventory.iter_pages(collection, page_size)
@@ -7,6 +7,8 @@ import os
 from functools import wraps
 
 from quart import request, jsonify
+from server.src.storage.backend import get_storage
+from server.src.storage.base import AlreadyStored
 from server.src.utils.logger import log_info, log_warn, log_error
 
 logging.basicConfig(level=logging.DEBUG, format='%(asctime)s - %(levelname)s - %(message)s')
@@ -14,16 +16,6 @@ logging.basicConfig(level=logging.DEBUG, format='%(asctime)s - %(levelname)s - %
 API_KEY_LENGTH = 32
 API_KEY_PREFIX = "LUNAR_"
 MAX_API_KEY_LENGTH = 100
-API_KEYS_COLLECTION = 'api_keys'  
-
-api_keys_db = {}
-
-try:
-    from server.src.services.firebase_auth_service import firebase_db
-    from firebase_admin import firestore as _firestore
-except Exception:
-    firebase_db = None
-    _firestore = None
 
 def protect_route(function):
     @wraps(function)
@@ -79,96 +71,67 @@ def save_key_to_db(key, minutes=60, owner: str | None = None):
     key_info = key_hash_and_prefix_info(key)
     key_hash = key_info['hash']
 
-    if firebase_db and _firestore:
-        try:
-            doc_ref = firebase_db.collection(API_KEYS_COLLECTION).document(key_hash)
-            doc_ref.set({
-                "owner": owner or None,
-                "created_at": _firestore.SERVER_TIMESTAMP,
-                "expires_at": expiration_time.isoformat(),
-                "active": True,
-                "key_info": key_info
-            })
-            logging.info(f"Chave salva no Firestore: {key[:8]}...")
-            return True
-        except Exception as e:
-            logging.error(f"Erro ao salvar chave no Firestore: {str(e)}")
-    if key_hash in api_keys_db:
+    try:
+        get_storage().api_keys.create(key_hash, {
+            "owner": owner or None,
+            "expires_at": expiration_time.isoformat(),
+            "active": True,
+            "key_info": key_info
+        })
+        logging.info(f"Chave salva: {key[:8]}...")
+        return True
+    except AlreadyStored:
         logging.warning(f"Chave ja existe no banco de dados")
         return False
-    api_keys_db[key_hash] = expiration_time
-    logging.info(f"Chave salva em memoria: {key[:8]}...")
-    return True
+    except Exception as e:
+        logging.error(f"Erro ao salvar chave: {str(e)}")
+        return False
+
+def key_summary(record: dict) -> dict:
+    return {
+        "key_info": {k: v for k, v in record.get('key_info', {}).items() if k != "key"},
+        "owner": record.get('owner'),
+        "expires_at": record.get('expires_at'),
+        "active": record.get('active'),
+        "created_at": record.get('created_at')
+    }
 
 def list_keys_from_db(owner: str | None = None):
-    results = []
-    if firebase_db:
-        try:
-            collection = firebase_db.collection(API_KEYS_COLLECTION)
-            if owner:
-                docs = collection.where('owner', '==', owner).stream()
-            else:
-                docs = collection.stream()
-            for doc in docs:
-                d = doc.to_dict()
-                results.append({
-                    "key_info": {k: v for k, v in d["key_info"].items() if k != "key"},
-                    "owner": d.get('owner'),
-                    "expires_at": d.get('expires_at'),
-                    "active": d.get('active'),
-                    "created_at": d.get('created_at')
-                })
-            return results
-        except Exception as e:
-            logging.error(f"Erro ao listar chaves no Firestore: {str(e)}")
-    for h, exp in api_keys_db.items():
-        results.append({"hash": h, "owner": None, "expires_at": exp.isoformat(), "active": True, "created_at": None})
-    return results
+    try:
+        return [key_summary(record) for record in get_storage().api_keys.list(owner)]
+    except Exception as e:
+        logging.error(f"Erro ao listar chaves: {str(e)}")
+        return []
 
 def get_key_info(key: str):
     key_hash = key_to_hash(key) 
-    if firebase_db:
-        try:
-            doc = firebase_db.collection(API_KEYS_COLLECTION).document(key_hash).get()
-            if doc.exists:
-                d = doc.to_dict()
-                return {
-                    "key_info": d.get('key_info', {}),
-                    "owner": d.get('owner'),
-                    "expires_at": d.get('expires_at'),
-                    "active": d.get('active'),
-                    "created_at": d.get('created_at')
-                }
-        except Exception as e:
-            logging.error(f"Erro ao obter info de chave no Firestore: {str(e)}")
-    exp = api_keys_db.get(key_hash)
-    if exp:
-        return {"hash": key_hash, "owner": None, "expires_at": exp.isoformat(), "active": True, "created_at": None}
+    try:
+        record = get_storage().api_keys.get(key_hash)
+        if record:
+            return {
+                "key_info": record.get('key_info', {}),
+                "owner": record.get('owner'),
+                "expires_at": record.get('expires_at'),
+                "active": record.get('active'),
+                "created_at": record.get('created_at')
+            }
+    except Exception as e:
+        logging.error(f"Erro ao obter info de chave: {str(e)}")
     return None
 
 def revoke_key(api_key_or_hash: str) -> bool:
     if not isinstance(api_key_or_hash, str):
         return False
     key_hash = api_key_or_hash if len(api_key_or_hash) == 64 and all(c in string.hexdigits for c in api_key_or_hash) else key_to_hash(api_key_or_hash)
-    if firebase_db and _firestore:
-        try:
-            doc_ref = firebase_db.collection(API_KEYS_COLLECTION).document(key_hash)
-            doc = doc_ref.get()
-            if not doc.exists:
-                logging.warning("Chave nao encontrada para revogacao")
-                return False
-            doc_ref.update({"active": False, "revoked_at": _firestore.SERVER_TIMESTAMP})
-            logging.info(f"Chave revogada: {key_hash[:12]}...")
-            return True
-        except Exception as e:
-            logging.error(f"Erro ao revogar chave no Firestore: {str(e)}")
+    try:
+        if not get_storage().api_keys.deactivate(key_hash):
+            logging.warning("Chave nao encontrada para revogacao")
             return False
-    if key_hash in api_keys_db:
-        del api_keys_db[key_hash]
-        logging.info(f"Chave removida da memoria: {key_hash[:12]}...")
+        logging.info(f"Chave revogada: {key_hash[:12]}...")
         return True
-    logging.warning("Chave nao encontrada")
-    return False
+    except Exception as e:
+        logging.error(f"Erro ao revogar chave: {str(e)}")
+        return False
 
 def validate_key(key):
     if not isinstance(key, str):
@@ -177,45 +140,31 @@ def validate_key(key):
 
     key_hash = key_to_hash(key)
 
-    if firebase_db:
+    try:
+        data = get_storage().api_keys.get(key_hash)
+    except Exception as e:
+        logging.error(f"Erro ao validar chave: {str(e)}")
+        return False
+    if not data:
+        logging.warning("Chave nao encontrada")
+        return False
+    if not data.get('active', True):
+        logging.warning("Chave revogada/inativa")
+        return False
+    expires_at = data.get('expires_at')
+    if expires_at:
         try:
-            doc = firebase_db.collection(API_KEYS_COLLECTION).document(key_hash).get()
-            if not doc.exists:
-                logging.warning("Chave nao encontrada")
-                return False
-            data = doc.to_dict()
-            if not data.get('active', True):
-                logging.warning("Chave revogada/inativa")
-                return False
-            expires_at = data.get('expires_at')
-            if expires_at:
-                try:
-                    exp_dt = datetime.datetime.fromisoformat(expires_at)
-                    if datetime.datetime.now() < exp_dt:
-                        logging.info("Chave valida e nao expirada (Firestore)")
-                        return True
-                    else:
-                        logging.warning("Chave expirada (Firestore)")
-                        return False
-                except Exception:
-                    logging.warning("Formato de expiracao desconhecido")
-                    return False
-            logging.info("Chave valida (Firestore)")
-            return True
-        except Exception as e:
-            logging.error(f"Erro ao validar chave no Firestore: {str(e)}")
+            exp_dt = datetime.datetime.fromisoformat(expires_at)
+        except Exception:
+            logging.warning("Formato de expiracao desconhecido")
             return False
-    if key_hash not in api_keys_db:
-        logging.warning(f"Chave nao encontrada")
-        return False
-    expiration_time = api_keys_db[key_hash]
-    if datetime.datetime.now() < expiration_time:
-        logging.info("Chave valida e nao expirada (memoria)")
-        return True
-    else:
-        logging.warning("Chave expirada (memoria)")
-        del api_keys_db[key_hash]
+        if datetime.datetime.now() < exp_dt:
+            logging.info("Chave valida e nao expirada")
+            return True
+        logging.warning("Chave expirada")
         return False
+    logging.info("Chave valida")
+    return True
 
 def expires_in(key):
     info = get_key_info(key)
@@ -0,0 +1,113 @@
+import os
+from dataclasses import dataclass
+from decimal import Decimal, InvalidOperation
+
+from server.src.services.cost_engine import cost_engine
+
+PRICE_TOLERANCE = Decimal(os.getenv('PRICE_TOLERANCE', '0.01'))
+MAX_ITEM_QUANTITY = 10000
+CENT = Decimal('0.01')
+HUNDRED = Decimal(100)
+
+CHECKED_TOTALS = ('subtotal', 'itemDiscountsTotal', 'globalDiscountAmount', 'totalAmount')
+
+@dataclass
+class PricedSale:
+    items: list
+    qtd: int
+    subtotal: Decimal
+    itemDiscountsTotal: Decimal
+    globalDiscountPercent: Decimal
+    globalDiscountAmount: Decimal
+    totalAmount: Decimal
+    totalCost: float
+
+def price_sale(items: list, global_discount_percent) -> PricedSale:
+    """Validar cada linha e calcular descontos, totais e custo em uma unica passada pelos itens.
+
+    Lanca ValueError com a mensagem para o cliente quando algum valor e invalido.
+    """
+    percent = _decimal(global_discount_percent, 'globalDiscountPercent')
+    if not 0 <= percent <= 100:
+        raise ValueError('Percentual de desconto invalido')
+
+    priced_items = []
+    qtd = 0
+    subtotal = Decimal(0)
+    item_discounts = Decimal(0)
+    total_cost = 0.0
+
+    for item in items:
+        if not isinstance(item, dict):
+            raise ValueError('Item invalido')
+        quantity = item.get('quantity')
+        if isinstance(quantity, bool) or not isinstance(quantity, int) or not 0 < quantity <= MAX_ITEM_QUANTITY:
+            raise ValueError('Quantidade invalida')
+        price = _decimal(item.get('priceAtSale'), 'priceAtSale')
+        discount = _decimal(item.get('itemDiscount', 0) or 0, 'itemDiscount')
+        if price < 0:
+            raise ValueError('Preco invalido')
+        if not 0 <= discount <= 100:
+            raise ValueError('Desconto de item invalido')
+
+        line_subtotal = price * quantity
+        line_discount = line_subtotal * discount / HUNDRED
+        unit_cost = cost_engine.unit_cost(item.get('sweetId')) if cost_engine.loaded else None
+        if unit_cost is None:
+            line_cost = float(item.get('costTotal', 0) or 0)
+            unit_cost = float(item.get('cost', 0) or 0)
+        else:
+            line_cost = round(unit_cost * quantity, 4)
+
+        qtd += quantity
+        subtotal += line_subtotal
+        item_discounts += line_discount
+        total_cost += line_cost
+        priced_items.append({
+            **item,
+            "priceAtSale": float(price),
+            "subtotal": float(line_subtotal),
+            "itemDiscount": float(discount),
+            "discountedAmount": float(line_discount),
+            "cost": unit_cost,
+            "costTotal": line_cost,
+            "profit": round(float(line_subtotal - line_discount) - line_cost, 4)
+        })
+
+    global_discount = (subtotal - item_discounts) * percent / HUNDRED
+    return PricedSale(
+        items=priced_items,
+        qtd=qtd,
+        subtotal=subtotal.quantize(CENT),
+        itemDiscountsTotal=item_discounts.quantize(CENT),
+        globalDiscountPercent=percent,
+        globalDiscountAmount=global_discount.quantize(CENT),
+        totalAmount=(subtotal - item_discounts - global_discount).quantize(CENT),
+        totalCost=total_cost
+    )
+
+def mismatched_totals(priced: PricedSale, data: dict) -> list[str]:
+    """Totais enviados pelo cliente que divergem do calculo do servidor alem da tolerancia."""
+    mismatched = []
+    for name in CHECKED_TOTALS:
+        if data.get(name) is None:
+            continue
+        try:
+            client_value = Decimal(str(data[name]))
+        except (InvalidOperation, ValueError):
+            mismatched.append(name)
+            continue
+        if abs(client_value - getattr(priced, name)) > PRICE_TOLERANCE:
+            mismatched.append(name)
+    return mismatched
+
+def _decimal(value, name: str) -> Decimal:
+    if isinstance(value, bool) or not isinstance(value, (int, float, str, Decimal)):
+        raise ValueError(f'Valor invalido: {name}')
+    try:
+        result = Decimal(str(value))
+    except InvalidOperation:
+        raise ValueError(f'Valor invalido: {name}')
+    if not result.is_finite():
+        raise ValueError(f'Valor invalido: {name}')
+    return result
@@ -0,0 +1,106 @@
+import asyncio
+import io
+import multiprocessing
+import os
+import zipfile
+from concurrent.futures import ProcessPoolExecutor
+
+from server.src.models.comprovante_model import Comprovante
+from server.src.services.receipt_template import get_receipt_template, creation_date
+from server.src.utils.logger import log_info, log_error
+
+MAX_BATCH_SIZE = 500
+RECEIPT_WORKERS = int(os.getenv('RECEIPT_WORKERS', '0')) or os.cpu_count() or 1
+# Nunca fork: o processo do servidor ja tem threads do gRPC/Firestore, e um filho criado por fork
+# herda os locks delas no estado em que estavam e pode travar.
+RENDER_START_METHOD = 'forkserver' if 'forkserver' in multiprocessing.get_all_start_methods() else 'spawn'
+
+_pool: ProcessPoolExecutor | None = None
+
+def get_render_pool() -> ProcessPoolExecutor:
+    global _pool
+    if _pool is None:
+        _pool = ProcessPoolExecutor(
+            max_workers=RECEIPT_WORKERS,
+            mp_context=multiprocessing.get_context(RENDER_START_METHOD),
+            initializer=init_render_worker
+        )
+        log_info(f'Pool de renderizacao iniciado com {RECEIPT_WORKERS} processos ({RENDER_START_METHOD})')
+    return _pool
+
+def shutdown_render_pool():
+    global _pool
+    if _pool is not None:
+        _pool.shutdown(wait=True, cancel_futures=True)
+        _pool = None
+
+def init_render_worker():
+    """Montar o template no processo do pool. Os workers so renderizam: nao abrem Firebase nem armazenamento."""
+    get_receipt_template()
+
+def render_stored_sale(sale: dict, username: str) -> tuple[str, bytes | None]:
+    """Renderizar uma venda armazenada; executado dentro de um processo do pool."""
+    comprovante = Comprovante.from_dict(sale)
+    try:
+        operator = sale.get('operatorName') or username
+        pdf_bytes = get_receipt_template().render(comprovante, operator)
+        return str(comprovante.transaction_id), pdf_bytes
+    except Exception as e:
+        log_error(f'Erro ao renderizar venda em lote: {str(e)}')
+        return str(comprovante.transaction_id), None
+
+def render_merged_sales(sales: list[dict], username: str) -> bytes | None:
+    """Renderizar varias vendas em um unico PDF, uma pagina por comprovante."""
+    try:
+        template = get_receipt_template()
+        comprovantes = [Comprovante.from_dict(sale) for sale in sales]
+        pdf = template.new_document(creation_date(comprovantes[0].timestamp))
+        for sale, comprovante in zip(sales, comprovantes):
+            operator = sale.get('operatorName') or username
+            template.add_receipt_page(pdf, comprovante, operator)
+        return bytes(pdf.output())
+    except Exception as e:
+        log_error(f'Erro ao renderizar lote consolidado: {str(e)}')
+        return None
+
+async def render_single(sale: dict, username: str) -> tuple[str, bytes | None]:
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(get_render_pool(), render_stored_sale, sale, username)
+
+async def render_merged(sales: list[dict], username: str) -> bytes | None:
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(get_render_pool(), render_merged_sales, sales, username)
+
+async def stream_zip(sales: list[dict], username: str):
+    """Gerar um ZIP incrementalmente, emitindo cada PDF assim que o processo que o renderizou termina."""
+    loop = asyncio.get_running_loop()
+    pool = get_render_pool()
+    pending = [loop.run_in_executor(pool, render_stored_sale, sale, username) for sale in sales]
+
+    sink = _ZipSink()
+    with zipfile.ZipFile(sink, mode='w', compression=zipfile.ZIP_STORED) as archive:
+        for future in asyncio.as_completed(pending):
+            transaction_id, pdf_bytes = await future
+            if not pdf_bytes:
+                continue
+            archive.writestr(f'comprovante_{transaction_id}.pdf', pdf_bytes)
+            yield sink.drain()
+    yield sink.drain()
+
+class _ZipSink(io.RawIOBase):
+    """Destino nao pesquisavel para o ZipFile; os bytes escritos sao drenados a cada arquivo."""
+
+    def __init__(self):
+        self._chunks = []
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data) -> int:
+        self._chunks.append(bytes(data))
+        return len(data)
+
+    def drain(self) -> bytes:
+        data = b''.join(self._chunks)
+        self._chunks.clear()
+        return data
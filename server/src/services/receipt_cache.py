@@ -0,0 +1,107 @@
+import hashlib
+import os
+import re
+import threading
+from collections import OrderedDict
+
+from server.src.utils.logger import log_debug, log_error
+
+RECEIPT_CACHE_ENTRIES = int(os.getenv('RECEIPT_CACHE_ENTRIES', '256'))
+RECEIPT_CACHE_MAX_BYTES = int(os.getenv('RECEIPT_CACHE_MAX_BYTES', str(64 * 1024 * 1024)))
+RECEIPT_CACHE_DIR = os.getenv('RECEIPT_CACHE_DIR', '')
+
+_TRANSACTION_ID_PATTERN = re.compile(r'^[A-Za-z0-9_-]{1,64}$')
+
+def content_hash(pdf_bytes: bytes) -> str:
+    return hashlib.sha256(pdf_bytes).hexdigest()
+
+class ReceiptCache:
+    """LRU em memoria de PDFs por transaction_id, com camada opcional em disco enderecada pelo hash do conteudo."""
+
+    def __init__(self, max_entries: int = RECEIPT_CACHE_ENTRIES, max_bytes: int = RECEIPT_CACHE_MAX_BYTES, disk_dir: str = ''):
+        self.max_entries = max(1, max_entries)
+        self.max_bytes = max(1, max_bytes)
+        self.disk_dir = disk_dir or None
+        self._entries: OrderedDict[str, tuple[str, bytes]] = OrderedDict()
+        self._size = 0
+        self._lock = threading.Lock()
+
+        if self.disk_dir:
+            os.makedirs(os.path.join(self.disk_dir, 'objects'), mode=0o700, exist_ok=True)
+            os.makedirs(os.path.join(self.disk_dir, 'refs'), mode=0o700, exist_ok=True)
+
+    def get(self, transaction_id: str) -> tuple[str, bytes] | None:
+        key = str(transaction_id)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry:
+                self._entries.move_to_end(key)
+                return entry
+
+        entry = self._read_disk(key)
+        if entry:
+            self._remember(key, entry)
+        return entry
+
+    def put(self, transaction_id: str, pdf_bytes: bytes) -> str:
+        key = str(transaction_id)
+        etag = content_hash(pdf_bytes)
+        self._remember(key, (etag, pdf_bytes))
+        self._write_disk(key, etag, pdf_bytes)
+        return etag
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._size = 0
+
+    def _remember(self, key: str, entry: tuple[str, bytes]):
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous:
+                self._size -= len(previous[1])
+            self._entries[key] = entry
+            self._size += len(entry[1])
+            while self._entries and (len(self._entries) > self.max_entries or self._size > self.max_bytes):
+                _, (_, evicted) = self._entries.popitem(last=False)
+                self._size -= len(evicted)
+
+    def _read_disk(self, key: str) -> tuple[str, bytes] | None:
+        if not self.disk_dir or not _TRANSACTION_ID_PATTERN.match(key):
+            return None
+        try:
+            with open(os.path.join(self.disk_dir, 'refs', key), 'r') as ref:
+                etag = ref.read().strip()
+            with open(os.path.join(self.disk_dir, 'objects', f'{etag}.pdf'), 'rb') as blob:
+                pdf_bytes = blob.read()
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            log_error(f'Erro ao ler comprovante do cache em disco: {str(e)}')
+            return None
+
+        if content_hash(pdf_bytes) != etag:
+            log_error('Comprovante corrompido no cache em disco')
+            return None
+        log_debug('Comprovante carregado do cache em disco')
+        return etag, pdf_bytes
+
+    def _write_disk(self, key: str, etag: str, pdf_bytes: bytes):
+        if not self.disk_dir or not _TRANSACTION_ID_PATTERN.match(key):
+            return
+        try:
+            blob_path = os.path.join(self.disk_dir, 'objects', f'{etag}.pdf')
+            if not os.path.exists(blob_path):
+                _atomic_write(blob_path, pdf_bytes)
+            _atomic_write(os.path.join(self.disk_dir, 'refs', key), etag.encode())
+        except Exception as e:
+            log_error(f'Erro ao gravar comprovante no cache em disco: {str(e)}')
+
+def _atomic_write(path: str, data: bytes):
+    tmp_path = f'{path}.{os.getpid()}.tmp'
+    with open(tmp_path, 'wb') as tmp:
+        tmp.write(data)
+    os.chmod(tmp_path, 0o600)
+    os.replace(tmp_path, path)
+
+receipt_cache = ReceiptCache(disk_dir=RECEIPT_CACHE_DIR)
@@ -0,0 +1,232 @@
+from __future__ import annotations
+
+import datetime
+import os
+import zoneinfo
+from functools import lru_cache
+from typing import TYPE_CHECKING
+
+from server.src.services.generate_pdf import code128_modules, qrcode_image
+from server.src.utils.logger import log_debug
+
+if TYPE_CHECKING:
+    from fpdf import FPDF
+
+PAGE_WIDTH = 80
+PAGE_MARGIN = 10
+MAX_PAGE_HEIGHT = 5000
+FONT_FAMILY = 'helvetica'
+BASE_FONT_SIZE = 9
+COLUMN_FONT_SIZE = 7
+LINE_HEIGHT = 4
+RULE_HEIGHT = 2
+TIMESTAMP_FORMAT = "%Y-%m-%d %H:%M:%S"
+TIMEZONE = "America/Sao_Paulo"
+RECEIPT_PDF_COMPACT = os.getenv('RECEIPT_PDF_COMPACT', 'True').lower() == 'true'
+BARCODE_QUIET_MODULES = 10
+
+class ReceiptTemplate:
+    """Layout fixo do cupom, montado uma vez por processo; cada venda preenche so os campos variaveis.
+
+    No perfil compacto o QR code usa um pixel por modulo e os streams sao comprimidos; o perfil
+    padrao gera PDFs sem compressao, legiveis para depuracao.
+    """
+
+    def __init__(self, compact: bool = RECEIPT_PDF_COMPACT):
+        self.compact = compact
+        self.content_width = PAGE_WIDTH - 2 * PAGE_MARGIN
+        self.title = "Sweet Home"
+        self.subtitle = "CUPOM FISCAL ELETRONICO"
+        self.header_fields = (
+            ("Operador: {operator}", 7),
+            ("Cliente: {payer}", 7),
+            ("ID {transaction_id}", 8),
+        )
+
+        widths = (22, 10, 14, 14)
+        self.columns = tuple(zip(
+            ("DESCRICAO", "QTD", "VL. UNIT.", "VL. ITEM"),
+            widths,
+            ("L", "R", "R", "R"),
+        ))
+        self.name_width = widths[0]
+        self.discount_label_width = sum(widths[:3])
+        self.amount_width = widths[3]
+        self.totals_label_width = self.content_width / 2
+
+        self.barcode_width = 50
+        self.barcode_height = 15
+        self.qrcode_width = 25
+        self.barcode_x = PAGE_MARGIN + (self.content_width - self.barcode_width) / 2
+        self.qrcode_x = PAGE_MARGIN + (self.content_width - self.qrcode_width) / 2
+
+        header_lines = 2 + len(self.header_fields)
+        self.fixed_height = (
+            2 * PAGE_MARGIN
+            + header_lines * LINE_HEIGHT + RULE_HEIGHT
+            + LINE_HEIGHT + RULE_HEIGHT
+            + 3 * LINE_HEIGHT + RULE_HEIGHT
+            + 2 * LINE_HEIGHT + self.barcode_height + self.qrcode_width
+        )
+
+    def measure_height(self, comprovante) -> float:
+        """Altura exata da pagina em mm, calculada antes de desenhar a partir das linhas do cupom."""
+        item_lines = 0
+        for item in comprovante.items or []:
+            item_lines += 2 if float(item.get('itemDiscount', 0) or 0) > 0 else 1
+        total_lines = sum(1 for value in (comprovante.itemDiscountsTotal, comprovante.globalDiscountPercent) if value and value > 0)
+        return self.fixed_height + (item_lines + total_lines) * LINE_HEIGHT
+
+    def fits_page(self, comprovante) -> bool:
+        return self.measure_height(comprovante) <= MAX_PAGE_HEIGHT
+
+    def new_document(self, creation_date: datetime.datetime) -> FPDF:
+        from fpdf import FPDF
+        pdf = FPDF(orientation='P', unit='mm', format=[PAGE_WIDTH, MAX_PAGE_HEIGHT])
+        pdf.set_margins(PAGE_MARGIN, PAGE_MARGIN, PAGE_MARGIN)
+        pdf.set_creation_date(creation_date)
+        pdf.set_auto_page_break(auto=False)
+        pdf.set_compression(self.compact)
+        return pdf
+
+    def add_receipt_page(self, pdf: FPDF, comprovante, username: str):
+        height = self.measure_height(comprovante)
+        if height > MAX_PAGE_HEIGHT:
+            raise ValueError("Comprovante excede altura maxima")
+
+        pdf.add_page(format=(PAGE_WIDTH, height))
+        pdf.set_font(FONT_FAMILY, size=BASE_FONT_SIZE)
+        self._draw_header(pdf, comprovante, username)
+        self._draw_items(pdf, comprovante.items or [])
+        self._draw_totals(pdf, comprovante)
+        self._draw_codes(pdf, comprovante.barcode_str)
+
+    def render(self, comprovante, username: str) -> bytes:
+        pdf = self.new_document(creation_date(comprovante.timestamp))
+        self.add_receipt_page(pdf, comprovante, username)
+        return bytes(pdf.output())
+
+    def _line(self, pdf: FPDF, text: str, size: int = BASE_FONT_SIZE, style: str = '', align: str = 'C', width: float | None = None):
+        pdf.set_font(FONT_FAMILY, style=style, size=size)
+        pdf.cell(width or self.content_width, LINE_HEIGHT, _latin1(text), align=align,
+                 new_x="LMARGIN", new_y="NEXT")
+
+    def _rule(self, pdf: FPDF):
+        y = pdf.get_y() + 1
+        pdf.line(PAGE_MARGIN, y, PAGE_MARGIN + self.content_width, y)
+        pdf.set_y(y + 1)
+
+    def _draw_header(self, pdf: FPDF, comprovante, username: str):
+        fields = {
+            "operator": str(username)[:50] if username else "Operador",
+            "payer": comprovante.payer.get('nome', 'Cliente'),
+            "transaction_id": comprovante.transaction_id,
+        }
+        self._line(pdf, self.title, style='B')
+        for text, size in self.header_fields:
+            self._line(pdf, text.format(**fields), size=size, style='B')
+        self._line(pdf, self.subtitle, style='B')
+        self._rule(pdf)
+
+    def _draw_items(self, pdf: FPDF, items: list):
+        pdf.set_font(FONT_FAMILY, style='B', size=COLUMN_FONT_SIZE)
+        for label, width, align in self.columns:
+            pdf.cell(width, LINE_HEIGHT, label, align=align)
+        pdf.ln(LINE_HEIGHT)
+
+        for item in items:
+            quantity = item.get('quantity', 0)
+            unit_price = float(item.get('priceAtSale', 0) or 0)
+            subtotal = float(item.get('subtotal', 0) or 0)
+            discount = float(item.get('itemDiscount', 0) or 0)
+
+            pdf.set_font(FONT_FAMILY, size=BASE_FONT_SIZE)
+            name = _fit(pdf, _latin1(str(item.get('sweetName', 'Produto'))), self.name_width)
+            values = (name, f"{quantity} UN", f"{unit_price:.2f}", f"{subtotal:.2f}")
+            for value, (_, width, align) in zip(values, self.columns):
+                pdf.cell(width, LINE_HEIGHT, value, align=align)
+            pdf.ln(LINE_HEIGHT)
+
+            if discount > 0:
+                discounted = float(item.get('discountedAmount', 0) or 0)
+                pdf.set_font(FONT_FAMILY, size=8)
+                pdf.set_text_color(0, 128, 0)
+                pdf.cell(self.discount_label_width, LINE_HEIGHT, f"Desconto item ({discount}%)", align='R')
+                pdf.cell(self.amount_width, LINE_HEIGHT, f"-{discounted:.2f}", align='R')
+                pdf.set_text_color(0, 0, 0)
+                pdf.ln(LINE_HEIGHT)
+
+        self._rule(pdf)
+
+    def _draw_totals(self, pdf: FPDF, comprovante):
+        subtotal = float(comprovante.subtotal or 0)
+        item_discounts_total = float(comprovante.itemDiscountsTotal or 0)
+        global_discount_percent = float(comprovante.globalDiscountPercent or 0)
+        global_discount_amount = float(comprovante.globalDiscountAmount or 0)
+        total_amount = float(comprovante.totalAmount or 0)
+
+        rows = [("Subtotal", f"{subtotal:.2f}", False)]
+        if item_discounts_total > 0:
+            rows.append(("Desconto em itens", f"-{item_discounts_total:.2f}", True))
+        if global_discount_percent > 0:
+            rows.append((f"Desconto global ({global_discount_percent}%)", f"-{global_discount_amount:.2f}", True))
+        rows.append((comprovante.payment_type.value, f"{total_amount:.2f}", False))
+
+        pdf.set_font(FONT_FAMILY, size=BASE_FONT_SIZE)
+        for label, amount, highlight in rows:
+            if highlight:
+                pdf.set_text_color(0, 128, 0)
+            pdf.cell(self.totals_label_width, LINE_HEIGHT, label, align='L')
+            pdf.cell(self.totals_label_width, LINE_HEIGHT, amount, align='R')
+            pdf.ln(LINE_HEIGHT)
+            if highlight:
+                pdf.set_text_color(0, 0, 0)
+
+        pdf.set_font(FONT_FAMILY, style='B', size=BASE_FONT_SIZE)
+        pdf.cell(self.totals_label_width, LINE_HEIGHT, f"TOTAL R$: {total_amount:.2f}", align='C')
+        pdf.cell(self.totals_label_width, LINE_HEIGHT, _latin1(comprovante.timestamp), align='C')
+        pdf.ln(LINE_HEIGHT)
+        self._rule(pdf)
+
+    def _draw_codes(self, pdf: FPDF, barcode_str: str):
+        self._line(pdf, "CÓDIGO DE BARRAS", style='B')
+        modules = code128_modules(barcode_str)
+        if modules:
+            draw_code128(pdf, modules, self.barcode_x, pdf.get_y(), self.barcode_width, self.barcode_height)
+            log_debug("Barcode incluído")
+        pdf.ln(self.barcode_height)
+        self._line(pdf, "CÓDIGO QR", style='B')
+        pdf.image(qrcode_image(1 if self.compact else 4), x=self.qrcode_x, w=self.qrcode_width, h=self.qrcode_width)
+
+@lru_cache(maxsize=1)
+def get_receipt_template() -> ReceiptTemplate:
+    return ReceiptTemplate()
+
+def draw_code128(pdf: FPDF, modules: str, x: float, y: float, width: float, height: float):
+    """Desenhar as barras como retangulos vetoriais, uma barra por sequencia de modulos '1'."""
+    module_width = width / (len(modules) + 2 * BARCODE_QUIET_MODULES)
+    x += BARCODE_QUIET_MODULES * module_width
+    pdf.set_fill_color(0, 0, 0)
+    start = None
+    for i, module in enumerate(modules + '0'):
+        if module == '1' and start is None:
+            start = i
+        elif module != '1' and start is not None:
+            pdf.rect(x + start * module_width, y, (i - start) * module_width, height, style='F')
+            start = None
+
+def creation_date(value: str) -> datetime.datetime:
+    try:
+        parsed = datetime.datetime.strptime(value, TIMESTAMP_FORMAT)
+        return parsed.replace(tzinfo=zoneinfo.ZoneInfo(TIMEZONE))
+    except (TypeError, ValueError):
+        return datetime.datetime(1970, 1, 1, tzinfo=datetime.timezone.utc)
+
+def _latin1(text) -> str:
+    return str(text).encode('latin-1', 'replace').decode('latin-1')
+
+def _fit(pdf: FPDF, text: str, width: float) -> str:
+    limit = width - 2 * pdf.c_margin
+    while text and pdf.get_string_width(text) > limit:
+        text = text[:-1]
+    return text
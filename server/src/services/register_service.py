@@ -1,8 +1,19 @@
+import os
 import re
+import time
+import asyncio
 import datetime
-from email_validator import validate_email, EmailNotValidError
+from collections import OrderedDict
 import zoneinfo
-from server.src.utils.logger import log_info, log_error
+from server.src.utils.logger import log_info, log_warn, log_error
+
+EMAIL_CHECK_DELIVERABILITY = os.getenv('EMAIL_CHECK_DELIVERABILITY', 'False').lower() == 'true'
+EMAIL_DNS_TIMEOUT = float(os.getenv('EMAIL_DNS_TIMEOUT', '2'))
+EMAIL_DNS_CACHE_TTL = int(os.getenv('EMAIL_DNS_CACHE_TTL', '3600'))
+EMAIL_DNS_CACHE_SIZE = int(os.getenv('EMAIL_DNS_CACHE_SIZE', '1024'))
+
+_domain_cache: OrderedDict[str, tuple[float, bool]] = OrderedDict()
+_resolver = None
 
 def timestamp() -> str:
     log_info("Gerando timestamp no fuso horário de São Paulo")
@@ -30,13 +41,82 @@ def is_email_valid(email: str) -> tuple[bool, Exception | None]:
         return (False, Exception("Email não pode estar vazio"))
     
     log_info(f"Validando email: {email}")
+    from email_validator import validate_email, EmailNotValidError
     try:
-        valid = validate_email(email)
+        valid = validate_email(email, check_deliverability=False)
         log_info(f"Email validado: {valid.email}")
         return (True, None)
     except EmailNotValidError as error:
         log_error(f"Invalid email: {email}")
         return (False, error)
+
+async def is_email_valid_async(email: str) -> tuple[bool, Exception | None]:
+    """Validar sintaxe do email e, se EMAIL_CHECK_DELIVERABILITY estiver ativo, se o dominio recebe emails."""
+    valid, error = is_email_valid(email)
+    if not valid or not EMAIL_CHECK_DELIVERABILITY:
+        return (valid, error)
+
+    domain = email.rsplit('@', 1)[-1].strip().lower()
+    if await is_domain_deliverable(domain):
+        return (True, None)
+    log_error(f"Dominio nao recebe emails: {domain}")
+    from email_validator import EmailUndeliverableError
+    return (False, EmailUndeliverableError(f"O dominio {domain} nao recebe emails"))
+
+async def is_domain_deliverable(domain: str) -> bool:
+    """Consultar MX/A do dominio com cache TTL; em caso de timeout ou falha do DNS o dominio e aceito
+    sem ir para o cache.
+    """
+    now = time.monotonic()
+    cached = _domain_cache.get(domain)
+    if cached and cached[0] > now:
+        _domain_cache.move_to_end(domain)
+        return cached[1]
+
+    try:
+        deliverable = await asyncio.wait_for(_resolve_domain(domain), timeout=EMAIL_DNS_TIMEOUT)
+    except asyncio.TimeoutError:
+        log_warn(f"Timeout ao verificar dominio de email: {domain}")
+        return True
+    if deliverable is None:
+        log_warn(f"DNS indisponivel ao verificar dominio de email: {domain}")
+        return True
+
+    _domain_cache[domain] = (now + EMAIL_DNS_CACHE_TTL, deliverable)
+    _domain_cache.move_to_end(domain)
+    while len(_domain_cache) > EMAIL_DNS_CACHE_SIZE:
+        _domain_cache.popitem(last=False)
+    return deliverable
+
+async def _resolve_domain(domain: str) -> bool | None:
+    """Se o dominio recebe emails, ou None se nenhum servidor DNS respondeu (SERVFAIL ou indisponivel)."""
+    global _resolver
+    import dns.asyncresolver
+    import dns.exception
+    import dns.resolver
+
+    if _resolver is None:
+        _resolver = dns.asyncresolver.Resolver()
+        _resolver.lifetime = EMAIL_DNS_TIMEOUT
+
+    unavailable = False
+    for record_type in ('MX', 'A', 'AAAA'):
+        try:
+            answer = await _resolver.resolve(domain, record_type)
+        except dns.resolver.NoAnswer:
+            continue
+        except dns.resolver.NoNameservers:
+            unavailable = True
+            continue
+        except dns.resolver.NXDOMAIN:
+            return False
+        except dns.exception.Timeout:
+            raise asyncio.TimeoutError()
+        if record_type != 'MX':
+            return True
+        # MX nulo (RFC 7505) indica que o dominio nao aceita emails
+        return any(str(record.exchange) != '.' for record in answer)
+    return None if unavailable else False
     
 def validate_password(password: str) -> bool:
     """Validar senha (mínimo 8 caracteres com maiúscula, minúscula, dígito, caractere especial)."""
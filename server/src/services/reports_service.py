@@ -0,0 +1,51 @@
+import datetime
+
+from server.src.storage.backend import get_storage
+from server.src.utils.logger import log_info
+
+PERIOD_TYPES = ('dia', 'semana', 'mes')
+
+def get_daily_rollups(start_date: str | None = None, end_date: str | None = None) -> list[dict]:
+    return get_storage().rollups.get_daily(start_date, end_date)
+
+def period_key(date: str, period_type: str) -> str:
+    if period_type == 'mes':
+        return date[:7]
+    if period_type == 'semana':
+        day = datetime.date.fromisoformat(date)
+        return (day - datetime.timedelta(days=(day.weekday() + 1) % 7)).isoformat()
+    return date
+
+def sales_by_period(period_type: str, start_date: str | None = None, end_date: str | None = None) -> list[dict]:
+    grouped = {}
+    for bucket in get_daily_rollups(start_date, end_date):
+        key = period_key(bucket['date'], period_type)
+        period = grouped.get(key)
+        if period is None:
+            period = grouped[key] = {"periodo": key, "vendas": 0, "total": 0.0, "custo": 0.0, "lucro": 0.0}
+        period["vendas"] += bucket.get('vendas', 0)
+        period["total"] += bucket.get('total', 0)
+        period["custo"] += bucket.get('custo', 0)
+        period["lucro"] += bucket.get('lucro', 0)
+
+    result = [
+        {**period, "total": round(period["total"], 2), "custo": round(period["custo"], 2), "lucro": round(period["lucro"], 2)}
+        for period in grouped.values()
+    ]
+    log_info(f'Vendas por periodo calculadas: {period_type}, {len(result)} periodos')
+    return result
+
+def profit_margin_by_period(period_type: str, start_date: str | None = None, end_date: str | None = None) -> list[dict]:
+    return [
+        {**period, "receita": period["total"], "margem": round(period["lucro"] / period["total"] * 100, 2) if period["total"] > 0 else 0}
+        for period in sales_by_period(period_type, start_date, end_date)
+    ]
+
+def top_selling_products(limit: int = 10, start_date: str | None = None, end_date: str | None = None) -> list[dict]:
+    products = {}
+    for bucket in get_daily_rollups(start_date, end_date):
+        for sweet_id, entry in (bucket.get('itens') or {}).items():
+            product = products.setdefault(sweet_id, {"sweetId": sweet_id, "nome": entry.get('nome'), "quantidade": 0})
+            product["quantidade"] += entry.get('quantidade', 0)
+
+    return sorted(products.values(), key=lambda p: p["quantidade"], reverse=True)[:limit]
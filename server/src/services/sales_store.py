@@ -0,0 +1,168 @@
+import datetime
+import hashlib
+import zoneinfo
+
+from server.src.services.inventory_service import inventory_deltas
+from server.src.storage.rollups import merged_rollup_deltas
+from server.src.services.sales_stream import publish_sales
+from server.src.storage.backend import get_storage
+from server.src.storage.base import AlreadyStored
+from server.src.utils.logger import log_info, log_warn, log_error
+
+MAX_SALES_QUERY = 1000
+MAX_BATCH_WRITES = 500
+
+def idempotency_hash(user_id, idempotency_key: str) -> str:
+    return hashlib.sha256(f"{user_id}:{idempotency_key}".encode()).hexdigest()
+
+def build_sale_document(comprovante, data: dict, user_id, username: str, total_cost: float | None = None) -> dict:
+    """Montar o documento de venda no mesmo formato que o frontend grava na colecao sales."""
+    issued_at = datetime.datetime.strptime(comprovante.timestamp, "%Y-%m-%d %H:%M:%S").replace(
+        tzinfo=zoneinfo.ZoneInfo("America/Sao_Paulo")
+    )
+    total_amount = float(comprovante.totalAmount or 0)
+    if total_cost is None:
+        total_cost = sum(float(item.get('costTotal', 0) or 0) for item in comprovante.items or [])
+
+    sale = comprovante.to_dict()
+    sale.update({
+        "id": str(data.get('saleId') or comprovante.transaction_id)[:100],
+        "date": issued_at.strftime("%Y-%m-%d"),
+        "timestamp": int(issued_at.timestamp() * 1000),
+        "subtotal": float(comprovante.subtotal or 0),
+        "itemDiscountsTotal": float(comprovante.itemDiscountsTotal or 0),
+        "globalDiscountPercent": float(comprovante.globalDiscountPercent or 0),
+        "globalDiscountAmount": float(comprovante.globalDiscountAmount or 0),
+        "totalAmount": total_amount,
+        "totalCost": total_cost,
+        "totalProfit": total_amount - total_cost,
+        "operatorName": username,
+        "operatorId": user_id,
+        "userId": user_id,
+        "status": "completed"
+    })
+    return sale
+
+def save_sale(sale: dict, user_id=None, idempotency_key: str | None = None) -> tuple[str | None, bool]:
+    """Gravar a venda, sua chave de idempotencia, o indice do codigo de barras, o rollup diario
+    e a baixa de estoque em um unico commit.
+
+    Retorna (transaction_id, criada). Se a chave ja foi usada, retorna a venda original com criada=False.
+    Lanca AlreadyStored quando o transaction_id ou o codigo de barras ja pertence a outra venda.
+    """
+    transaction_id = str(sale['transaction_id'])
+    key_hash = idempotency_hash(user_id, idempotency_key) if idempotency_key else None
+    deltas = inventory_deltas(sale.get('items'))
+
+    writes = 4 + sum(len(changes) for changes in deltas.values())
+    if writes > MAX_BATCH_WRITES:
+        log_error('Venda excede o limite de escritas do batch')
+        return None, False
+
+    storage = get_storage()
+    try:
+        storage.sales.create(
+            [sale], merged_rollup_deltas([sale]), deltas,
+            idempotency=(key_hash, user_id) if key_hash else None
+        )
+        log_info(f'Venda gravada ({storage.name}): {transaction_id}')
+        publish_sales([sale])
+        return transaction_id, True
+    except AlreadyStored:
+        if key_hash:
+            existing = find_idempotent_sale(user_id, idempotency_key)
+            if existing:
+                log_warn('Venda repetida com a mesma chave de idempotencia')
+                return existing, False
+        log_warn(f'Venda ou codigo de barras ja gravado: {transaction_id}')
+        raise
+    except Exception as e:
+        log_error(f'Erro ao gravar venda: {str(e)}')
+        return None, False
+
+def save_sales_batch(sales: list[dict]) -> tuple[list[str], list[str], list[str]]:
+    """Gravar muitas vendas em commits de ate MAX_BATCH_WRITES escritas, ignorando transaction_ids ja gravados.
+
+    Rollups e estoque sao somados e gravados uma vez por commit. Retorna (criadas, duplicadas, falhas).
+    """
+    created, duplicates, failed = [], [], []
+    pending, dates, documents = [], set(), set()
+    for sale in sales:
+        sale_documents = {
+            (collection, doc_id)
+            for collection, changes in inventory_deltas(sale.get('items')).items()
+            for doc_id in changes
+        }
+        writes = 2 * (len(pending) + 1) + len(dates | {sale['date']}) + len(documents | sale_documents)
+        if pending and writes > MAX_BATCH_WRITES:
+            _commit_sales(pending, created, duplicates, failed)
+            pending, dates, documents = [], set(), set()
+        pending.append(sale)
+        dates.add(sale['date'])
+        documents |= sale_documents
+    if pending:
+        _commit_sales(pending, created, duplicates, failed)
+    log_info(f'{len(created)} vendas gravadas em lote, {len(duplicates)} duplicadas, {len(failed)} com falha')
+    return created, duplicates, failed
+
+def _commit_sales(sales: list[dict], created: list[str], duplicates: list[str], failed: list[str]):
+    existing = {str(sale['transaction_id']) for sale in get_sales_by_ids([sale['transaction_id'] for sale in sales])}
+    new_sales = [sale for sale in sales if str(sale['transaction_id']) not in existing]
+    duplicates.extend(str(sale['transaction_id']) for sale in sales if str(sale['transaction_id']) in existing)
+    if not new_sales:
+        return
+
+    rollups = merged_rollup_deltas(new_sales)
+    deltas = inventory_deltas([item for sale in new_sales for item in sale.get('items') or []])
+
+    try:
+        get_storage().sales.create(new_sales, rollups, deltas)
+        created.extend(str(sale['transaction_id']) for sale in new_sales)
+        publish_sales(new_sales)
+    except AlreadyStored:
+        log_warn('Venda gravada em paralelo durante o lote, gravando uma a uma')
+        for sale in new_sales:
+            try:
+                transaction_id, was_created = save_sale(sale)
+            except AlreadyStored:
+                duplicates.append(str(sale['transaction_id']))
+                continue
+            if was_created:
+                created.append(transaction_id)
+            else:
+                failed.append(str(sale['transaction_id']))
+    except Exception as e:
+        log_error(f'Erro ao gravar lote de vendas: {str(e)}')
+        failed.extend(str(sale['transaction_id']) for sale in new_sales)
+
+def find_idempotent_sale(user_id, idempotency_key: str) -> str | None:
+    try:
+        return get_storage().sales.find_idempotent(idempotency_hash(user_id, idempotency_key))
+    except Exception as e:
+        log_error(f'Erro ao buscar chave de idempotencia: {str(e)}')
+        return None
+
+def find_sale_by_barcode(barcode: str) -> str | None:
+    try:
+        return get_storage().sales.find_by_barcode(barcode)
+    except Exception as e:
+        log_error(f'Erro ao buscar codigo de barras: {str(e)}')
+        return None
+
+def get_sales_by_ids(transaction_ids: list[str]) -> list[dict]:
+    try:
+        return get_storage().sales.get_many(list(transaction_ids[:MAX_SALES_QUERY]))
+    except Exception as e:
+        log_error(f'Erro ao buscar vendas: {str(e)}')
+        return []
+
+def get_sales_by_date_range(start_date: str, end_date: str, limit: int = MAX_SALES_QUERY) -> list[dict]:
+    try:
+        return get_storage().sales.by_date_range(start_date, end_date, min(limit, MAX_SALES_QUERY))
+    except Exception as e:
+        log_error(f'Erro ao buscar vendas por periodo: {str(e)}')
+        return []
+
+def iter_sales_pages(start_date: str | None = None, end_date: str | None = None, page_size: int = 500):
+    """Percorrer a colecao de vendas em paginas, usando cursor, sem carregar o historico inteiro."""
+    yield from get_storage().sales.iter_pages(start_date, end_date, page_size)
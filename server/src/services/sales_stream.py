@@ -0,0 +1,108 @@
+"""Distribuicao das vendas finalizadas para os paineis conectados em /api/stream/sales.
+
+Cada cliente recebe uma fila limitada; a venda gravada e publicada como o incremento do rollup
+diario (vendas, total, custo, lucro e itens) e o cliente soma ao resumo recebido na conexao.
+Um cliente lento que enche a fila e desconectado em vez de segurar os demais ou crescer a memoria.
+O pub/sub e por processo: com varios workers cada painel ve as vendas do seu worker.
+"""
+import asyncio
+import datetime
+import os
+import threading
+import zoneinfo
+
+from server.src.services.reports_service import get_daily_rollups
+from server.src.storage.rollups import empty_rollup, merged_rollup_deltas
+from server.src.utils.logger import log_warn
+
+STREAM_QUEUE_SIZE = int(os.getenv('STREAM_QUEUE_SIZE', '64'))
+STREAM_MAX_CLIENTS = int(os.getenv('STREAM_MAX_CLIENTS', '100'))
+STREAM_HEARTBEAT_SECONDS = float(os.getenv('STREAM_HEARTBEAT_SECONDS', '15'))
+STREAM_TOP_ITEMS = 10
+
+class SalesBroker:
+    def __init__(self, queue_size: int = STREAM_QUEUE_SIZE, max_clients: int = STREAM_MAX_CLIENTS):
+        self.queue_size = queue_size
+        self.max_clients = max_clients
+        self._subscribers: set[asyncio.Queue] = set()
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._subscribers)
+
+    def subscribe(self) -> asyncio.Queue | None:
+        """Fila do novo cliente, ou None se o limite de clientes foi atingido."""
+        with self._lock:
+            if len(self._subscribers) >= self.max_clients:
+                return None
+            self._loop = asyncio.get_running_loop()
+            queue = asyncio.Queue(maxsize=self.queue_size)
+            self._subscribers.add(queue)
+            return queue
+
+    def unsubscribe(self, queue: asyncio.Queue):
+        with self._lock:
+            self._subscribers.discard(queue)
+
+    def publish(self, event: dict):
+        """Entregar o evento a todos os clientes; pode ser chamado de fora do event loop."""
+        if not self._subscribers or not self._loop:
+            return
+        try:
+            running = asyncio.get_running_loop()
+        except RuntimeError:
+            running = None
+        if running is self._loop:
+            self._fan_out(event)
+        elif not self._loop.is_closed():
+            self._loop.call_soon_threadsafe(self._fan_out, event)
+
+    def _fan_out(self, event: dict):
+        with self._lock:
+            subscribers = list(self._subscribers)
+        for queue in subscribers:
+            try:
+                queue.put_nowait(event)
+            except asyncio.QueueFull:
+                self.unsubscribe(queue)
+                while not queue.empty():
+                    queue.get_nowait()
+                # None avisa o consumidor que ele foi descartado.
+                queue.put_nowait(None)
+                log_warn('Cliente lento removido do stream de vendas')
+
+sales_broker = SalesBroker()
+
+def today() -> str:
+    return datetime.datetime.now(zoneinfo.ZoneInfo("America/Sao_Paulo")).strftime("%Y-%m-%d")
+
+def top_items(items: dict, limit: int = STREAM_TOP_ITEMS) -> list[dict]:
+    ranked = sorted(items.items(), key=lambda entry: entry[1].get('quantidade', 0), reverse=True)[:limit]
+    return [{"sweetId": sweet_id, **entry} for sweet_id, entry in ranked]
+
+def sales_snapshot(date: str | None = None) -> dict:
+    """Resumo do dia a partir do rollup diario, enviado quando o cliente conecta."""
+    date = date or today()
+    buckets = get_daily_rollups(date, date)
+    rollup = buckets[0] if buckets else empty_rollup(date)
+    return {
+        "date": date,
+        "vendas": rollup.get('vendas', 0),
+        "total": round(rollup.get('total', 0), 2),
+        "custo": round(rollup.get('custo', 0), 2),
+        "lucro": round(rollup.get('lucro', 0), 2),
+        "itens": rollup.get('itens') or {},
+        "top": top_items(rollup.get('itens') or {})
+    }
+
+def publish_sales(sales: list[dict]):
+    """Publicar o incremento de cada dia afetado pelas vendas recem-gravadas."""
+    if not sales or not len(sales_broker):
+        return
+    for date, delta in merged_rollup_deltas(sales).items():
+        sales_broker.publish({
+            "date": date,
+            "transaction_ids": [str(sale['transaction_id']) for sale in sales if sale.get('date') == date],
+            **delta
+        })
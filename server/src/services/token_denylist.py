@@ -0,0 +1,169 @@
+"""Lista de tokens JWT revogados (logout e refresh), consultada a cada requisicao com @jwt_required.
+
+A consulta e so em memoria: um conjunto de jti que expira por baldes de tempo, opcionalmente com um
+filtro de Bloom na frente. O jti revogado tambem e gravado no armazenamento configurado e uma
+thread de sincronizacao traz as revogacoes feitas pelos outros workers.
+"""
+import hashlib
+import itertools
+import os
+import threading
+import time
+
+from server.src.storage.backend import get_storage
+from server.src.utils.logger import log_info, log_warn, log_error
+
+BUCKET_SECONDS = int(os.getenv('JWT_DENYLIST_BUCKET_SECONDS', '60'))
+SYNC_SECONDS = float(os.getenv('JWT_DENYLIST_SYNC_SECONDS', '2'))
+SYNC_OVERLAP_SECONDS = 5.0
+BLOOM_BITS = int(os.getenv('JWT_DENYLIST_BLOOM_BITS', '0'))
+BLOOM_HASHES = 4
+
+class BloomFilter:
+    """Filtro de Bloom com hash duplo sobre um blake2b: sem falso negativo, nunca remove itens."""
+
+    def __init__(self, bits: int, hashes: int = BLOOM_HASHES):
+        self.bits = max(8, bits)
+        self.hashes = hashes
+        self._array = bytearray((self.bits + 7) // 8)
+
+    def _positions(self, item: str):
+        digest = hashlib.blake2b(item.encode(), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], 'little')
+        h2 = int.from_bytes(digest[8:], 'little') | 1
+        return ((h1 + i * h2) % self.bits for i in range(self.hashes))
+
+    def add(self, item: str):
+        for position in self._positions(item):
+            self._array[position >> 3] |= 1 << (position & 7)
+
+    def __contains__(self, item: str) -> bool:
+        return all(self._array[position >> 3] & (1 << (position & 7)) for position in self._positions(item))
+
+class ExpiringSet:
+    """Conjunto de jti em que cada item sai no `exp` do seu token.
+
+    Os itens ficam num balde por janela de BUCKET_SECONDS; expirar e descartar os baldes inteiros
+    que ja passaram, sem varrer os itens um a um.
+    """
+
+    def __init__(self, bucket_seconds: int = BUCKET_SECONDS, bloom_bits: int = BLOOM_BITS):
+        self.bucket_seconds = bucket_seconds
+        self.bloom_bits = bloom_bits
+        self._expires: dict[str, float] = {}
+        self._buckets: dict[int, set[str]] = {}
+        self._bloom = BloomFilter(bloom_bits) if bloom_bits else None
+        self._lock = threading.Lock()
+
+    def add(self, jti: str, expires_at: float) -> bool:
+        with self._lock:
+            if jti in self._expires:
+                return False
+            self._expires[jti] = expires_at
+            self._buckets.setdefault(int(expires_at // self.bucket_seconds) + 1, set()).add(jti)
+            if self._bloom:
+                self._bloom.add(jti)
+            return True
+
+    def __contains__(self, jti: str) -> bool:
+        bloom = self._bloom
+        if bloom and jti not in bloom:
+            return False
+        expires_at = self._expires.get(jti)
+        return expires_at is not None and expires_at > time.time()
+
+    def __len__(self) -> int:
+        return len(self._expires)
+
+    def expire(self, now: float) -> int:
+        with self._lock:
+            expired = [bucket for bucket in self._buckets if bucket * self.bucket_seconds <= now]
+            removed = 0
+            for bucket in expired:
+                for jti in self._buckets.pop(bucket):
+                    del self._expires[jti]
+                    removed += 1
+            if removed and self._bloom:
+                # Bloom nao remove itens: reconstruir com os que restaram mantem a taxa de falso positivo.
+                # O filtro novo so entra depois de completo, porque __contains__ le sem o lock.
+                bloom = BloomFilter(self.bloom_bits)
+                for jti in self._expires:
+                    bloom.add(jti)
+                self._bloom = bloom
+            return removed
+
+class TokenDenylist:
+    def __init__(self):
+        self.revoked = ExpiringSet()
+        self._synced_at = 0.0
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    def is_revoked(self, decoded_token: dict) -> bool:
+        jti = decoded_token.get('jti')
+        return bool(jti) and jti in self.revoked
+
+    def revoke(self, decoded_token: dict) -> bool:
+        """Revogar o token ate o seu `exp`. Retorna False se nao foi possivel gravar no armazenamento."""
+        jti = decoded_token.get('jti')
+        if not jti:
+            log_warn('Token sem jti nao pode ser revogado')
+            return False
+        now = time.time()
+        expires_at = float(decoded_token.get('exp') or now + int(os.getenv('JWT_EXPIRES_MINUTES', '60')) * 60)
+        self.revoked.add(jti, expires_at)
+        try:
+            get_storage().revoked_tokens.add(jti, expires_at, now)
+            return True
+        except Exception as e:
+            log_error(f'Erro ao gravar token revogado: {str(e)}')
+            return False
+
+    def sync(self) -> int:
+        """Trazer as revogacoes gravadas pelos outros workers desde a ultima sincronizacao."""
+        started = time.time()
+        entries = get_storage().revoked_tokens.revoked_since(self._synced_at - SYNC_OVERLAP_SECONDS, started)
+        added = sum(self.revoked.add(jti, expires_at) for jti, expires_at in entries)
+        self._synced_at = started
+        self.revoked.expire(started)
+        return added
+
+    def start(self):
+        if self._thread:
+            return
+        try:
+            self.sync()
+            get_storage().revoked_tokens.purge(time.time())
+        except Exception as e:
+            log_error(f'Erro ao carregar tokens revogados: {str(e)}')
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name='token-denylist', daemon=True)
+        self._thread.start()
+        log_info(f'Lista de tokens revogados iniciada com {len(self.revoked)} tokens')
+
+    def stop(self):
+        if not self._thread:
+            return
+        self._stop.set()
+        self._thread.join(timeout=SYNC_SECONDS + 1)
+        self._thread = None
+
+    def _run(self):
+        purge_every = max(1, int(BUCKET_SECONDS / SYNC_SECONDS))
+        for tick in itertools.count(1):
+            if self._stop.wait(SYNC_SECONDS):
+                return
+            try:
+                self.sync()
+                if tick % purge_every == 0:
+                    get_storage().revoked_tokens.purge(time.time())
+            except Exception as e:
+                log_error(f'Erro ao sincronizar tokens revogados: {str(e)}')
+
+token_denylist = TokenDenylist()
+
+def start_token_denylist():
+    token_denylist.start()
+
+def stop_token_denylist():
+    token_denylist.stop()
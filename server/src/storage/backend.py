@@ -0,0 +1,51 @@
+import os
+import threading
+
+from server.src.storage.base import Storage
+from server.src.utils.logger import log_info, log_warn, log_error
+
+STORAGE_BACKENDS = ('firestore', 'memory', 'sqlite')
+STORAGE_BACKEND = os.getenv('STORAGE_BACKEND', '').lower()
+SQLITE_PATH = os.getenv('STORAGE_SQLITE_PATH', 'sweet_home.sqlite3')
+
+storage: Storage | None = None
+_lock = threading.Lock()
+
+def get_storage() -> Storage:
+    """Repositorios de usuarios, chaves de API, vendas, rollups e estoque do backend em STORAGE_BACKEND.
+
+    Sem configuracao usa o Firestore quando ele esta disponivel e a memoria do processo caso contrario.
+    """
+    global storage
+    if storage is None:
+        with _lock:
+            if storage is None:
+                storage = open_storage(STORAGE_BACKEND)
+                log_info(f'Backend de armazenamento: {storage.name}')
+    return storage
+
+def open_storage(backend: str) -> Storage:
+    """Abrir o backend pedido. Um backend escolhido explicitamente que nao abre impede a subida do
+    servidor em vez de cair para a memoria do processo, que perderia as vendas.
+    """
+    if backend and backend not in STORAGE_BACKENDS:
+        log_error(f'STORAGE_BACKEND desconhecido: {backend}')
+        raise RuntimeError(f'STORAGE_BACKEND desconhecido: {backend}')
+
+    if backend == 'sqlite':
+        from server.src.storage.sqlite import sqlite_storage
+        return sqlite_storage(SQLITE_PATH)
+
+    if backend in ('', 'firestore'):
+        from server.src.services.firebase_auth_service import get_firebase_db
+        firebase_db = get_firebase_db()
+        if firebase_db:
+            from server.src.storage.firestore import firestore_storage
+            return firestore_storage(firebase_db)
+        if backend == 'firestore':
+            log_error('Firestore indisponivel com STORAGE_BACKEND=firestore')
+            raise RuntimeError('Firestore indisponivel')
+        log_warn('Firestore indisponivel, usando armazenamento em memoria')
+
+    from server.src.storage.memory import memory_storage
+    return memory_storage()
@@ -0,0 +1,119 @@
+import datetime
+from abc import ABC, abstractmethod
+from dataclasses import dataclass
+from typing import Iterator
+
+SWEETS_COLLECTION = 'sweets'
+INGREDIENTS_COLLECTION = 'ingredients'
+STOCK_FIELDS = {SWEETS_COLLECTION: 'stock', INGREDIENTS_COLLECTION: 'stockInBaseUnit'}
+
+class AlreadyStored(Exception):
+    """Documento ja existe: usuario, chave de API, venda, codigo de barras ou chave de idempotencia."""
+
+class StockUnavailable(Exception):
+    """O backend configurado nao guarda o estoque de doces e ingredientes."""
+
+class UserRepository(ABC):
+    @abstractmethod
+    def get_by_username(self, username: str) -> dict | None: ...
+
+    @abstractmethod
+    def get_by_id(self, user_id) -> dict | None: ...
+
+    @abstractmethod
+    def create(self, user: dict) -> None:
+        """Gravar o usuario com created_at/updated_at. Levanta AlreadyStored se o id ja existir."""
+
+class ApiKeyRepository(ABC):
+    @abstractmethod
+    def create(self, key_hash: str, record: dict) -> None:
+        """Gravar a chave com created_at. Levanta AlreadyStored se o hash ja existir."""
+
+    @abstractmethod
+    def get(self, key_hash: str) -> dict | None: ...
+
+    @abstractmethod
+    def list(self, owner: str | None = None) -> list[dict]: ...
+
+    @abstractmethod
+    def deactivate(self, key_hash: str) -> bool:
+        """Marcar a chave como revogada. Retorna False se ela nao existir."""
+
+class SaleRepository(ABC):
+    @abstractmethod
+    def create(self, sales: list[dict], rollups: dict[str, dict], deltas: dict[str, dict[str, float]],
+               idempotency: tuple[str, object] | None = None) -> None:
+        """Gravar as vendas, seus codigos de barras, a chave de idempotencia (hash, user_id), os rollups
+        diarios e a baixa de estoque de uma vez. Levanta AlreadyStored e nao grava nada se algum
+        documento ja existir.
+        """
+
+    @abstractmethod
+    def find_idempotent(self, key_hash: str) -> str | None: ...
+
+    @abstractmethod
+    def find_by_barcode(self, barcode: str) -> str | None: ...
+
+    @abstractmethod
+    def get_many(self, transaction_ids: list[str]) -> list[dict]:
+        """Vendas encontradas, na ordem dos ids pedidos."""
+
+    @abstractmethod
+    def by_date_range(self, start_date: str, end_date: str, limit: int) -> list[dict]: ...
+
+    @abstractmethod
+    def iter_pages(self, start_date: str | None, end_date: str | None, page_size: int) -> Iterator[list[dict]]:
+        """Percorrer as vendas ordenadas por data em paginas, sem carregar o historico inteiro."""
+
+class RollupRepository(ABC):
+    @abstractmethod
+    def get_daily(self, start_date: str | None, end_date: str | None) -> list[dict]:
+        """Rollups diarios (date, vendas, total, custo, lucro, itens) ordenados por data."""
+
+    @abstractmethod
+    def replace_days(self, rollups: dict[str, dict | None], cutoff: datetime.datetime) -> None:
+        """Trocar, numa unica transacao, o rollup de cada dia pelo reconstruido com as vendas gravadas
+        ate `cutoff`, somando as vendas do dia gravadas depois dele. Rollup None apaga o dia se nao
+        houver vendas posteriores ao corte.
+        """
+
+class InventoryRepository(ABC):
+    # True quando o backend guarda o estoque atual; os demais so registram as baixas das vendas.
+    tracks_stock = False
+
+    @abstractmethod
+    def iter_pages(self, collection: str, page_size: int) -> Iterator[list[dict]]:
+        """Doces ou ingredientes com o estoque atual, em paginas ordenadas pelo id do documento.
+        Levanta StockUnavailable se o backend nao guarda o estoque.
+        """
+
+class SequenceRepository(ABC):
+    @abstractmethod
+    def lease(self, name: str, count: int) -> int:
+        """Reservar `count` valores da sequencia `name` e retornar o primeiro. Atomico entre processos
+        que usam o mesmo armazenamento: dois blocos reservados nunca se sobrepoem.
+        """
+
+class RevokedTokenRepository(ABC):
+    @abstractmethod
+    def add(self, jti: str, expires_at: float, revoked_at: float) -> None:
+        """Gravar o jti revogado; repetir o mesmo jti nao e erro. Tempos em segundos desde a epoca."""
+
+    @abstractmethod
+    def revoked_since(self, since: float, now: float) -> list[tuple[str, float]]:
+        """Pares (jti, expires_at) revogados a partir de `since` e ainda nao expirados em `now`."""
+
+    @abstractmethod
+    def purge(self, now: float) -> int:
+        """Apagar os jti ja expirados. Retorna quantos foram apagados."""
+
+@dataclass
+class Storage:
+    name: str
+    users: UserRepository
+    api_keys: ApiKeyRepository
+    sales: SaleRepository
+    rollups: RollupRepository
+    inventory: InventoryRepository
+    sequences: SequenceRepository
+    revoked_tokens: RevokedTokenRepository
@@ -0,0 +1,450 @@
+"""Firestore local em memoria para testes de carga, com latencia, jitter e falhas injetadas.
+
+Implementa o subconjunto do cliente usado pelo servidor: collection/document get, set, create,
+update e delete, where/order_by/limit/start_after/stream, batch, transaction, get_all e
+on_snapshot. Cada chamada que no cliente real e um RPC dorme o tempo configurado e, com a
+probabilidade configurada, falha com ServiceUnavailable. O sleep e bloqueante de proposito:
+o cliente real tambem bloqueia o event loop durante o RPC.
+"""
+import collections
+import copy
+import datetime
+import enum
+import itertools
+import os
+import random
+import threading
+import time
+import uuid
+
+from google.api_core.exceptions import AlreadyExists, NotFound, ServiceUnavailable
+from google.cloud.firestore_v1.transforms import DELETE_FIELD, SERVER_TIMESTAMP, Increment
+
+from server.src.utils.logger import log_warn
+
+FAKE_LATENCY_MS = float(os.getenv('FAKE_FIRESTORE_LATENCY_MS', '0'))
+FAKE_JITTER_MS = float(os.getenv('FAKE_FIRESTORE_JITTER_MS', '0'))
+FAKE_ERROR_RATE = float(os.getenv('FAKE_FIRESTORE_ERROR_RATE', '0'))
+FAKE_SEED = os.getenv('FAKE_FIRESTORE_SEED')
+
+ASCENDING = 'ASCENDING'
+DESCENDING = 'DESCENDING'
+
+class ChangeType(enum.Enum):
+    ADDED = 1
+    REMOVED = 2
+    MODIFIED = 3
+
+class FakeFirestore:
+    def __init__(self, latency_ms: float = 0, jitter_ms: float = 0, error_rate: float = 0, seed: int | None = None):
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.error_rate = error_rate
+        self.stats = collections.Counter()
+        self._random = random.Random(seed)
+        self._collections = collections.defaultdict(dict)
+        self._watches = collections.defaultdict(list)
+        self._lock = threading.RLock()
+
+    @classmethod
+    def from_env(cls) -> 'FakeFirestore':
+        log_warn(
+            f'Usando Firestore simulado: latencia {FAKE_LATENCY_MS}ms, jitter {FAKE_JITTER_MS}ms, '
+            f'falhas {FAKE_ERROR_RATE:.1%}'
+        )
+        return cls(FAKE_LATENCY_MS, FAKE_JITTER_MS, FAKE_ERROR_RATE, int(FAKE_SEED) if FAKE_SEED else None)
+
+    def collection(self, name: str) -> 'FakeCollection':
+        return FakeCollection(self, name)
+
+    def batch(self) -> 'FakeWriteBatch':
+        return FakeWriteBatch(self)
+
+    def transaction(self, max_attempts: int = 5, read_only: bool = False) -> 'FakeTransaction':
+        return FakeTransaction(self, max_attempts, read_only)
+
+    def get_all(self, references, field_paths=None, transaction=None):
+        self.rpc('get_all')
+        with self._lock:
+            return [self._snapshot(ref) for ref in references]
+
+    def rpc(self, operation: str):
+        """Simular a ida ao servidor: latencia + jitter uniforme e falha transitoria opcional."""
+        self.stats[operation] += 1
+        delay = self.latency_ms + (self._random.uniform(0, self.jitter_ms) if self.jitter_ms else 0)
+        if delay > 0:
+            time.sleep(delay / 1000)
+        if self.error_rate and self._random.random() < self.error_rate:
+            self.stats['errors'] += 1
+            raise ServiceUnavailable(f'Falha injetada em {operation}')
+
+    def _snapshot(self, ref: 'FakeDocumentReference') -> 'FakeDocumentSnapshot':
+        data = self._collections[ref.collection_name].get(ref.id)
+        return FakeDocumentSnapshot(ref, copy.deepcopy(data))
+
+    def _apply(self, writes: list[tuple]):
+        """Validar e aplicar as escritas de uma vez; nada e gravado se alguma falhar."""
+        with self._lock:
+            for kind, ref, _data, _flag in writes:
+                exists = ref.id in self._collections[ref.collection_name]
+                if kind == 'create' and exists:
+                    raise AlreadyExists(f'Documento ja existe: {ref.path}')
+                if kind == 'update' and not exists:
+                    raise NotFound(f'Documento nao encontrado: {ref.path}')
+
+            changes = []
+            for kind, ref, data, merge in writes:
+                documents = self._collections[ref.collection_name]
+                existed = ref.id in documents
+                if kind == 'delete':
+                    documents.pop(ref.id, None)
+                    if existed:
+                        changes.append((ref, ChangeType.REMOVED, None))
+                    continue
+                if kind == 'update':
+                    current = documents[ref.id]
+                    for path, value in data.items():
+                        _set_path(current, path.split('.'), value)
+                elif merge:
+                    current = documents.setdefault(ref.id, {})
+                    _merge(current, data)
+                else:
+                    documents[ref.id] = current = {}
+                    _merge(current, data)
+                changes.append((ref, ChangeType.MODIFIED if existed else ChangeType.ADDED, copy.deepcopy(current)))
+            watchers = {name: list(self._watches[name]) for name in {ref.collection_name for ref, _, _ in changes}}
+
+        for ref, change_type, data in changes:
+            for callback in watchers.get(ref.collection_name, []):
+                snapshot = FakeDocumentSnapshot(ref, data)
+                callback([snapshot], [FakeDocumentChange(change_type, snapshot)], _now())
+
+class FakeDocumentSnapshot:
+    def __init__(self, reference: 'FakeDocumentReference', data: dict | None):
+        self.reference = reference
+        self.id = reference.id
+        self._data = data
+
+    @property
+    def exists(self) -> bool:
+        return self._data is not None
+
+    def to_dict(self) -> dict | None:
+        return copy.deepcopy(self._data)
+
+    def get(self, field_path: str):
+        return _get_path(self._data or {}, field_path.split('.'))
+
+class FakeDocumentChange:
+    def __init__(self, change_type: ChangeType, document: FakeDocumentSnapshot):
+        self.type = change_type
+        self.document = document
+
+class FakeDocumentReference:
+    def __init__(self, client: FakeFirestore, collection_name: str, doc_id: str):
+        self._client = client
+        self.collection_name = collection_name
+        self.id = doc_id
+
+    @property
+    def path(self) -> str:
+        return f'{self.collection_name}/{self.id}'
+
+    def get(self, field_paths=None, transaction=None) -> FakeDocumentSnapshot:
+        self._client.rpc('get')
+        with self._client._lock:
+            return self._client._snapshot(self)
+
+    def set(self, document_data: dict, merge: bool = False):
+        self._client.rpc('commit')
+        self._client._apply([('set', self, document_data, merge)])
+
+    def create(self, document_data: dict):
+        self._client.rpc('commit')
+        self._client._apply([('create', self, document_data, False)])
+
+    def update(self, field_updates: dict):
+        self._client.rpc('commit')
+        self._client._apply([('update', self, field_updates, False)])
+
+    def delete(self):
+        self._client.rpc('commit')
+        self._client._apply([('delete', self, None, False)])
+
+class FakeQuery:
+    def __init__(self, client: FakeFirestore, collection_name: str, filters=(), orders=(), limit=None, cursor=None):
+        self._client = client
+        self._collection_name = collection_name
+        self._filters = filters
+        self._orders = orders
+        self._limit = limit
+        self._cursor = cursor
+
+    def _copy(self, **changes) -> 'FakeQuery':
+        fields = {"filters": self._filters, "orders": self._orders, "limit": self._limit, "cursor": self._cursor}
+        fields.update(changes)
+        return FakeQuery(self._client, self._collection_name, **fields)
+
+    def where(self, field_path: str, op_string: str, value) -> 'FakeQuery':
+        if op_string not in OPERATORS:
+            raise ValueError(f'Operador nao suportado: {op_string}')
+        return self._copy(filters=self._filters + ((field_path, op_string, value),))
+
+    def order_by(self, field_path: str, direction: str = ASCENDING) -> 'FakeQuery':
+        return self._copy(orders=self._orders + ((field_path, direction),))
+
+    def limit(self, count: int) -> 'FakeQuery':
+        return self._copy(limit=count)
+
+    def start_after(self, document_fields) -> 'FakeQuery':
+        return self._copy(cursor=document_fields)
+
+    def stream(self, transaction=None):
+        self._client.rpc('query')
+        with self._client._lock:
+            documents = list(self._client._collections[self._collection_name].items())
+        matches = []
+        for doc_id, data in documents:
+            if all(OPERATORS[op](_get_path(data, field.split('.')), value) for field, op, value in self._filters):
+                if all(_has_path(data, field.split('.')) for field, _ in self._orders):
+                    matches.append((self._sort_key(doc_id, data), doc_id, data))
+        matches.sort(key=lambda match: match[0])
+
+        if self._cursor is not None:
+            cursor = self._cursor
+            if isinstance(cursor, FakeDocumentSnapshot):
+                cursor_key = self._sort_key(cursor.id, cursor.to_dict() or {})
+            else:
+                cursor_key = self._sort_key('\uffff', cursor)
+            matches = [match for match in matches if match[0] > cursor_key]
+        if self._limit is not None:
+            matches = matches[:self._limit]
+
+        for _key, doc_id, data in matches:
+            ref = FakeDocumentReference(self._client, self._collection_name, doc_id)
+            yield FakeDocumentSnapshot(ref, copy.deepcopy(data))
+
+    def get(self, transaction=None) -> list[FakeDocumentSnapshot]:
+        return list(self.stream(transaction=transaction))
+
+    def on_snapshot(self, callback) -> 'FakeWatch':
+        snapshots = list(self.stream())
+        callback(snapshots, [FakeDocumentChange(ChangeType.ADDED, s) for s in snapshots], _now())
+        with self._client._lock:
+            self._client._watches[self._collection_name].append(callback)
+        return FakeWatch(self._client, self._collection_name, callback)
+
+    def _sort_key(self, doc_id: str, data: dict) -> tuple:
+        key = []
+        for field, direction in self._orders:
+            value = _SortValue(_get_path(data, field.split('.')))
+            key.append(_Reversed(value) if direction == DESCENDING else value)
+        return tuple(key) + (doc_id,)
+
+class FakeCollection(FakeQuery):
+    def __init__(self, client: FakeFirestore, name: str):
+        super().__init__(client, name)
+        self.id = name
+
+    def document(self, document_id: str | None = None) -> FakeDocumentReference:
+        return FakeDocumentReference(self._client, self._collection_name, document_id or uuid.uuid4().hex[:20])
+
+    def add(self, document_data: dict) -> tuple[datetime.datetime, FakeDocumentReference]:
+        ref = self.document()
+        ref.create(document_data)
+        return _now(), ref
+
+class FakeWatch:
+    def __init__(self, client: FakeFirestore, collection_name: str, callback):
+        self._client = client
+        self._collection_name = collection_name
+        self._callback = callback
+
+    def unsubscribe(self):
+        with self._client._lock:
+            watches = self._client._watches[self._collection_name]
+            if self._callback in watches:
+                watches.remove(self._callback)
+
+class FakeWriteBatch:
+    def __init__(self, client: FakeFirestore):
+        self._client = client
+        self._writes = []
+
+    def set(self, reference: FakeDocumentReference, document_data: dict, merge: bool = False):
+        self._writes.append(('set', reference, document_data, merge))
+
+    def create(self, reference: FakeDocumentReference, document_data: dict):
+        self._writes.append(('create', reference, document_data, False))
+
+    def update(self, reference: FakeDocumentReference, field_updates: dict):
+        self._writes.append(('update', reference, field_updates, False))
+
+    def delete(self, reference: FakeDocumentReference):
+        self._writes.append(('delete', reference, None, False))
+
+    def commit(self) -> list:
+        if len(self._writes) > 500:
+            raise ValueError('Um batch aceita no maximo 500 escritas')
+        self._client.rpc('commit')
+        writes, self._writes = self._writes, []
+        self._client._apply(writes)
+        return [_now() for _ in writes]
+
+class FakeTransaction(FakeWriteBatch):
+    """Compativel com firestore.transactional: a transacao segura o lock do cliente do _begin
+    ao _commit, entao leituras e escritas de uma tentativa sao serializadas com as demais.
+    """
+    _ids = itertools.count(1)
+
+    def __init__(self, client: FakeFirestore, max_attempts: int = 5, read_only: bool = False):
+        super().__init__(client)
+        self._max_attempts = max_attempts
+        self._read_only = read_only
+        self._id = None
+
+    @property
+    def in_progress(self) -> bool:
+        return self._id is not None
+
+    @property
+    def id(self):
+        return self._id
+
+    def _clean_up(self):
+        self._writes = []
+        self._id = None
+
+    def _begin(self, retry_id=None):
+        self._client.rpc('begin_transaction')
+        self._client._lock.acquire()
+        self._id = next(self._ids)
+
+    def _commit(self) -> list:
+        try:
+            self._client.rpc('commit')
+            writes, self._writes = self._writes, []
+            self._client._apply(writes)
+            return [_now() for _ in writes]
+        finally:
+            self._release()
+
+    def _rollback(self):
+        self._writes = []
+        self._release()
+
+    def _release(self):
+        if self._id is not None:
+            self._id = None
+            self._client._lock.release()
+
+    def commit(self) -> list:
+        return self._commit()
+
+class _SortValue:
+    """Ordenacao entre tipos diferentes no estilo do Firestore: nulos, numeros, textos e o resto."""
+    __slots__ = ('value', 'rank')
+
+    def __init__(self, value):
+        self.value = value
+        if value is None:
+            self.rank = 0
+        elif isinstance(value, bool):
+            self.rank = 1
+        elif isinstance(value, (int, float)):
+            self.rank = 2
+        elif isinstance(value, datetime.datetime):
+            self.rank = 3
+        elif isinstance(value, str):
+            self.rank = 4
+        else:
+            self.rank = 5
+            self.value = repr(value)
+
+    def __lt__(self, other):
+        return (self.rank, self.value) < (other.rank, other.value)
+
+    def __eq__(self, other):
+        return (self.rank, self.value) == (other.rank, other.value)
+
+class _Reversed:
+    __slots__ = ('value',)
+
+    def __init__(self, value):
+        self.value = value
+
+    def __lt__(self, other):
+        return other.value < self.value
+
+    def __eq__(self, other):
+        return self.value == other.value
+
+def _compare(test):
+    def check(left, right):
+        try:
+            return left is not None and test(left, right)
+        except TypeError:
+            return False
+    return check
+
+OPERATORS = {
+    '==': lambda left, right: left == right,
+    '!=': lambda left, right: left is not None and left != right,
+    '<': _compare(lambda left, right: left < right),
+    '<=': _compare(lambda left, right: left <= right),
+    '>': _compare(lambda left, right: left > right),
+    '>=': _compare(lambda left, right: left >= right),
+    'in': lambda left, right: left in right,
+    'not-in': lambda left, right: left is not None and left not in right,
+    'array_contains': lambda left, right: isinstance(left, list) and right in left,
+    'array_contains_any': lambda left, right: isinstance(left, list) and any(v in left for v in right),
+}
+
+def _now() -> datetime.datetime:
+    return datetime.datetime.now(datetime.timezone.utc)
+
+def _get_path(data: dict, path: list[str]):
+    for part in path:
+        if not isinstance(data, dict) or part not in data:
+            return None
+        data = data[part]
+    return data
+
+def _has_path(data: dict, path: list[str]) -> bool:
+    for part in path:
+        if not isinstance(data, dict) or part not in data:
+            return False
+        data = data[part]
+    return True
+
+def _resolve(current, value):
+    if value is SERVER_TIMESTAMP:
+        return _now()
+    if isinstance(value, Increment):
+        return (current if isinstance(current, (int, float)) and not isinstance(current, bool) else 0) + value.value
+    if isinstance(value, dict):
+        resolved = {}
+        _merge(resolved, value)
+        return resolved
+    return copy.deepcopy(value)
+
+def _merge(target: dict, data: dict):
+    for key, value in data.items():
+        if value is DELETE_FIELD:
+            target.pop(key, None)
+        elif isinstance(value, dict) and isinstance(target.get(key), dict):
+            _merge(target[key], value)
+        else:
+            target[key] = _resolve(target.get(key), value)
+
+def _set_path(target: dict, path: list[str], value):
+    for part in path[:-1]:
+        if not isinstance(target.get(part), dict):
+            target[part] = {}
+        target = target[part]
+    if value is DELETE_FIELD:
+        target.pop(path[-1], None)
+    elif isinstance(value, dict):
+        target[path[-1]] = _resolve(None, value)
+    else:
+        target[path[-1]] = _resolve(target.get(path[-1]), value)
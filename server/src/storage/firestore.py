@@ -0,0 +1,285 @@
+from firebase_admin import firestore as _firestore
+from google.api_core.exceptions import AlreadyExists
+
+from server.src.storage.base import (
+    STOCK_FIELDS, AlreadyStored, ApiKeyRepository, InventoryRepository, RevokedTokenRepository,
+    RollupRepository, SaleRepository, SequenceRepository, Storage, UserRepository
+)
+from server.src.storage.rollups import rollup_with_late_sales
+from server.src.utils.logger import log_info, log_error
+
+USERS_COLLECTION = 'users'
+API_KEYS_COLLECTION = 'api_keys'
+SALES_COLLECTION = 'sales'
+IDEMPOTENCY_COLLECTION = 'idempotency_keys'
+BARCODES_COLLECTION = 'barcodes'
+ROLLUPS_COLLECTION = 'sales_rollups_daily'
+SEQUENCES_COLLECTION = 'barcode_sequences'
+REVOKED_TOKENS_COLLECTION = 'revoked_tokens'
+MAX_BATCH_WRITES = 500
+
+class FirestoreUserRepository(UserRepository):
+    def __init__(self, client):
+        self._collection = client.collection(USERS_COLLECTION)
+
+    def get_by_username(self, username: str) -> dict | None:
+        for doc in self._collection.where('username', '==', username).limit(1).stream():
+            return doc.to_dict()
+        return None
+
+    def get_by_id(self, user_id) -> dict | None:
+        doc = self._collection.document(str(user_id)).get()
+        return doc.to_dict() if doc.exists else None
+
+    def create(self, user: dict) -> None:
+        try:
+            self._collection.document(str(user['id'])).create({
+                **user,
+                "created_at": _firestore.SERVER_TIMESTAMP,
+                "updated_at": _firestore.SERVER_TIMESTAMP
+            })
+        except AlreadyExists as e:
+            raise AlreadyStored(f"users/{user['id']}") from e
+
+class FirestoreApiKeyRepository(ApiKeyRepository):
+    def __init__(self, client):
+        self._collection = client.collection(API_KEYS_COLLECTION)
+
+    def create(self, key_hash: str, record: dict) -> None:
+        try:
+            self._collection.document(key_hash).create({**record, "created_at": _firestore.SERVER_TIMESTAMP})
+        except AlreadyExists as e:
+            raise AlreadyStored(f"api_keys/{key_hash}") from e
+
+    def get(self, key_hash: str) -> dict | None:
+        doc = self._collection.document(key_hash).get()
+        return doc.to_dict() if doc.exists else None
+
+    def list(self, owner: str | None = None) -> list[dict]:
+        query = self._collection.where('owner', '==', owner) if owner else self._collection
+        return [doc.to_dict() for doc in query.stream()]
+
+    def deactivate(self, key_hash: str) -> bool:
+        doc_ref = self._collection.document(key_hash)
+        if not doc_ref.get().exists:
+            return False
+        doc_ref.update({"active": False, "revoked_at": _firestore.SERVER_TIMESTAMP})
+        return True
+
+class FirestoreSaleRepository(SaleRepository):
+    def __init__(self, client):
+        self._client = client
+        self._sales = client.collection(SALES_COLLECTION)
+
+    def create(self, sales, rollups, deltas, idempotency=None) -> None:
+        batch = self._client.batch()
+        for sale in sales:
+            transaction_id = str(sale['transaction_id'])
+            batch.create(self._sales.document(transaction_id), {
+                **sale,
+                "createdAt": _firestore.SERVER_TIMESTAMP,
+                "updatedAt": _firestore.SERVER_TIMESTAMP
+            })
+            if sale.get('barcode_str'):
+                batch.create(self._client.collection(BARCODES_COLLECTION).document(sale['barcode_str']), {
+                    "transaction_id": transaction_id
+                })
+        if idempotency:
+            key_hash, user_id = idempotency
+            batch.create(self._client.collection(IDEMPOTENCY_COLLECTION).document(key_hash), {
+                "transaction_id": str(sales[0]['transaction_id']),
+                "user_id": user_id,
+                "created_at": _firestore.SERVER_TIMESTAMP
+            })
+        for date, delta in rollups.items():
+            self._stage_rollup_delta(batch, date, delta)
+        self._stage_inventory_deduction(batch, deltas)
+        try:
+            batch.commit()
+        except AlreadyExists as e:
+            raise AlreadyStored(str(e)) from e
+
+    def _stage_rollup_delta(self, batch, date: str, delta: dict):
+        increments = {
+            "date": date,
+            "vendas": _firestore.Increment(delta["vendas"]),
+            "total": _firestore.Increment(delta["total"]),
+            "custo": _firestore.Increment(delta["custo"]),
+            "lucro": _firestore.Increment(delta["lucro"]),
+            "itens": {
+                sweet_id: {"nome": entry["nome"], "quantidade": _firestore.Increment(entry["quantidade"])}
+                for sweet_id, entry in delta["itens"].items()
+            }
+        }
+        batch.set(self._client.collection(ROLLUPS_COLLECTION).document(date), increments, merge=True)
+
+    def _stage_inventory_deduction(self, batch, deltas: dict[str, dict[str, float]]):
+        """Um decremento atomico por doce e por ingrediente afetado, no mesmo batch da venda."""
+        for collection, changes in deltas.items():
+            for doc_id, quantity in changes.items():
+                batch.update(self._client.collection(collection).document(doc_id), {
+                    STOCK_FIELDS[collection]: _firestore.Increment(-quantity),
+                    "updatedAt": _firestore.SERVER_TIMESTAMP
+                })
+
+    def find_idempotent(self, key_hash: str) -> str | None:
+        doc = self._client.collection(IDEMPOTENCY_COLLECTION).document(key_hash).get()
+        return doc.to_dict().get('transaction_id') if doc.exists else None
+
+    def find_by_barcode(self, barcode: str) -> str | None:
+        doc = self._client.collection(BARCODES_COLLECTION).document(barcode).get()
+        return doc.to_dict().get('transaction_id') if doc.exists else None
+
+    def get_many(self, transaction_ids: list[str]) -> list[dict]:
+        refs = [self._sales.document(str(tid)) for tid in transaction_ids]
+        found = {}
+        for doc in self._client.get_all(refs):
+            if doc.exists:
+                found[doc.id] = {"transaction_id": doc.id, **doc.to_dict()}
+        log_info(f'{len(found)} vendas carregadas por id')
+        return [found[str(tid)] for tid in transaction_ids if str(tid) in found]
+
+    def by_date_range(self, start_date: str, end_date: str, limit: int) -> list[dict]:
+        docs = (
+            self._sales
+            .where('date', '>=', start_date)
+            .where('date', '<=', end_date)
+            .order_by('date')
+            .limit(limit)
+            .stream()
+        )
+        sales = [{"transaction_id": doc.id, **doc.to_dict()} for doc in docs]
+        log_info(f'{len(sales)} vendas carregadas entre {start_date} e {end_date}')
+        return sales
+
+    def iter_pages(self, start_date, end_date, page_size):
+        query = self._sales
+        if start_date:
+            query = query.where('date', '>=', start_date)
+        if end_date:
+            query = query.where('date', '<=', end_date)
+        query = query.order_by('date').limit(page_size)
+
+        last_doc = None
+        while True:
+            page_query = query.start_after(last_doc) if last_doc else query
+            docs = list(page_query.stream())
+            if not docs:
+                return
+            yield [{"transaction_id": doc.id, **doc.to_dict()} for doc in docs]
+            if len(docs) < page_size:
+                return
+            last_doc = docs[-1]
+
+class FirestoreRollupRepository(RollupRepository):
+    def __init__(self, client):
+        self._client = client
+        self._collection = client.collection(ROLLUPS_COLLECTION)
+
+    def get_daily(self, start_date, end_date):
+        try:
+            query = self._collection
+            if start_date:
+                query = query.where('date', '>=', start_date)
+            if end_date:
+                query = query.where('date', '<=', end_date)
+            return [doc.to_dict() for doc in query.order_by('date').stream()]
+        except Exception as e:
+            log_error(f'Erro ao carregar rollups de vendas: {str(e)}')
+            return []
+
+    def replace_days(self, rollups, cutoff):
+        refs = [self._collection.document(date) for date in rollups]
+        if not refs:
+            return
+        # Consulta so por createdAt (indice simples): depois do corte ha poucas vendas.
+        late_query = self._client.collection(SALES_COLLECTION).where('createdAt', '>', cutoff)
+
+        @_firestore.transactional
+        def replace(transaction):
+            # Ler os documentos dos dias faz um incremento concorrente invalidar e repetir a transacao.
+            existing = {snapshot.id for snapshot in self._client.get_all(refs, transaction=transaction) if snapshot.exists}
+            sales = [doc.to_dict() for doc in late_query.stream(transaction=transaction)]
+            for ref, (date, rollup) in zip(refs, rollups.items()):
+                combined = rollup_with_late_sales(date, rollup, sales, cutoff)
+                if combined:
+                    transaction.set(ref, combined)
+                elif date in existing:
+                    transaction.delete(ref)
+
+        replace(self._client.transaction())
+
+class FirestoreInventoryRepository(InventoryRepository):
+    tracks_stock = True
+
+    def __init__(self, client):
+        self._client = client
+
+    def iter_pages(self, collection, page_size):
+        query = self._client.collection(collection).limit(page_size)
+        last_doc = None
+        while True:
+            page_query = query.start_after(last_doc) if last_doc else query
+            docs = list(page_query.stream())
+            if not docs:
+                return
+            yield [{"id": doc.id, **doc.to_dict()} for doc in docs]
+            if len(docs) < page_size:
+                return
+            last_doc = docs[-1]
+
+class FirestoreSequenceRepository(SequenceRepository):
+    def __init__(self, client):
+        self._client = client
+        self._collection = client.collection(SEQUENCES_COLLECTION)
+
+    def lease(self, name: str, count: int) -> int:
+        ref = self._collection.document(name)
+
+        @_firestore.transactional
+        def lease(transaction):
+            snapshot = ref.get(transaction=transaction)
+            start = (snapshot.to_dict() or {}).get('next', 0) if snapshot.exists else 0
+            transaction.set(ref, {"next": start + count})
+            return start
+
+        return lease(self._client.transaction())
+
+class FirestoreRevokedTokenRepository(RevokedTokenRepository):
+    def __init__(self, client):
+        self._client = client
+        self._collection = client.collection(REVOKED_TOKENS_COLLECTION)
+
+    def add(self, jti: str, expires_at: float, revoked_at: float) -> None:
+        self._collection.document(jti).set({"expires_at": expires_at, "revoked_at": revoked_at})
+
+    def revoked_since(self, since: float, now: float) -> list[tuple[str, float]]:
+        docs = self._collection.where('revoked_at', '>=', since).stream()
+        return [
+            (doc.id, data['expires_at']) for doc in docs
+            if (data := doc.to_dict()).get('expires_at', 0) > now
+        ]
+
+    def purge(self, now: float) -> int:
+        deleted = 0
+        while True:
+            docs = list(self._collection.where('expires_at', '<=', now).limit(MAX_BATCH_WRITES).stream())
+            if not docs:
+                return deleted
+            batch = self._client.batch()
+            for doc in docs:
+                batch.delete(doc.reference)
+            batch.commit()
+            deleted += len(docs)
+
+def firestore_storage(client) -> Storage:
+    return Storage(
+        'firestore',
+        FirestoreUserRepository(client),
+        FirestoreApiKeyRepository(client),
+        FirestoreSaleRepository(client),
+        FirestoreRollupRepository(client),
+        FirestoreInventoryRepository(client),
+        FirestoreSequenceRepository(client),
+        FirestoreRevokedTokenRepository(client)
+    )
@@ -0,0 +1,203 @@
+import copy
+import datetime
+import threading
+
+from server.src.storage.base import (
+    INGREDIENTS_COLLECTION, SWEETS_COLLECTION, AlreadyStored, ApiKeyRepository, InventoryRepository,
+    RevokedTokenRepository, RollupRepository, SaleRepository, SequenceRepository, StockUnavailable, Storage,
+    UserRepository
+)
+from server.src.storage.rollups import empty_rollup, merge_rollup, rollup_with_late_sales
+
+def now_iso() -> str:
+    return datetime.datetime.now(datetime.timezone.utc).isoformat()
+
+class MemoryUserRepository(UserRepository):
+    def __init__(self):
+        self._users = {}
+        self._lock = threading.Lock()
+
+    def get_by_username(self, username: str) -> dict | None:
+        for user in self._users.values():
+            if user.get('username') == username:
+                return copy.deepcopy(user)
+        return None
+
+    def get_by_id(self, user_id) -> dict | None:
+        user = self._users.get(str(user_id))
+        return copy.deepcopy(user) if user else None
+
+    def create(self, user: dict) -> None:
+        with self._lock:
+            if str(user['id']) in self._users:
+                raise AlreadyStored(f"users/{user['id']}")
+            self._users[str(user['id'])] = {**copy.deepcopy(user), "created_at": now_iso(), "updated_at": now_iso()}
+
+class MemoryApiKeyRepository(ApiKeyRepository):
+    def __init__(self):
+        self._keys = {}
+        self._lock = threading.Lock()
+
+    def create(self, key_hash: str, record: dict) -> None:
+        with self._lock:
+            if key_hash in self._keys:
+                raise AlreadyStored(f"api_keys/{key_hash}")
+            self._keys[key_hash] = {**copy.deepcopy(record), "created_at": now_iso()}
+
+    def get(self, key_hash: str) -> dict | None:
+        record = self._keys.get(key_hash)
+        return copy.deepcopy(record) if record else None
+
+    def list(self, owner: str | None = None) -> list[dict]:
+        return [copy.deepcopy(r) for r in self._keys.values() if not owner or r.get('owner') == owner]
+
+    def deactivate(self, key_hash: str) -> bool:
+        with self._lock:
+            record = self._keys.get(key_hash)
+            if not record:
+                return False
+            record.update({"active": False, "revoked_at": now_iso()})
+            return True
+
+class MemorySalesDatabase:
+    """Vendas, rollups diarios e baixas de estoque do processo sob um unico lock, para a venda e seus
+    incrementos serem gravados juntos como numa transacao.
+    """
+
+    def __init__(self):
+        self.sales = {}
+        self.barcodes = {}
+        self.idempotency = {}
+        self.rollups = {}
+        self.deductions = {SWEETS_COLLECTION: {}, INGREDIENTS_COLLECTION: {}}
+        self.lock = threading.Lock()
+
+class MemorySaleRepository(SaleRepository):
+    def __init__(self, db: MemorySalesDatabase):
+        self._db = db
+
+    def create(self, sales, rollups, deltas, idempotency=None) -> None:
+        db = self._db
+        with db.lock:
+            for sale in sales:
+                if str(sale['transaction_id']) in db.sales:
+                    raise AlreadyStored(f"sales/{sale['transaction_id']}")
+                if sale.get('barcode_str') and sale['barcode_str'] in db.barcodes:
+                    raise AlreadyStored(f"barcodes/{sale['barcode_str']}")
+            if idempotency and idempotency[0] in db.idempotency:
+                raise AlreadyStored(f"idempotency_keys/{idempotency[0]}")
+
+            for sale in sales:
+                transaction_id = str(sale['transaction_id'])
+                db.sales[transaction_id] = {**copy.deepcopy(sale), "createdAt": now_iso()}
+                if sale.get('barcode_str'):
+                    db.barcodes[sale['barcode_str']] = transaction_id
+            if idempotency:
+                db.idempotency[idempotency[0]] = str(sales[0]['transaction_id'])
+            for date, delta in rollups.items():
+                merge_rollup(db.rollups.setdefault(date, empty_rollup(date)), delta)
+            for collection, changes in deltas.items():
+                deducted = db.deductions[collection]
+                for doc_id, quantity in changes.items():
+                    deducted[doc_id] = deducted.get(doc_id, 0) + quantity
+
+    def find_idempotent(self, key_hash: str) -> str | None:
+        return self._db.idempotency.get(key_hash)
+
+    def find_by_barcode(self, barcode: str) -> str | None:
+        return self._db.barcodes.get(barcode)
+
+    def get_many(self, transaction_ids: list[str]) -> list[dict]:
+        sales = self._db.sales
+        return [copy.deepcopy(sales[str(tid)]) for tid in transaction_ids if str(tid) in sales]
+
+    def by_date_range(self, start_date: str, end_date: str, limit: int) -> list[dict]:
+        matches = [s for s in list(self._db.sales.values()) if start_date <= s.get('date', '') <= end_date]
+        return copy.deepcopy(sorted(matches, key=lambda s: s.get('date', ''))[:limit])
+
+    def iter_pages(self, start_date, end_date, page_size):
+        matches = sorted(
+            (s for s in list(self._db.sales.values())
+             if (not start_date or s.get('date', '') >= start_date) and (not end_date or s.get('date', '') <= end_date)),
+            key=lambda s: (s.get('date', ''), str(s.get('transaction_id')))
+        )
+        for offset in range(0, len(matches), page_size):
+            yield copy.deepcopy(matches[offset:offset + page_size])
+
+class MemoryRollupRepository(RollupRepository):
+    def __init__(self, db: MemorySalesDatabase):
+        self._db = db
+
+    def get_daily(self, start_date, end_date):
+        with self._db.lock:
+            return copy.deepcopy([
+                rollup for date, rollup in sorted(self._db.rollups.items())
+                if (not start_date or date >= start_date) and (not end_date or date <= end_date)
+            ])
+
+    def replace_days(self, rollups, cutoff):
+        db = self._db
+        with db.lock:
+            sales = list(db.sales.values())
+            for date, rollup in rollups.items():
+                rollup = rollup_with_late_sales(date, rollup, sales, cutoff)
+                if rollup:
+                    db.rollups[date] = copy.deepcopy(rollup)
+                else:
+                    db.rollups.pop(date, None)
+
+class MemoryInventoryRepository(InventoryRepository):
+    """So acumula as baixas das vendas: o estoque dos doces e ingredientes fica no Firestore."""
+
+    def __init__(self, db: MemorySalesDatabase):
+        self._db = db
+
+    def iter_pages(self, collection, page_size):
+        raise StockUnavailable(collection)
+
+class MemorySequenceRepository(SequenceRepository):
+    def __init__(self):
+        self._next = {}
+        self._lock = threading.Lock()
+
+    def lease(self, name: str, count: int) -> int:
+        with self._lock:
+            start = self._next.get(name, 0)
+            self._next[name] = start + count
+            return start
+
+class MemoryRevokedTokenRepository(RevokedTokenRepository):
+    def __init__(self):
+        self._tokens = {}
+        self._lock = threading.Lock()
+
+    def add(self, jti: str, expires_at: float, revoked_at: float) -> None:
+        with self._lock:
+            self._tokens.setdefault(jti, (expires_at, revoked_at))
+
+    def revoked_since(self, since: float, now: float) -> list[tuple[str, float]]:
+        with self._lock:
+            return [
+                (jti, expires_at) for jti, (expires_at, revoked_at) in self._tokens.items()
+                if revoked_at >= since and expires_at > now
+            ]
+
+    def purge(self, now: float) -> int:
+        with self._lock:
+            expired = [jti for jti, (expires_at, _) in self._tokens.items() if expires_at <= now]
+            for jti in expired:
+                del self._tokens[jti]
+            return len(expired)
+
+def memory_storage() -> Storage:
+    db = MemorySalesDatabase()
+    return Storage(
+        'memory',
+        MemoryUserRepository(),
+        MemoryApiKeyRepository(),
+        MemorySaleRepository(db),
+        MemoryRollupRepository(db),
+        MemoryInventoryRepository(db),
+        MemorySequenceRepository(),
+        MemoryRevokedTokenRepository()
+    )
@@ -0,0 +1,358 @@
+import json
+import sqlite3
+import threading
+from contextlib import contextmanager
+
+from server.src.storage.base import (
+    AlreadyStored, ApiKeyRepository, InventoryRepository, RevokedTokenRepository, RollupRepository,
+    SaleRepository, SequenceRepository, StockUnavailable, Storage, UserRepository
+)
+from server.src.storage.memory import now_iso
+from server.src.storage.rollups import rollup_with_late_sales
+from server.src.utils.logger import log_info
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS users (
+    id TEXT PRIMARY KEY,
+    username TEXT NOT NULL,
+    data TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS users_username ON users (username);
+CREATE TABLE IF NOT EXISTS api_keys (
+    key_hash TEXT PRIMARY KEY,
+    owner TEXT,
+    data TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS api_keys_owner ON api_keys (owner);
+CREATE TABLE IF NOT EXISTS sales (
+    transaction_id TEXT PRIMARY KEY,
+    date TEXT NOT NULL,
+    data TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS sales_date ON sales (date, transaction_id);
+CREATE TABLE IF NOT EXISTS barcodes (
+    barcode TEXT PRIMARY KEY,
+    transaction_id TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS idempotency_keys (
+    key_hash TEXT PRIMARY KEY,
+    transaction_id TEXT NOT NULL,
+    user_id TEXT,
+    created_at TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS rollups_daily (
+    date TEXT PRIMARY KEY,
+    vendas INTEGER NOT NULL,
+    total REAL NOT NULL,
+    custo REAL NOT NULL,
+    lucro REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS rollup_items (
+    date TEXT NOT NULL,
+    sweet_id TEXT NOT NULL,
+    nome TEXT NOT NULL,
+    quantidade INTEGER NOT NULL,
+    PRIMARY KEY (date, sweet_id)
+);
+CREATE TABLE IF NOT EXISTS stock_deductions (
+    collection TEXT NOT NULL,
+    doc_id TEXT NOT NULL,
+    quantity REAL NOT NULL,
+    PRIMARY KEY (collection, doc_id)
+);
+CREATE TABLE IF NOT EXISTS sequences (
+    name TEXT PRIMARY KEY,
+    next INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS revoked_tokens (
+    jti TEXT PRIMARY KEY,
+    expires_at REAL NOT NULL,
+    revoked_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS revoked_tokens_revoked_at ON revoked_tokens (revoked_at);
+CREATE INDEX IF NOT EXISTS revoked_tokens_expires_at ON revoked_tokens (expires_at);
+"""
+
+class SQLiteDatabase:
+    """Uma conexao por processo em modo WAL: leituras nao bloqueiam a escrita e o commit nao
+    reescreve o arquivo inteiro. Escritas usam BEGIN IMMEDIATE para falhar cedo em conflito.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None, timeout=5.0)
+        self._lock = threading.Lock()
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        self._conn.execute('PRAGMA synchronous=NORMAL')
+        self._conn.executescript(SCHEMA)
+        log_info(f'SQLite aberto em modo WAL: {path}')
+
+    def query(self, sql: str, params: tuple = ()) -> list[tuple]:
+        with self._lock:
+            return self._conn.execute(sql, params).fetchall()
+
+    @contextmanager
+    def transaction(self):
+        """Conexao dentro de BEGIN IMMEDIATE: o que for lido ja esta sob o lock de escrita do arquivo."""
+        with self._lock:
+            self._conn.execute('BEGIN IMMEDIATE')
+            try:
+                yield self._conn
+            except sqlite3.IntegrityError as e:
+                self._conn.execute('ROLLBACK')
+                raise AlreadyStored(str(e)) from e
+            except BaseException:
+                self._conn.execute('ROLLBACK')
+                raise
+            self._conn.execute('COMMIT')
+
+    def write(self, statements: list[tuple[str, tuple]]):
+        with self.transaction() as conn:
+            for sql, params in statements:
+                conn.execute(sql, params)
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+def dumps(document: dict) -> str:
+    return json.dumps(document, ensure_ascii=False, default=str)
+
+def rollup_statements(date: str, delta: dict) -> list[tuple[str, tuple]]:
+    """Somar o incremento ao rollup do dia, criando a linha do dia e dos itens se preciso."""
+    statements = [(
+        'INSERT INTO rollups_daily (date, vendas, total, custo, lucro) VALUES (?, ?, ?, ?, ?) '
+        'ON CONFLICT (date) DO UPDATE SET vendas = vendas + excluded.vendas, total = total + excluded.total, '
+        'custo = custo + excluded.custo, lucro = lucro + excluded.lucro',
+        (date, delta['vendas'], delta['total'], delta['custo'], delta['lucro'])
+    )]
+    for sweet_id, entry in delta['itens'].items():
+        statements.append((
+            'INSERT INTO rollup_items (date, sweet_id, nome, quantidade) VALUES (?, ?, ?, ?) '
+            'ON CONFLICT (date, sweet_id) DO UPDATE SET nome = excluded.nome, quantidade = quantidade + excluded.quantidade',
+            (date, sweet_id, entry['nome'], entry['quantidade'])
+        ))
+    return statements
+
+class SQLiteUserRepository(UserRepository):
+    def __init__(self, db: SQLiteDatabase):
+        self._db = db
+
+    def get_by_username(self, username: str) -> dict | None:
+        rows = self._db.query('SELECT data FROM users WHERE username = ? LIMIT 1', (username,))
+        return json.loads(rows[0][0]) if rows else None
+
+    def get_by_id(self, user_id) -> dict | None:
+        rows = self._db.query('SELECT data FROM users WHERE id = ?', (str(user_id),))
+        return json.loads(rows[0][0]) if rows else None
+
+    def create(self, user: dict) -> None:
+        document = {**user, "created_at": now_iso(), "updated_at": now_iso()}
+        self._db.write([(
+            'INSERT INTO users (id, username, data) VALUES (?, ?, ?)',
+            (str(user['id']), user['username'], dumps(document))
+        )])
+
+class SQLiteApiKeyRepository(ApiKeyRepository):
+    def __init__(self, db: SQLiteDatabase):
+        self._db = db
+
+    def create(self, key_hash: str, record: dict) -> None:
+        document = {**record, "created_at": now_iso()}
+        self._db.write([(
+            'INSERT INTO api_keys (key_hash, owner, data) VALUES (?, ?, ?)',
+            (key_hash, record.get('owner'), dumps(document))
+        )])
+
+    def get(self, key_hash: str) -> dict | None:
+        rows = self._db.query('SELECT data FROM api_keys WHERE key_hash = ?', (key_hash,))
+        return json.loads(rows[0][0]) if rows else None
+
+    def list(self, owner: str | None = None) -> list[dict]:
+        if owner:
+            rows = self._db.query('SELECT data FROM api_keys WHERE owner = ?', (owner,))
+        else:
+            rows = self._db.query('SELECT data FROM api_keys')
+        return [json.loads(row[0]) for row in rows]
+
+    def deactivate(self, key_hash: str) -> bool:
+        record = self.get(key_hash)
+        if not record:
+            return False
+        record.update({"active": False, "revoked_at": now_iso()})
+        self._db.write([('UPDATE api_keys SET data = ? WHERE key_hash = ?', (dumps(record), key_hash))])
+        return True
+
+class SQLiteSaleRepository(SaleRepository):
+    def __init__(self, db: SQLiteDatabase):
+        self._db = db
+
+    def create(self, sales, rollups, deltas, idempotency=None) -> None:
+        statements = []
+        for sale in sales:
+            transaction_id = str(sale['transaction_id'])
+            statements.append((
+                'INSERT INTO sales (transaction_id, date, data) VALUES (?, ?, ?)',
+                (transaction_id, sale.get('date', ''), dumps({**sale, "createdAt": now_iso()}))
+            ))
+            if sale.get('barcode_str'):
+                statements.append((
+                    'INSERT INTO barcodes (barcode, transaction_id) VALUES (?, ?)',
+                    (sale['barcode_str'], transaction_id)
+                ))
+        if idempotency:
+            key_hash, user_id = idempotency
+            statements.append((
+                'INSERT INTO idempotency_keys (key_hash, transaction_id, user_id, created_at) VALUES (?, ?, ?, ?)',
+                (key_hash, str(sales[0]['transaction_id']), None if user_id is None else str(user_id), now_iso())
+            ))
+        for date, delta in rollups.items():
+            statements.extend(rollup_statements(date, delta))
+        for collection, changes in deltas.items():
+            statements.extend(
+                ('INSERT INTO stock_deductions (collection, doc_id, quantity) VALUES (?, ?, ?) '
+                 'ON CONFLICT (collection, doc_id) DO UPDATE SET quantity = quantity + excluded.quantity',
+                 (collection, doc_id, quantity))
+                for doc_id, quantity in changes.items()
+            )
+        self._db.write(statements)
+
+    def find_idempotent(self, key_hash: str) -> str | None:
+        rows = self._db.query('SELECT transaction_id FROM idempotency_keys WHERE key_hash = ?', (key_hash,))
+        return rows[0][0] if rows else None
+
+    def find_by_barcode(self, barcode: str) -> str | None:
+        rows = self._db.query('SELECT transaction_id FROM barcodes WHERE barcode = ?', (barcode,))
+        return rows[0][0] if rows else None
+
+    def get_many(self, transaction_ids: list[str]) -> list[dict]:
+        ids = [str(tid) for tid in transaction_ids]
+        found = {}
+        for offset in range(0, len(ids), 500):
+            chunk = ids[offset:offset + 500]
+            rows = self._db.query(
+                f"SELECT transaction_id, data FROM sales WHERE transaction_id IN ({','.join('?' * len(chunk))})",
+                tuple(chunk)
+            )
+            found.update((tid, json.loads(data)) for tid, data in rows)
+        return [found[tid] for tid in ids if tid in found]
+
+    def by_date_range(self, start_date: str, end_date: str, limit: int) -> list[dict]:
+        rows = self._db.query(
+            'SELECT data FROM sales WHERE date >= ? AND date <= ? ORDER BY date, transaction_id LIMIT ?',
+            (start_date, end_date, limit)
+        )
+        return [json.loads(row[0]) for row in rows]
+
+    def iter_pages(self, start_date, end_date, page_size):
+        cursor = ('', '')
+        while True:
+            rows = self._db.query(
+                'SELECT date, transaction_id, data FROM sales '
+                'WHERE date >= ? AND date <= ? AND (date, transaction_id) > (?, ?) '
+                'ORDER BY date, transaction_id LIMIT ?',
+                (start_date or '', end_date or '\uffff', *cursor, page_size)
+            )
+            if not rows:
+                return
+            yield [json.loads(row[2]) for row in rows]
+            if len(rows) < page_size:
+                return
+            cursor = (rows[-1][0], rows[-1][1])
+
+class SQLiteRollupRepository(RollupRepository):
+    def __init__(self, db: SQLiteDatabase):
+        self._db = db
+
+    def get_daily(self, start_date, end_date):
+        bounds = (start_date or '', end_date or '\uffff')
+        rollups = {
+            date: {"date": date, "vendas": vendas, "total": total, "custo": custo, "lucro": lucro, "itens": {}}
+            for date, vendas, total, custo, lucro in self._db.query(
+                'SELECT date, vendas, total, custo, lucro FROM rollups_daily WHERE date >= ? AND date <= ? ORDER BY date',
+                bounds
+            )
+        }
+        for date, sweet_id, nome, quantidade in self._db.query(
+            'SELECT date, sweet_id, nome, quantidade FROM rollup_items WHERE date >= ? AND date <= ?', bounds
+        ):
+            if date in rollups:
+                rollups[date]["itens"][sweet_id] = {"nome": nome, "quantidade": quantidade}
+        return list(rollups.values())
+
+    def replace_days(self, rollups, cutoff):
+        dates = list(rollups)
+        if not dates:
+            return
+        placeholders = ', '.join('?' * len(dates))
+        with self._db.transaction() as conn:
+            # So as vendas gravadas depois do corte mudam o rollup; o filtro fica em rollup_with_late_sales.
+            sales = [
+                json.loads(row[0])
+                for row in conn.execute(f'SELECT data FROM sales WHERE date IN ({placeholders})', dates)
+            ]
+            conn.execute(f'DELETE FROM rollups_daily WHERE date IN ({placeholders})', dates)
+            conn.execute(f'DELETE FROM rollup_items WHERE date IN ({placeholders})', dates)
+            for date, rollup in rollups.items():
+                rollup = rollup_with_late_sales(date, rollup, sales, cutoff)
+                if rollup:
+                    for sql, params in rollup_statements(date, rollup):
+                        conn.execute(sql, params)
+
+class SQLiteInventoryRepository(InventoryRepository):
+    """So acumula as baixas das vendas (stock_deductions): o estoque dos doces e ingredientes fica no Firestore."""
+
+    def __init__(self, db: SQLiteDatabase):
+        self._db = db
+
+    def iter_pages(self, collection, page_size):
+        raise StockUnavailable(collection)
+
+class SQLiteSequenceRepository(SequenceRepository):
+    def __init__(self, db: SQLiteDatabase):
+        self._db = db
+
+    def lease(self, name: str, count: int) -> int:
+        with self._db.transaction() as conn:
+            row = conn.execute('SELECT next FROM sequences WHERE name = ?', (name,)).fetchone()
+            start = row[0] if row else 0
+            conn.execute(
+                'INSERT INTO sequences (name, next) VALUES (?, ?) ON CONFLICT (name) DO UPDATE SET next = excluded.next',
+                (name, start + count)
+            )
+            return start
+
+class SQLiteRevokedTokenRepository(RevokedTokenRepository):
+    def __init__(self, db: SQLiteDatabase):
+        self._db = db
+
+    def add(self, jti: str, expires_at: float, revoked_at: float) -> None:
+        self._db.write([(
+            'INSERT OR IGNORE INTO revoked_tokens (jti, expires_at, revoked_at) VALUES (?, ?, ?)',
+            (jti, expires_at, revoked_at)
+        )])
+
+    def revoked_since(self, since: float, now: float) -> list[tuple[str, float]]:
+        return self._db.query(
+            'SELECT jti, expires_at FROM revoked_tokens WHERE revoked_at >= ? AND expires_at > ?',
+            (since, now)
+        )
+
+    def purge(self, now: float) -> int:
+        expired = self._db.query('SELECT COUNT(*) FROM revoked_tokens WHERE expires_at <= ?', (now,))[0][0]
+        if expired:
+            self._db.write([('DELETE FROM revoked_tokens WHERE expires_at <= ?', (now,))])
+        return expired
+
+def sqlite_storage(path: str) -> Storage:
+    db = SQLiteDatabase(path)
+    return Storage(
+        'sqlite',
+        SQLiteUserRepository(db),
+        SQLiteApiKeyRepository(db),
+        SQLiteSaleRepository(db),
+        SQLiteRollupRepository(db),
+        SQLiteInventoryRepository(db),
+        SQLiteSequenceRepository(db),
+        SQLiteRevokedTokenRepository(db)
+    )
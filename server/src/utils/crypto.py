@@ -1,8 +1,6 @@
 import os
 from typing import Dict, List
 
-from cryptography.hazmat.primitives import serialization
-
 current_dir = os.path.dirname(os.path.abspath(__file__))
 
 def find_keys() -> List[str]:
@@ -19,6 +17,7 @@ def find_keys() -> List[str]:
     return keys
 
 def identify_valid_keys(key_array: List[str]) -> Dict[str, object]:
+    from cryptography.hazmat.primitives import serialization
     valid_key_paths = {}
     
     for key_path in key_array:
@@ -0,0 +1,90 @@
+"""Middleware ASGI de CORS e cabecalhos de seguranca.
+
+Todos os cabecalhos sao montados uma vez na inicializacao: cada resposta so recebe a tupla pronta
+e o preflight (OPTIONS) e respondido direto daqui, sem passar pelo Quart.
+"""
+import os
+
+DEFAULT_ALLOWED_ORIGINS = 'http://localhost:3000'
+CORS_ALLOW_METHODS = ('GET', 'POST', 'PUT', 'DELETE', 'OPTIONS')
+CORS_ALLOW_HEADERS = ('Authorization', 'Content-Type', 'Accept', 'Idempotency-Key')
+CORS_EXPOSE_HEADERS = ('Content-Type', 'ETag', 'X-Transaction-Id', 'X-Receipt-Status', 'Idempotent-Replayed')
+
+SECURITY_HEADERS = (
+    (b'strict-transport-security', b'max-age=63072000; includeSubDomains; preload'),
+    (b'x-content-type-options', b'nosniff'),
+    (b'x-frame-options', b'DENY'),
+    (b'referrer-policy', b'no-referrer-when-downgrade'),
+    (b'permissions-policy', b'geolocation=(), microphone=()'),
+    (b'x-xss-protection', b'1; mode=block'),
+)
+
+PREFLIGHT_BODY = b'{"status":"ok"}\n'
+
+def _header_value(values) -> bytes:
+    return ', '.join(values).encode('latin-1')
+
+class SecurityHeadersMiddleware:
+    """Envolve o app ASGI acrescentando CORS (origens em CORS_ALLOWED_ORIGINS) e SECURITY_HEADERS."""
+
+    def __init__(self, app, allowed_origins: str | None = None, max_age: int | None = None):
+        self.app = app
+        allowed_origins = allowed_origins or os.getenv('CORS_ALLOWED_ORIGINS', DEFAULT_ALLOWED_ORIGINS)
+        max_age = max_age if max_age is not None else int(os.getenv('CORS_MAX_AGE', '3600'))
+        origins = {origin.strip().encode('latin-1') for origin in allowed_origins.split(',') if origin.strip()}
+
+        base = SECURITY_HEADERS + ((b'vary', b'Origin'),)
+        self.default_headers = base
+        self.response_headers = {}
+        self.preflight_starts = {}
+        for origin in origins:
+            cors = (
+                (b'access-control-allow-origin', origin),
+                (b'access-control-allow-credentials', b'true'),
+            )
+            self.response_headers[origin] = base + cors + (
+                (b'access-control-expose-headers', _header_value(CORS_EXPOSE_HEADERS)),
+            )
+            self.preflight_starts[origin] = self._preflight_start(base + cors + (
+                (b'access-control-allow-methods', _header_value(CORS_ALLOW_METHODS)),
+                (b'access-control-allow-headers', _header_value(CORS_ALLOW_HEADERS)),
+                (b'access-control-max-age', str(max_age).encode()),
+            ))
+        self.preflight_denied = self._preflight_start(base)
+        self.preflight_body = {'type': 'http.response.body', 'body': PREFLIGHT_BODY, 'more_body': False}
+
+    @staticmethod
+    def _preflight_start(headers: tuple) -> dict:
+        return {
+            'type': 'http.response.start',
+            'status': 200,
+            'headers': headers + (
+                (b'content-type', b'application/json'),
+                (b'content-length', str(len(PREFLIGHT_BODY)).encode()),
+            ),
+        }
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] != 'http':
+            await self.app(scope, receive, send)
+            return
+
+        origin = None
+        for name, value in scope['headers']:
+            if name == b'origin':
+                origin = value
+                break
+
+        if scope['method'] == 'OPTIONS':
+            await send(self.preflight_starts.get(origin, self.preflight_denied))
+            await send(self.preflight_body)
+            return
+
+        extra = self.response_headers.get(origin, self.default_headers)
+
+        async def send_with_headers(message):
+            if message['type'] == 'http.response.start':
+                message['headers'] = (*message.get('headers', ()), *extra)
+            await send(message)
+
+        await self.app(scope, receive, send_with_headers)
@@ -1,3 +1,5 @@
+import datetime
+
 from server.src.utils.logger import log_debug, log_error
 
 def read_bytes(path: str) -> bytes | None:
@@ -27,3 +29,23 @@ def generate_numeric_id_from_string(input_string: str, uuid_str: str = "", trans
     numeric_id_str = str(limited_sum).zfill(13)
     
     return numeric_id_str
+
+def is_iso_date(value) -> bool:
+    """Validar data no formato YYYY-MM-DD."""
+    if not isinstance(value, str) or len(value) != 10:
+        return False
+    try:
+        datetime.date.fromisoformat(value)
+        return True
+    except ValueError:
+        return False
+
+def ean13_check_digit(digits: str) -> str:
+    """Digito verificador EAN-13 para os 12 primeiros digitos."""
+    total = sum(int(d) * (3 if i % 2 else 1) for i, d in enumerate(digits[:12]))
+    return str((10 - total % 10) % 10)
+
+def is_valid_ean13(code) -> bool:
+    if not isinstance(code, str) or len(code) != 13 or not code.isdigit():
+        return False
+    return ean13_check_digit(code) == code[12]
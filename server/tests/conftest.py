@@ -0,0 +1,56 @@
+import asyncio
+import os
+
+import pytest
+
+# Antes de importar o servidor: armazenamento em memoria e Firestore falso, sem credenciais reais.
+os.environ.setdefault('STORAGE_BACKEND', 'memory')
+os.environ.setdefault('FAKE_FIRESTORE', 'true')
+os.environ.setdefault('BARCODE_SHARD', '7')
+
+from server.src.storage import backend
+from server.src.storage.memory import memory_storage
+
+@pytest.fixture(scope='session')
+def app(tmp_path_factory):
+    from cryptography.hazmat.primitives.asymmetric import rsa
+
+    # Importar o app cria o server.log no diretorio atual.
+    with pytest.MonkeyPatch.context() as patch:
+        patch.chdir(tmp_path_factory.mktemp('logs'))
+        from server.main import app
+
+    private_key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+    app.config["JWT_PRIVATE_KEY"] = private_key
+    app.config["JWT_PUBLIC_KEY"] = private_key.public_key()
+    yield app
+
+    from server.src.services.receipt_batch import shutdown_render_pool
+    shutdown_render_pool()
+
+@pytest.fixture
+def storage(monkeypatch):
+    """Armazenamento em memoria novo para cada teste."""
+    storage = memory_storage()
+    monkeypatch.setattr(backend, 'storage', storage)
+    return storage
+
+@pytest.fixture
+def auth_headers(app):
+    from quart_jwt_extended import create_access_token
+
+    async def access_token():
+        async with app.app_context():
+            return create_access_token(identity={"id": 1, "username": "operador"})
+
+    return {"Authorization": f"Bearer {asyncio.run(access_token())}"}
+
+@pytest.fixture
+def call(app):
+    """Fazer uma requisicao ao app e devolver (resposta, corpo)."""
+    def call(method: str, path: str, headers: dict | None = None, **kwargs):
+        async def send():
+            response = await app.test_client().open(path, method=method, headers=headers or {}, **kwargs)
+            return response, await response.get_data()
+        return asyncio.run(send())
+    return call
@@ -0,0 +1,55 @@
+import json
+
+import pytest
+
+from server.src.services.barcode_ids import BarcodeSequence, configured_shard
+from server.src.utils.utils import ean13_check_digit, is_valid_ean13
+
+def sale_payload() -> dict:
+    return {
+        "payment_type": "PIX",
+        "payer": {"nome": "Ana"},
+        "receiver": {"nome": "Sweet Home"},
+        "items": [{"sweetId": "s1", "sweetName": "Brigadeiro", "quantity": 2, "priceAtSale": 2.5}],
+        "totalAmount": 5.0,
+        "receipt": False,
+    }
+
+def test_workers_on_one_shard_never_repeat(storage):
+    workers = [BarcodeSequence(shard=7, block_size=3), BarcodeSequence(shard=7, block_size=3)]
+    codes = [worker.next_barcode() for _ in range(5) for worker in workers]
+
+    assert len(set(codes)) == len(codes)
+    assert all(is_valid_ean13(code) and code.startswith('207') for code in codes)
+    # Um reinicio retoma depois dos blocos ja reservados.
+    assert BarcodeSequence(shard=7, block_size=3).next_barcode() not in codes
+    assert BarcodeSequence(shard=8).next_barcode()[:3] == '208'
+
+@pytest.mark.parametrize('value', ['', 'sete', '100', '-1'])
+def test_shard_is_required(monkeypatch, value):
+    monkeypatch.setenv('BARCODE_SHARD', value)
+    with pytest.raises(RuntimeError):
+        configured_shard()
+
+def test_check_digit():
+    assert ean13_check_digit('400638133393') == '1'
+    assert is_valid_ean13('4006381333931')
+    assert not is_valid_ean13('4006381333932')
+    assert not is_valid_ean13('400638133393')
+
+def test_sale_is_found_by_its_barcode(call, storage, auth_headers):
+    response, body = call('POST', '/api/sales/finish', auth_headers, json=sale_payload())
+    created = json.loads(body)
+    assert response.status_code == 201
+    assert is_valid_ean13(created["barcode"])
+
+    response, body = call('GET', f'/api/sales/barcode/{created["barcode"]}', auth_headers)
+    assert response.status_code == 200
+    found = json.loads(body)
+    assert found["transaction_id"] == created["transaction_id"]
+    assert found["sale"]["barcode_str"] == created["barcode"]
+
+    response, _ = call('GET', '/api/sales/barcode/4006381333932', auth_headers)
+    assert response.status_code == 400
+    response, _ = call('GET', '/api/sales/barcode/4006381333931', auth_headers)
+    assert response.status_code == 404
@@ -0,0 +1,61 @@
+import pytest
+
+from server.src.services.cost_engine import CostEngine
+from server.src.storage.base import INGREDIENTS_COLLECTION, SWEETS_COLLECTION
+
+@pytest.fixture
+def engine():
+    engine = CostEngine()
+    engine.load(
+        ingredients=[
+            {"id": "leite", "costPerBaseUnit": 0.01},
+            {"id": "chocolate", "costPerBaseUnit": 0.05},
+            {"id": "coco"},
+        ],
+        recipes=[
+            {"id": "brigadeiro", "ingredients": [
+                {"ingredientId": "leite", "quantityInBaseUnit": 20},
+                {"ingredientId": "chocolate", "quantityInBaseUnit": 4},
+            ]},
+            {"id": "beijinho", "ingredients": [
+                {"ingredientId": "leite", "quantityInBaseUnit": 20},
+                {"ingredientId": "coco", "quantityInBaseUnit": 5},
+            ]},
+        ],
+        sweets=[{"id": "brigadeiro"}, {"id": "beijinho"}]
+    )
+    return engine
+
+def test_unit_costs(engine):
+    assert engine.loaded
+    assert engine.unit_cost('brigadeiro') == 0.4
+    # Ingrediente sem custo nao entra na soma.
+    assert engine.unit_cost('beijinho') == 0.2
+    assert engine.unit_cost('desconhecido') is None
+
+def test_ingredient_change_recomputes_only_affected_sweets(engine):
+    assert engine.set_ingredient_cost('chocolate', 0.1) == {'brigadeiro'}
+    assert engine.unit_cost('brigadeiro') == 0.6
+    assert engine.set_ingredient_cost('coco', 0.02) == {'beijinho'}
+    assert engine.unit_cost('beijinho') == 0.3
+
+    assert engine.set_ingredient_cost('leite', None, exists=False) == {'brigadeiro', 'beijinho'}
+    assert engine.unit_cost('beijinho') == 0.1
+    assert not engine.exists(INGREDIENTS_COLLECTION, 'leite')
+
+def test_recipe_change(engine):
+    engine.set_recipe('brigadeiro', [{"ingredientId": "chocolate", "quantityInBaseUnit": 2}])
+    assert engine.unit_cost('brigadeiro') == 0.1
+    assert engine.set_ingredient_cost('leite', 0.02) == {'beijinho'}
+
+    engine.set_recipe('brigadeiro', None)
+    assert engine.unit_cost('brigadeiro') is None
+    assert engine.recipe_lines('brigadeiro') == ()
+
+def test_known_documents(engine):
+    assert engine.exists(SWEETS_COLLECTION, 'brigadeiro')
+    assert engine.exists(INGREDIENTS_COLLECTION, 'coco')
+    engine.set_sweet('brigadeiro', False)
+    assert not engine.exists(SWEETS_COLLECTION, 'brigadeiro')
+    engine.set_sweet('novo', True)
+    assert engine.exists(SWEETS_COLLECTION, 'novo')
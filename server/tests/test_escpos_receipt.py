@@ -0,0 +1,69 @@
+"""Bytes ESC/POS comparados com arquivos de referencia em tests/fixtures.
+
+Para regenerar depois de uma mudanca intencional no formato: UPDATE_GOLDEN=true pytest tests/test_escpos_receipt.py
+"""
+import os
+import uuid
+from decimal import Decimal
+from pathlib import Path
+
+import pytest
+
+from server.src.models.comprovante_model import Comprovante, MetodoPagamento
+from server.src.services.escpos_receipt import _code128, _qrcode, render_escpos
+from server.src.services.generate_pdf import QRCODE_URL
+
+FIXTURES = Path(__file__).parent / 'fixtures'
+UPDATE_GOLDEN = os.getenv('UPDATE_GOLDEN', 'false').lower() == 'true'
+
+def assert_golden(name: str, data: bytes):
+    path = FIXTURES / name
+    if UPDATE_GOLDEN:
+        path.write_bytes(data)
+    assert data == path.read_bytes()
+
+def sample_comprovante() -> Comprovante:
+    return Comprovante(
+        qtd=0,
+        value=Decimal('0'),
+        payment_type=MetodoPagamento.PIX,
+        payer={"nome": "João"},
+        receiver={"nome": "Sweet Home"},
+        transaction_id=uuid.UUID('12345678-1234-5678-1234-567812345678'),
+        timestamp='2025-03-14 15:09:26',
+        barcode_str='2070000000015',
+        items=[
+            {"sweetId": "s1", "sweetName": "Brigadeiro", "quantity": 3,
+             "priceAtSale": 2.5, "subtotal": 7.5, "itemDiscount": 0, "discountedAmount": 0},
+            {"sweetId": "s2", "sweetName": "Pão de mel com cobertura de chocolate", "quantity": 2,
+             "priceAtSale": 6.0, "subtotal": 10.8, "itemDiscount": 10, "discountedAmount": 1.2},
+        ],
+        subtotal=Decimal('19.50'),
+        itemDiscountsTotal=Decimal('1.20'),
+        globalDiscountPercent=Decimal('5'),
+        globalDiscountAmount=Decimal('0.92'),
+        totalAmount=Decimal('17.38')
+    )
+
+def test_code128_set_c():
+    data = _code128('207000000001')
+    assert b'{B' not in data
+    assert_golden('code128_set_c.bin', data)
+
+def test_code128_set_c_with_set_b_tail():
+    data = _code128('2070000000015')
+    assert data.endswith(b'{B5')
+    assert_golden('code128_set_b.bin', data)
+
+@pytest.mark.parametrize('code', ['', None, 'sem-digitos'])
+def test_code128_without_digits(code):
+    assert _code128(code) == b''
+
+def test_qrcode():
+    assert_golden('qrcode.bin', _qrcode(QRCODE_URL))
+
+def test_receipt_stream():
+    assert_golden('receipt.bin', render_escpos(sample_comprovante(), 'operador', columns=48))
+
+def test_receipt_stream_narrow_paper():
+    assert_golden('receipt_32.bin', render_escpos(sample_comprovante(), 'operador', columns=32))
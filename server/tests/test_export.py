@@ -0,0 +1,69 @@
+import csv
+import gzip
+import io
+import json
+
+import pytest
+
+from server.src.services import export_service
+from server.src.storage.rollups import merged_rollup_deltas
+
+@pytest.fixture
+def sales(storage, monkeypatch):
+    """Sete vendas em tres dias, lidas em paginas de tres."""
+    documents = [
+        {"transaction_id": f"t-{i}", "id": f"t-{i}", "date": f"2025-03-1{i % 3}", "totalAmount": 2.5 * (i + 1),
+         "operatorName": "Ana", "items": [{"sweetId": "s1", "sweetName": "Brigadeiro", "quantity": i + 1}]}
+        for i in range(7)
+    ]
+    storage.sales.create(documents, merged_rollup_deltas(documents), {})
+
+    pages = []
+    iter_sales_pages = export_service.iter_sales_pages
+
+    def small_pages(start_date, end_date, page_size):
+        for page in iter_sales_pages(start_date, end_date, page_size=3):
+            pages.append(len(page))
+            yield page
+
+    monkeypatch.setattr(export_service, 'iter_sales_pages', small_pages)
+    return pages
+
+def test_csv_export_streams_every_page(call, auth_headers, sales):
+    response, body = call('GET', '/api/export/sales', auth_headers)
+    assert response.status_code == 200
+    assert response.mimetype == 'text/csv'
+    assert sales == [3, 3, 1]
+
+    rows = list(csv.DictReader(io.StringIO(body.decode())))
+    assert tuple(rows[0]) == export_service.EXPORT_COLUMNS['sales']
+    assert sorted(row['id'] for row in rows) == [f"t-{i}" for i in range(7)]
+    assert [row['date'] for row in rows] == sorted(row['date'] for row in rows)
+    assert json.loads(rows[0]['items'])[0]['sweetName'] == 'Brigadeiro'
+
+def test_ndjson_export_filters_by_date(call, auth_headers, sales):
+    response, body = call('GET', '/api/export/sales?format=ndjson&start_date=2025-03-11&end_date=2025-03-12',
+                          auth_headers)
+    documents = [json.loads(line) for line in body.decode().splitlines()]
+    assert response.mimetype == 'application/x-ndjson'
+    assert sorted(document['transaction_id'] for document in documents) == ['t-1', 't-2', 't-4', 't-5']
+
+def test_gzip_export_matches_the_plain_one(call, auth_headers, sales):
+    _, plain = call('GET', '/api/export/sales', auth_headers)
+    response, compressed = call('GET', '/api/export/sales', {**auth_headers, "Accept-Encoding": "gzip"})
+    assert response.headers['Content-Encoding'] == 'gzip'
+    assert gzip.decompress(compressed) == plain
+
+    response, body = call('GET', '/api/export/sales?gzip=false', {**auth_headers, "Accept-Encoding": "gzip"})
+    assert 'Content-Encoding' not in response.headers
+    assert body == plain
+
+@pytest.mark.parametrize('path, status', [
+    ('/api/export/sweets', 409),
+    ('/api/export/clientes', 404),
+    ('/api/export/sales?format=xlsx', 400),
+    ('/api/export/sales?start_date=2025-03-15&end_date=2025-03-10', 400),
+])
+def test_export_errors(call, storage, auth_headers, path, status):
+    response, _ = call('GET', path, auth_headers)
+    assert response.status_code == status
@@ -0,0 +1,112 @@
+import time
+
+import pytest
+from firebase_admin import firestore
+from google.api_core.exceptions import AlreadyExists, NotFound, ServiceUnavailable
+from google.cloud.firestore_v1.transforms import DELETE_FIELD, SERVER_TIMESTAMP, Increment
+
+from server.src.storage.fake_firestore import DESCENDING, ChangeType, FakeFirestore
+
+@pytest.fixture
+def db():
+    return FakeFirestore()
+
+def test_latency_and_stats():
+    db = FakeFirestore(latency_ms=20)
+    ref = db.collection('doces').document('brigadeiro')
+    started = time.perf_counter()
+    ref.set({"nome": "Brigadeiro"})
+    ref.get()
+    assert time.perf_counter() - started >= 0.04
+    assert db.stats['commit'] == 1
+    assert db.stats['get'] == 1
+
+def test_injected_failures_follow_the_seed():
+    with pytest.raises(ServiceUnavailable):
+        FakeFirestore(error_rate=1).collection('doces').document('x').get()
+
+    def failures(seed):
+        db, failed = FakeFirestore(error_rate=0.5, seed=seed), []
+        for i in range(20):
+            try:
+                db.collection('doces').document(str(i)).get()
+                failed.append(False)
+            except ServiceUnavailable:
+                failed.append(True)
+        return failed
+
+    assert failures(7) == failures(7)
+    assert 0 < sum(failures(7)) < 20
+
+def test_transforms(db):
+    ref = db.collection('rollups').document('2025-03-14')
+    ref.set({"vendas": Increment(1), "itens": {"s1": {"quantidade": Increment(2)}}, "criado": SERVER_TIMESTAMP})
+    ref.set({"vendas": Increment(1), "itens": {"s1": {"quantidade": Increment(3)}}}, merge=True)
+    ref.update({"itens.s2.quantidade": Increment(1), "criado": DELETE_FIELD})
+
+    assert ref.get().to_dict() == {"vendas": 2, "itens": {"s1": {"quantidade": 5}, "s2": {"quantidade": 1}}}
+    with pytest.raises(AlreadyExists):
+        ref.create({})
+    with pytest.raises(NotFound):
+        db.collection('rollups').document('ausente').update({"vendas": 1})
+
+def test_queries(db):
+    sales = db.collection('sales')
+    for i, date in enumerate(['2025-03-12', '2025-03-14', '2025-03-13', '2025-03-15']):
+        sales.document(f't{i}').set({"date": date, "total": i})
+
+    query = sales.where('date', '>=', '2025-03-13').order_by('date', direction=DESCENDING)
+    assert [doc.id for doc in query.stream()] == ['t3', 't1', 't2']
+    first = list(query.limit(2).stream())
+    assert [doc.id for doc in query.start_after(first[-1]).stream()] == ['t2']
+    assert [doc.id for doc in sales.where('total', 'in', [0, 3]).stream()] == ['t0', 't3']
+
+def test_batch_is_atomic(db):
+    sales = db.collection('sales')
+    sales.document('t1').create({"total": 1})
+
+    batch = db.batch()
+    batch.set(sales.document('t2'), {"total": 2})
+    batch.create(sales.document('t1'), {"total": 3})
+    with pytest.raises(AlreadyExists):
+        batch.commit()
+    assert not sales.document('t2').get().exists
+    assert sales.document('t1').get().to_dict() == {"total": 1}
+
+    batch = db.batch()
+    for i in range(501):
+        batch.set(sales.document(f'x{i}'), {})
+    with pytest.raises(ValueError):
+        batch.commit()
+
+def test_transactional(db):
+    ref = db.collection('sequences').document('07')
+
+    @firestore.transactional
+    def lease(transaction, count):
+        snapshot = ref.get(transaction=transaction)
+        start = snapshot.to_dict()['next'] if snapshot.exists else 0
+        transaction.set(ref, {"next": start + count})
+        return start
+
+    assert lease(db.transaction(), 100) == 0
+    assert lease(db.transaction(), 100) == 100
+    assert ref.get().to_dict() == {"next": 200}
+
+def test_on_snapshot(db):
+    sales = db.collection('sales')
+    sales.document('t1').set({"total": 1})
+    events = []
+    watch = sales.on_snapshot(lambda docs, changes, read_time: events.extend(
+        (change.type, change.document.id) for change in changes
+    ))
+
+    sales.document('t2').set({"total": 2})
+    sales.document('t1').update({"total": 3})
+    sales.document('t2').delete()
+    watch.unsubscribe()
+    sales.document('t3').set({"total": 4})
+
+    assert events == [
+        (ChangeType.ADDED, 't1'), (ChangeType.ADDED, 't2'), (ChangeType.MODIFIED, 't1'), (ChangeType.REMOVED, 't2')
+    ]
@@ -0,0 +1,58 @@
+import pytest
+
+from server.src.services import inventory_service
+from server.src.services.cost_engine import CostEngine
+from server.src.services.inventory_service import inventory_deltas, valid_document_id
+from server.src.services.sales_store import save_sale
+from server.src.storage.base import INGREDIENTS_COLLECTION, SWEETS_COLLECTION
+
+@pytest.fixture
+def engine(monkeypatch):
+    engine = CostEngine()
+    engine.load(
+        ingredients=[{"id": "leite", "costPerBaseUnit": 0.01}, {"id": "chocolate", "costPerBaseUnit": 0.05}],
+        recipes=[{"id": "brigadeiro", "ingredients": [
+            {"ingredientId": "leite", "quantityInBaseUnit": 20},
+            {"ingredientId": "chocolate", "quantityInBaseUnit": 4},
+            {"ingredientId": "granulado", "quantityInBaseUnit": 1},
+        ]}],
+        sweets=[{"id": "brigadeiro"}]
+    )
+    monkeypatch.setattr(inventory_service, 'cost_engine', engine)
+    return engine
+
+@pytest.mark.parametrize('doc_id, valid', [
+    ('brigadeiro', True), ('', False), ('a/b', False), ('..', False), ('__id__', False), ('x' * 1501, False),
+])
+def test_valid_document_id(doc_id, valid):
+    assert valid_document_id(doc_id) is valid
+
+def test_repeated_items_become_one_write(monkeypatch):
+    monkeypatch.setattr(inventory_service.cost_engine, 'loaded', False)
+    deltas = inventory_deltas([
+        {"sweetId": "s1", "quantity": 2},
+        {"sweetId": "s1", "quantity": 3},
+        {"sweetId": "s2", "quantity": 0},
+        {"sweetId": "a/b", "quantity": 1},
+        {"quantity": 1},
+    ])
+    assert deltas == {SWEETS_COLLECTION: {"s1": 5}, INGREDIENTS_COLLECTION: {}}
+
+def test_unknown_sweets_and_ingredients_are_skipped(engine):
+    items = [{"sweetId": "brigadeiro", "quantity": 2}, {"sweetId": "apagado", "quantity": 1}]
+
+    assert inventory_deltas(items, deduct_ingredients=False) == {
+        SWEETS_COLLECTION: {"brigadeiro": 2}, INGREDIENTS_COLLECTION: {}
+    }
+    assert inventory_deltas(items, deduct_ingredients=True) == {
+        SWEETS_COLLECTION: {"brigadeiro": 2}, INGREDIENTS_COLLECTION: {"leite": 40, "chocolate": 8}
+    }
+
+def test_deductions_are_stored_with_the_sale(storage, engine):
+    sale = {
+        "transaction_id": "t-1", "date": "2025-03-14", "barcode_str": "2070000000015",
+        "items": [{"sweetId": "brigadeiro", "quantity": 2}, {"sweetId": "apagado", "quantity": 1}],
+        "totalAmount": 5.0,
+    }
+    assert save_sale(sale) == ("t-1", True)
+    assert storage.sales._db.deductions[SWEETS_COLLECTION] == {"brigadeiro": 2}
@@ -0,0 +1,22 @@
+import json
+import os
+import subprocess
+import sys
+
+from server.benchmarks.check_import_time import LAZY_MODULES, ROOT
+
+def imported_after(code: str, cwd) -> list[str]:
+    """Modulos pesados carregados depois de executar `code` num interpretador novo."""
+    script = f"import json, sys\n{code}\nprint(json.dumps([m for m in {list(LAZY_MODULES)!r} if m in sys.modules]))"
+    env = {**os.environ, "PYTHONPATH": ROOT, "STORAGE_BACKEND": "memory"}
+    result = subprocess.run([sys.executable, '-c', script], capture_output=True, text=True, cwd=cwd, env=env, check=True)
+    return json.loads(result.stdout.splitlines()[-1])
+
+def test_importing_the_app_skips_heavy_modules(tmp_path):
+    assert imported_after('import server.main', tmp_path) == []
+
+def test_heavy_modules_load_on_first_use(tmp_path):
+    code = "import server.main\nfrom server.src.services.generate_pdf import code128_modules\ncode128_modules('2070000000015')"
+    imported = imported_after(code, tmp_path)
+    assert 'barcode' in imported
+    assert 'fpdf' not in imported and 'firebase_admin' not in imported
@@ -0,0 +1,62 @@
+from decimal import Decimal
+
+import pytest
+
+from server.src.services.cost_engine import cost_engine
+from server.src.services.pricing import mismatched_totals, price_sale
+
+@pytest.fixture(autouse=True)
+def without_cost_engine(monkeypatch):
+    monkeypatch.setattr(cost_engine, 'loaded', False)
+
+def test_totals_are_exact_decimals():
+    items = [
+        {"sweetId": "s1", "quantity": 3, "priceAtSale": 0.1},
+        {"sweetId": "s2", "quantity": 1, "priceAtSale": "19.99", "itemDiscount": 10},
+    ]
+    priced = price_sale(items, 5)
+
+    assert priced.qtd == 4
+    assert priced.subtotal == Decimal('20.29')
+    assert priced.itemDiscountsTotal == Decimal('2.00')
+    assert priced.globalDiscountAmount == Decimal('0.91')
+    assert priced.totalAmount == Decimal('17.38')
+    assert priced.items[0]["subtotal"] == pytest.approx(0.3)
+
+def test_cost_falls_back_to_client_values():
+    priced = price_sale([{"sweetId": "s1", "quantity": 2, "priceAtSale": 5, "cost": 1.25, "costTotal": 2.5}], 0)
+    assert priced.totalCost == 2.5
+    assert priced.items[0]["profit"] == 7.5
+
+def test_cost_from_engine(monkeypatch):
+    monkeypatch.setattr(cost_engine, 'loaded', True)
+    monkeypatch.setattr(cost_engine, '_unit_costs', {"s1": 1.5})
+    priced = price_sale([{"sweetId": "s1", "quantity": 2, "priceAtSale": 5, "costTotal": 99}], 0)
+    assert priced.totalCost == 3.0
+
+@pytest.mark.parametrize('item, message', [
+    ("x", 'Item invalido'),
+    ({"quantity": 0, "priceAtSale": 1}, 'Quantidade invalida'),
+    ({"quantity": True, "priceAtSale": 1}, 'Quantidade invalida'),
+    ({"quantity": 1.5, "priceAtSale": 1}, 'Quantidade invalida'),
+    ({"quantity": 1, "priceAtSale": -1}, 'Preco invalido'),
+    ({"quantity": 1, "priceAtSale": "NaN"}, 'Valor invalido: priceAtSale'),
+    ({"quantity": 1, "priceAtSale": None}, 'Valor invalido: priceAtSale'),
+    ({"quantity": 1, "priceAtSale": 1, "itemDiscount": 101}, 'Desconto de item invalido'),
+])
+def test_invalid_items(item, message):
+    with pytest.raises(ValueError, match=message):
+        price_sale([item], 0)
+
+@pytest.mark.parametrize('percent', [-1, 101, "abc", "Infinity"])
+def test_invalid_global_discount(percent):
+    with pytest.raises(ValueError):
+        price_sale([{"quantity": 1, "priceAtSale": 1}], percent)
+
+def test_mismatched_totals():
+    priced = price_sale([{"quantity": 3, "priceAtSale": 0.1}], 0)
+
+    assert mismatched_totals(priced, {"subtotal": 0.3, "totalAmount": "0.305"}) == []
+    assert mismatched_totals(priced, {"subtotal": 0.3, "totalAmount": 0.32}) == ['totalAmount']
+    assert mismatched_totals(priced, {"itemDiscountsTotal": "abc"}) == ['itemDiscountsTotal']
+    assert mismatched_totals(priced, {"globalDiscountAmount": None}) == []
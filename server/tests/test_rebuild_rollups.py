@@ -0,0 +1,106 @@
+import datetime
+import sys
+
+import pytest
+
+from server.src.jobs import rebuild_rollups
+from server.src.storage import backend
+from server.src.storage.fake_firestore import FakeFirestore
+from server.src.storage.firestore import firestore_storage
+from server.src.storage.memory import memory_storage
+from server.src.storage.rollups import merged_rollup_deltas
+from server.src.storage.sqlite import sqlite_storage
+
+START, END = datetime.date(2025, 3, 14), datetime.date(2025, 3, 16)
+
+@pytest.fixture(params=['memory', 'sqlite', 'firestore'])
+def storage(request, tmp_path, monkeypatch):
+    if request.param == 'sqlite':
+        storage = sqlite_storage(str(tmp_path / 'sales.sqlite3'))
+    elif request.param == 'firestore':
+        storage = firestore_storage(FakeFirestore())
+    else:
+        storage = memory_storage()
+    monkeypatch.setattr(backend, 'storage', storage)
+    return storage
+
+def make_sale(transaction_id: str, date: str = '2025-03-14', quantity: int = 2) -> dict:
+    return {
+        "transaction_id": transaction_id,
+        "id": transaction_id,
+        "date": date,
+        "barcode_str": f"20700000{transaction_id[-4:]:0>4}",
+        "items": [{"sweetId": "s1", "sweetName": "Brigadeiro", "quantity": quantity, "priceAtSale": 2.5}],
+        "totalAmount": 2.5 * quantity,
+        "totalCost": 1.0 * quantity,
+        "totalProfit": 1.5 * quantity,
+    }
+
+def create(storage, sales: list[dict]):
+    storage.sales.create(sales, merged_rollup_deltas(sales), {})
+
+def daily(storage) -> dict[str, dict]:
+    return {r['date']: r for r in storage.rollups.get_daily(START.isoformat(), END.isoformat())}
+
+def test_replace_days_counts_late_sales_once(storage):
+    create(storage, [make_sale('t-0001'), make_sale('t-0002', date='2025-03-15', quantity=1)])
+    rebuilt = {"date": '2025-03-14', "vendas": 1, "total": 5.0, "custo": 2.0, "lucro": 3.0,
+               "itens": {"s1": {"nome": "Brigadeiro", "quantidade": 2}}}
+    future = datetime.datetime.now(datetime.timezone.utc) + datetime.timedelta(hours=1)
+    storage.rollups.replace_days({'2025-03-14': rebuilt, '2025-03-15': None}, future)
+    assert list(daily(storage)) == ['2025-03-14']
+    assert daily(storage)['2025-03-14']['vendas'] == 1
+
+    # Corte no passado: as vendas ja gravadas entram como tardias sobre rollups vazios.
+    past = datetime.datetime.now(datetime.timezone.utc) - datetime.timedelta(hours=1)
+    storage.rollups.replace_days({'2025-03-14': None, '2025-03-15': None, '2025-03-16': None}, past)
+    rollups = daily(storage)
+    assert sorted(rollups) == ['2025-03-14', '2025-03-15']
+    assert rollups['2025-03-14']['itens']['s1']['quantidade'] == 2
+    assert rollups['2025-03-15']['vendas'] == 1
+
+    storage.rollups.replace_days({}, future)
+    assert len(daily(storage)) == 2
+
+def test_rebuild_matches_live_rollups(storage, monkeypatch):
+    monkeypatch.setattr(rebuild_rollups, 'BATCH_DAYS', 2)
+    create(storage, [make_sale('t-0001'), make_sale('t-0002', quantity=3)])
+    create(storage, [make_sale('t-0003', date='2025-03-15', quantity=1)])
+    live = daily(storage)
+    stale = dict(live['2025-03-15'], date='2025-03-16')
+    storage.rollups.replace_days({'2025-03-16': stale}, datetime.datetime.now(datetime.timezone.utc))
+
+    # As vendas foram gravadas depois do corte do job: ficam fora da varredura e entram uma vez,
+    # pela soma das tardias na transacao de cada lote.
+    summary = rebuild_rollups.rebuild(START, END, period_type='dia')
+    assert summary == []
+    assert daily(storage) == live
+
+def test_aggregator_summarizes_sales_before_the_cutoff():
+    aggregator = rebuild_rollups.RollupAggregator(START, END)
+    aggregator.add_page([make_sale('t-0001'), make_sale('t-0002', date='2025-03-16', quantity=4),
+                         make_sale('t-0003', date='2025-04-01')])
+
+    rollups = dict(aggregator.rollups())
+    assert rollups['2025-03-15'] is None
+    assert rollups['2025-03-16']['itens'] == {"s1": {"nome": "Brigadeiro", "quantidade": 4}}
+    summary = aggregator.summarize('mes')
+    assert summary[0]['vendas'] == 2
+    assert summary[0]['receita'] == 15.0
+    assert summary[0]['maisVendido']['quantidade'] == 6
+
+def test_dry_run_does_not_write(storage):
+    create(storage, [make_sale('t-0001')])
+    storage.rollups.replace_days({'2025-03-14': None}, datetime.datetime.now(datetime.timezone.utc) + datetime.timedelta(hours=1))
+
+    summary = rebuild_rollups.rebuild(START, END, dry_run=True, period_type='dia')
+    assert daily(storage) == {}
+    # A venda foi gravada depois do corte: so a escrita real a somaria.
+    assert summary == []
+
+def test_missing_numpy_fails_with_a_clear_message(monkeypatch):
+    monkeypatch.setattr(rebuild_rollups, 'np', None)
+    monkeypatch.setitem(sys.modules, 'numpy', None)
+    with pytest.raises(RuntimeError, match='jobs'):
+        rebuild_rollups.RollupAggregator(START, END)
+    assert rebuild_rollups.main(['--dry-run']) == 1
@@ -0,0 +1,50 @@
+import io
+import re
+import zipfile
+
+from server.src.services.receipt_batch import get_render_pool
+
+def finish_sales(call, auth_headers, count: int) -> list[str]:
+    transaction_ids = []
+    for i in range(count):
+        response, _ = call('POST', '/api/sales/finish', auth_headers, json={
+            "payment_type": "PIX",
+            "payer": {"nome": f"Cliente {i}"},
+            "receiver": {"nome": "Sweet Home"},
+            "items": [{"sweetId": "s1", "sweetName": "Brigadeiro", "quantity": i + 1, "priceAtSale": 2.5}],
+            "receipt": False
+        })
+        assert response.status_code == 201
+        transaction_ids.append(response.headers['X-Transaction-Id'])
+    return transaction_ids
+
+def test_render_pool_does_not_fork(app):
+    assert get_render_pool()._mp_context.get_start_method() in ('forkserver', 'spawn')
+
+def test_merged_pdf_has_one_page_per_sale(call, storage, auth_headers):
+    transaction_ids = finish_sales(call, auth_headers, 3)
+    response, body = call('POST', '/api/sales/receipts/batch', auth_headers, json={"transaction_ids": transaction_ids})
+
+    assert response.status_code == 200
+    assert response.mimetype == 'application/pdf'
+    assert len(re.findall(rb'/Type /Page\b', body)) == 3
+
+def test_zip_has_one_receipt_per_sale(call, storage, auth_headers):
+    transaction_ids = finish_sales(call, auth_headers, 3)
+    response, body = call('POST', '/api/sales/receipts/batch', auth_headers,
+                          json={"transaction_ids": transaction_ids + transaction_ids[:1], "format": "zip"})
+
+    assert response.status_code == 200
+    with zipfile.ZipFile(io.BytesIO(body)) as archive:
+        names = archive.namelist()
+        assert sorted(names) == sorted(f'comprovante_{tid}.pdf' for tid in transaction_ids)
+        assert all(archive.read(name).startswith(b'%PDF') for name in names)
+
+def test_invalid_batches(call, storage, auth_headers):
+    response, _ = call('POST', '/api/sales/receipts/batch', auth_headers, json={"transaction_ids": ["nao-existe"]})
+    assert response.status_code == 404
+    response, _ = call('POST', '/api/sales/receipts/batch', auth_headers, json={"transaction_ids": ["a"], "format": "doc"})
+    assert response.status_code == 400
+    response, _ = call('POST', '/api/sales/receipts/batch', auth_headers,
+                       json={"start_date": "2025-03-15", "end_date": "2025-03-14"})
+    assert response.status_code == 400
@@ -0,0 +1,80 @@
+import os
+
+from server.src.services.receipt_cache import ReceiptCache, content_hash, receipt_cache
+
+SALE = {
+    "payment_type": "PIX",
+    "payer": {"nome": "Ana"},
+    "receiver": {"nome": "Sweet Home"},
+    "items": [{"sweetId": "s1", "sweetName": "Brigadeiro", "quantity": 2, "priceAtSale": 2.5}],
+}
+
+def test_memory_tier_evicts_least_recently_used():
+    cache = ReceiptCache(max_entries=2, max_bytes=1000)
+    cache.put('a', b'1' * 10)
+    cache.put('b', b'2' * 10)
+    cache.get('a')
+    cache.put('c', b'3' * 10)
+
+    assert cache.get('b') is None
+    assert cache.get('a') == (content_hash(b'1' * 10), b'1' * 10)
+    assert cache.get('c')
+
+def test_memory_tier_respects_byte_budget():
+    cache = ReceiptCache(max_entries=10, max_bytes=25)
+    cache.put('a', b'1' * 10)
+    cache.put('b', b'2' * 10)
+    cache.put('c', b'3' * 10)
+    assert cache.get('a') is None
+    assert cache.get('b') and cache.get('c')
+
+def test_disk_tier_survives_memory_eviction(tmp_path):
+    cache = ReceiptCache(max_entries=1, disk_dir=str(tmp_path))
+    etag = cache.put('venda-1', b'%PDF-1')
+    cache.put('venda-2', b'%PDF-2')
+    cache.clear()
+
+    assert cache.get('venda-1') == (etag, b'%PDF-1')
+    # Conteudo igual grava um unico objeto.
+    cache.put('venda-3', b'%PDF-1')
+    assert len(os.listdir(tmp_path / 'objects')) == 2
+
+def test_disk_tier_rejects_corrupted_blob_and_unsafe_ids(tmp_path):
+    cache = ReceiptCache(disk_dir=str(tmp_path))
+    etag = cache.put('venda-1', b'%PDF-1')
+    (tmp_path / 'objects' / f'{etag}.pdf').write_bytes(b'alterado')
+    cache.clear()
+    assert cache.get('venda-1') is None
+
+    cache.put('../fora', b'%PDF-2')
+    assert not (tmp_path / 'refs' / '../fora').exists()
+    assert not (tmp_path / 'fora').exists()
+
+def test_reprint_answers_304_for_a_matching_etag(call, storage, auth_headers):
+    receipt_cache.clear()
+    response, pdf_bytes = call('POST', '/api/sales/finish', auth_headers, json=SALE)
+    assert response.status_code == 200
+    transaction_id = response.headers['X-Transaction-Id']
+    etag = response.headers['ETag']
+    assert etag == f'"{content_hash(pdf_bytes)}"'
+
+    path = f'/api/sales/receipts/{transaction_id}'
+    response, body = call('GET', path, {**auth_headers, "If-None-Match": etag})
+    assert response.status_code == 304
+    assert body == b''
+
+    # Sem cache o comprovante e renderizado de novo com os mesmos bytes e o mesmo ETag.
+    receipt_cache.clear()
+    response, body = call('GET', path, {**auth_headers, "If-None-Match": '"outro"'})
+    assert response.status_code == 200
+    assert response.headers['ETag'] == etag
+    assert body == pdf_bytes
+
+def test_escpos_reprint_answers_304(call, storage, auth_headers):
+    response, payload = call('POST', '/api/sales/finish', auth_headers, json={**SALE, "format": "escpos"})
+    path = f"/api/sales/receipts/{response.headers['X-Transaction-Id']}?format=escpos"
+
+    response, body = call('GET', path, auth_headers)
+    assert body == payload
+    response, _ = call('GET', path, {**auth_headers, "If-None-Match": response.headers['ETag']})
+    assert response.status_code == 304
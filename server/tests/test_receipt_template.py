@@ -0,0 +1,110 @@
+import re
+import uuid
+from decimal import Decimal
+
+import pytest
+
+from server.src.models.comprovante_model import Comprovante, MetodoPagamento
+from server.src.services.comprovante_service import legacy_pdf_size, render_sales_receipt
+from server.src.services.generate_pdf import code128_modules
+from server.src.services.receipt_template import (
+    BARCODE_QUIET_MODULES, MAX_PAGE_HEIGHT, ReceiptTemplate, draw_code128, get_receipt_template
+)
+
+def make_comprovante(items: int = 2) -> Comprovante:
+    return Comprovante(
+        qtd=0,
+        value=Decimal('0'),
+        payment_type=MetodoPagamento.DINHEIRO,
+        payer={"nome": "Ana"},
+        receiver={"nome": "Sweet Home"},
+        transaction_id=uuid.UUID('12345678-1234-5678-1234-567812345678'),
+        timestamp='2025-03-14 15:09:26',
+        barcode_str='2070000000015',
+        items=[
+            {"sweetName": f"Brigadeiro {i}", "quantity": 3, "priceAtSale": 2.5, "subtotal": 7.5,
+             "itemDiscount": 10 if i % 2 == 0 else 0, "discountedAmount": 0.75}
+            for i in range(items)
+        ],
+        subtotal=Decimal('15.00'),
+        itemDiscountsTotal=Decimal('0.75'),
+        globalDiscountPercent=Decimal('5'),
+        globalDiscountAmount=Decimal('0.71'),
+        totalAmount=Decimal('13.54')
+    )
+
+@pytest.mark.parametrize('compact', [True, False])
+def test_cached_template_renders_identical_bytes(compact, monkeypatch):
+    comprovante = make_comprovante()
+    cached = get_receipt_template()
+    monkeypatch.setattr(cached, 'compact', compact)
+
+    first = cached.render(comprovante, 'operador')
+    assert first.startswith(b'%PDF')
+    assert cached.render(comprovante, 'operador') == first
+    assert ReceiptTemplate(compact=compact).render(comprovante, 'operador') == first
+
+def test_compact_profile_is_smaller_than_the_baselines(caplog):
+    comprovante = make_comprovante(10)
+    compact = ReceiptTemplate(compact=True).render(comprovante, 'operador')
+    assert len(compact) < len(ReceiptTemplate(compact=False).render(comprovante, 'operador'))
+    assert len(compact) < legacy_pdf_size(comprovante)
+
+    caplog.set_level('INFO')
+    pdf = render_sales_receipt(comprovante, 'operador')
+    assert f"{len(pdf)} bytes (legado estimado: {legacy_pdf_size(comprovante)} bytes" in caplog.text
+
+def test_page_height_follows_content():
+    template = ReceiptTemplate(compact=False)
+    for items in (1, 3, 40):
+        comprovante = make_comprovante(items)
+        media_boxes = re.findall(rb'/MediaBox \[0 0 [0-9.]+ ([0-9.]+)\]', template.render(comprovante, 'operador'))
+        assert float(media_boxes[-1]) == pytest.approx(template.measure_height(comprovante) * 72 / 25.4, abs=0.01)
+
+def test_measure_height_counts_discount_lines():
+    template = ReceiptTemplate()
+    one, three = template.measure_height(make_comprovante(1)), template.measure_height(make_comprovante(3))
+    # Itens pares tem desconto e ocupam duas linhas.
+    assert three - one == 3 * 4
+    assert template.fits_page(make_comprovante(3))
+
+def test_oversized_receipt_is_rejected():
+    template = ReceiptTemplate()
+    comprovante = make_comprovante(MAX_PAGE_HEIGHT // 4)
+    assert not template.fits_page(comprovante)
+    with pytest.raises(ValueError):
+        template.render(comprovante, 'operador')
+
+class RecordingPDF:
+    def __init__(self):
+        self.rects = []
+
+    def set_fill_color(self, *color):
+        pass
+
+    def rect(self, x, y, w, h, style=None):
+        self.rects.append((x, y, w, h, style))
+
+def test_code128_modules():
+    modules = code128_modules('2070000000015')
+    # Start C, pares de digitos, digito verificador e stop.
+    assert modules.startswith('11010011100')
+    assert modules.endswith('1100011101011')
+    assert set(modules) == {'0', '1'}
+    assert code128_modules('') is None
+
+def test_code128_is_drawn_as_vector_bars():
+    modules = '1101100010'
+    pdf = RecordingPDF()
+    draw_code128(pdf, modules, x=10, y=5, width=30, height=8)
+
+    module_width = 30 / (len(modules) + 2 * BARCODE_QUIET_MODULES)
+    left = 10 + BARCODE_QUIET_MODULES * module_width
+    # Uma barra por sequencia de modulos '1', depois da zona de silencio.
+    assert [(round((x - left) / module_width), round(w / module_width)) for x, _, w, _, _ in pdf.rects] == [(0, 2), (3, 2), (8, 1)]
+    assert all(y == 5 and h == 8 and style == 'F' for _, y, _, h, style in pdf.rects)
+
+def test_barcode_is_not_an_image():
+    pdf = ReceiptTemplate(compact=False).render(make_comprovante(), 'operador')
+    # So o QR code entra como imagem.
+    assert pdf.count(b'/Subtype /Image') == 1
@@ -0,0 +1,73 @@
+import asyncio
+from types import SimpleNamespace
+
+import dns.exception
+import dns.resolver
+import pytest
+
+from server.src.services import register_service
+
+class FakeResolver:
+    """Respostas por (dominio, tipo): uma lista de registros MX ou uma excecao do dnspython."""
+
+    def __init__(self, answers: dict):
+        self.answers = answers
+        self.queries = []
+
+    async def resolve(self, domain: str, record_type: str):
+        self.queries.append((domain, record_type))
+        answer = self.answers.get((domain, record_type), dns.resolver.NoAnswer())
+        if isinstance(answer, Exception):
+            raise answer
+        return answer
+
+@pytest.fixture
+def resolver(monkeypatch):
+    resolver = FakeResolver({
+        ('doces.com.br', 'MX'): [SimpleNamespace(exchange='mx.doces.com.br.')],
+        ('so-a.com.br', 'A'): [SimpleNamespace()],
+        ('mx-nulo.com.br', 'MX'): [SimpleNamespace(exchange='.')],
+        ('nao-existe.com.br', 'MX'): dns.resolver.NXDOMAIN(),
+        ('servfail.com.br', 'MX'): dns.resolver.NoNameservers(),
+        ('servfail.com.br', 'A'): dns.resolver.NoNameservers(),
+        ('servfail.com.br', 'AAAA'): dns.resolver.NoNameservers(),
+        ('lento.com.br', 'MX'): dns.exception.Timeout(),
+    })
+    monkeypatch.setattr(register_service, '_resolver', resolver)
+    monkeypatch.setattr(register_service, 'EMAIL_CHECK_DELIVERABILITY', True)
+    monkeypatch.setattr(register_service, '_domain_cache', type(register_service._domain_cache)())
+    return resolver
+
+def deliverable(domain: str) -> bool:
+    return asyncio.run(register_service.is_domain_deliverable(domain))
+
+@pytest.mark.parametrize('domain, expected', [
+    ('doces.com.br', True),
+    ('so-a.com.br', True),
+    ('mx-nulo.com.br', False),
+    ('nao-existe.com.br', False),
+])
+def test_domain_lookup(resolver, domain, expected):
+    assert deliverable(domain) is expected
+    assert register_service._domain_cache[domain][1] is expected
+
+def test_lookups_are_cached(resolver):
+    deliverable('nao-existe.com.br')
+    deliverable('nao-existe.com.br')
+    assert resolver.queries == [('nao-existe.com.br', 'MX')]
+
+@pytest.mark.parametrize('domain', ['servfail.com.br', 'lento.com.br'])
+def test_dns_failures_accept_without_caching(resolver, domain):
+    assert deliverable(domain) is True
+    assert domain not in register_service._domain_cache
+
+def test_undeliverable_email_is_rejected(resolver):
+    valid, error = asyncio.run(register_service.is_email_valid_async('ana@mx-nulo.com.br'))
+    assert not valid and error
+    assert asyncio.run(register_service.is_email_valid_async('ana@servfail.com.br')) == (True, None)
+
+def test_syntax_only_by_default(resolver, monkeypatch):
+    monkeypatch.setattr(register_service, 'EMAIL_CHECK_DELIVERABILITY', False)
+    assert asyncio.run(register_service.is_email_valid_async('ana@nao-existe.com.br')) == (True, None)
+    assert resolver.queries == []
+    assert not asyncio.run(register_service.is_email_valid_async('sem-arroba'))[0]
@@ -0,0 +1,74 @@
+import json
+
+import pytest
+
+from server.src.services.reports_service import period_key
+from server.src.storage.rollups import merged_rollup_deltas
+
+def make_sale(transaction_id: str, date: str, sweet_id: str, quantity: int, price: float) -> dict:
+    total = price * quantity
+    return {
+        "transaction_id": transaction_id,
+        "date": date,
+        "items": [{"sweetId": sweet_id, "sweetName": sweet_id.title(), "quantity": quantity}],
+        "totalAmount": total,
+        "totalCost": total / 2,
+        "totalProfit": total / 2,
+    }
+
+@pytest.fixture
+def sales(storage):
+    sales = [
+        make_sale('t1', '2025-03-01', 'brigadeiro', 4, 2.5),
+        make_sale('t2', '2025-03-02', 'beijinho', 1, 3.0),
+        make_sale('t3', '2025-03-03', 'brigadeiro', 2, 2.5),
+        make_sale('t4', '2025-04-10', 'beijinho', 10, 3.0),
+    ]
+    storage.sales.create(sales, merged_rollup_deltas(sales), {})
+    return sales
+
+@pytest.mark.parametrize('date, period_type, expected', [
+    ('2025-03-05', 'dia', '2025-03-05'),
+    ('2025-03-05', 'mes', '2025-03'),
+    # Semanas comecam no domingo, como no frontend.
+    ('2025-03-05', 'semana', '2025-03-02'),
+    ('2025-03-02', 'semana', '2025-03-02'),
+    ('2025-03-01', 'semana', '2025-02-23'),
+])
+def test_period_key(date, period_type, expected):
+    assert period_key(date, period_type) == expected
+
+def test_sales_by_period(call, sales, auth_headers):
+    response, body = call('GET', '/api/reports/sales?period=semana', auth_headers)
+    assert response.status_code == 200
+    assert json.loads(body)["periods"] == [
+        {"periodo": "2025-02-23", "vendas": 1, "total": 10.0, "custo": 5.0, "lucro": 5.0},
+        {"periodo": "2025-03-02", "vendas": 2, "total": 8.0, "custo": 4.0, "lucro": 4.0},
+        {"periodo": "2025-04-06", "vendas": 1, "total": 30.0, "custo": 15.0, "lucro": 15.0},
+    ]
+
+def test_profit_by_month_with_range(call, sales, auth_headers):
+    response, body = call('GET', '/api/reports/profit?period=mes&start_date=2025-03-02&end_date=2025-04-30', auth_headers)
+    periods = json.loads(body)["periods"]
+    assert [(p["periodo"], p["vendas"], p["receita"], p["margem"]) for p in periods] == [
+        ("2025-03", 2, 8.0, 50.0),
+        ("2025-04", 1, 30.0, 50.0),
+    ]
+
+def test_top_products(call, sales, auth_headers):
+    response, body = call('GET', '/api/reports/top-products?limit=1', auth_headers)
+    assert json.loads(body)["products"] == [{"sweetId": "beijinho", "nome": "Beijinho", "quantidade": 11}]
+
+    response, body = call('GET', '/api/reports/top-products?end_date=2025-03-31', auth_headers)
+    assert [p["sweetId"] for p in json.loads(body)["products"]] == ["brigadeiro", "beijinho"]
+
+def test_reports_without_rollups_are_empty(call, storage, auth_headers):
+    response, body = call('GET', '/api/reports/sales', auth_headers)
+    assert response.status_code == 200
+    assert json.loads(body)["periods"] == []
+
+@pytest.mark.parametrize('query', ['period=ano', 'start_date=01-03-2025', 'limit=abc'])
+def test_invalid_filters(call, storage, auth_headers, query):
+    path = '/api/reports/top-products' if query.startswith('limit') else '/api/reports/sales'
+    response, _ = call('GET', f'{path}?{query}', auth_headers)
+    assert response.status_code == 400
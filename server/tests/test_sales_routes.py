@@ -0,0 +1,112 @@
+import json
+
+from server.src.routes import sales as sales_routes
+
+def sale_payload(**fields) -> dict:
+    return {
+        "payment_type": "PIX",
+        "payer": {"nome": "Ana"},
+        "receiver": {"nome": "Sweet Home"},
+        "items": [{"sweetId": "s1", "sweetName": "Brigadeiro", "quantity": 2, "priceAtSale": 2.5}],
+        "totalAmount": 5.0,
+        **fields
+    }
+
+def test_finish_sale_replays_idempotency_key(call, storage, auth_headers):
+    headers = {**auth_headers, "Idempotency-Key": "caixa-1-venda-1"}
+    first, _ = call('POST', '/api/sales/finish', headers, json=sale_payload(receipt=False))
+    assert first.status_code == 201
+    transaction_id = first.headers['X-Transaction-Id']
+
+    replay, body = call('POST', '/api/sales/finish', headers, json=sale_payload(receipt=False))
+    assert replay.status_code == 200
+    assert replay.headers['Idempotent-Replayed'] == 'true'
+    assert json.loads(body) == {"transaction_id": transaction_id}
+    assert len(storage.sales.get_many([transaction_id])) == 1
+    assert storage.rollups.get_daily(None, None)[0]['vendas'] == 1
+
+def test_replay_returns_the_original_receipt(call, storage, auth_headers):
+    headers = {**auth_headers, "Idempotency-Key": "caixa-1-venda-2"}
+    first, receipt = call('POST', '/api/sales/finish', headers, json=sale_payload(format='escpos'))
+    replay, replayed = call('POST', '/api/sales/finish', headers, json=sale_payload(format='escpos'))
+
+    assert first.status_code == 200 and replay.status_code == 200
+    assert replay.headers['X-Transaction-Id'] == first.headers['X-Transaction-Id']
+    assert replayed == receipt
+
+def test_stored_sale_with_failed_receipt_is_not_a_500(call, storage, auth_headers, monkeypatch):
+    monkeypatch.setattr(sales_routes, 'render_sales_receipt', lambda comprovante, username: None)
+    response, body = call('POST', '/api/sales/finish', {**auth_headers, "Origin": "http://localhost:3000"},
+                          json=sale_payload())
+
+    assert response.status_code == 201
+    assert response.headers['X-Receipt-Status'] == 'failed'
+    assert 'X-Receipt-Status' in response.headers['Access-Control-Expose-Headers']
+    transaction_id = json.loads(body)["transaction_id"]
+    assert storage.sales.get_many([transaction_id])
+
+def test_barcode_collision_is_a_conflict(call, storage, auth_headers, monkeypatch):
+    monkeypatch.setattr(sales_routes, 'next_barcode', lambda: '2070000000015')
+    first, _ = call('POST', '/api/sales/finish', {**auth_headers, "Idempotency-Key": "a"}, json=sale_payload(receipt=False))
+    second, body = call('POST', '/api/sales/finish', {**auth_headers, "Idempotency-Key": "b"}, json=sale_payload(receipt=False))
+
+    assert first.status_code == 201
+    assert second.status_code == 409
+    assert json.loads(body)["msg"]
+    assert storage.rollups.get_daily(None, None)[0]['vendas'] == 1
+
+def test_finish_sale_rejects_mismatched_totals(call, storage, auth_headers):
+    response, body = call('POST', '/api/sales/finish', auth_headers, json=sale_payload(totalAmount=4.0))
+    assert response.status_code == 400
+    assert json.loads(body)["campos"] == ["totalAmount"]
+    assert storage.rollups.get_daily(None, None) == []
+
+def test_bulk_ingest_deduplicates(call, storage, auth_headers):
+    headers = {**auth_headers, "Content-Type": "application/x-ndjson"}
+    lines = [
+        sale_payload(transaction_id="off-1", timestamp=1760000000000),
+        sale_payload(transaction_id="off-2", timestamp="2025-10-09 10:00:00"),
+        sale_payload(transaction_id="off-1", timestamp=1760000000000),
+        sale_payload(transaction_id="off-3", timestamp="ontem"),
+    ]
+    body = "\n".join(json.dumps(line) for line in lines) + "\n{invalido\n"
+
+    response, data = call('POST', '/api/sales/bulk', headers, data=body)
+    result = json.loads(data)
+    assert response.status_code == 200
+    assert result["created"] == ["off-1", "off-2"]
+    assert result["duplicates"] == ["off-1"]
+    assert result["errors"] == [{"line": 4, "msg": "timestamp invalido"}, {"line": 5, "msg": "JSON invalido"}]
+
+    response, data = call('POST', '/api/sales/bulk', headers, data=body)
+    result = json.loads(data)
+    assert result["created"] == []
+    assert result["duplicates"] == ["off-1", "off-2"]
+    assert sum(rollup['vendas'] for rollup in storage.rollups.get_daily(None, None)) == 2
+
+def test_bulk_ingest_rejects_invalid_document_ids(call, storage, auth_headers):
+    headers = {**auth_headers, "Content-Type": "application/x-ndjson"}
+    body = "\n".join(json.dumps(sale_payload(transaction_id=tid)) for tid in ["a/b", "__off__", "..", "off-4"])
+
+    response, data = call('POST', '/api/sales/bulk', headers, data=body)
+    result = json.loads(data)
+    assert result["created"] == ["off-4"]
+    assert result["errors"] == [{"line": line, "msg": "transaction_id invalido"} for line in (1, 2, 3)]
+
+def test_stored_sale_lookups(call, storage, auth_headers):
+    response, body = call('POST', '/api/sales/finish', auth_headers, json=sale_payload(receipt=False))
+    created = json.loads(body)
+
+    reprint, pdf = call('GET', f'/api/sales/receipts/{created["transaction_id"]}', auth_headers)
+    assert reprint.status_code == 200 and pdf.startswith(b'%PDF')
+    escpos, payload = call('GET', f'/api/sales/receipts/{created["transaction_id"]}?format=escpos', auth_headers)
+    assert escpos.status_code == 200 and payload
+    found, _ = call('GET', f'/api/sales/barcode/{created["barcode"]}', auth_headers)
+    assert found.status_code == 200
+    batch, merged = call('POST', '/api/sales/receipts/batch', auth_headers,
+                         json={"start_date": "2000-01-01", "end_date": "2100-01-01"})
+    assert batch.status_code == 200 and merged.startswith(b'%PDF')
+
+def test_routes_require_a_token(call, storage):
+    response, _ = call('POST', '/api/sales/finish', json=sale_payload())
+    assert response.status_code == 401
@@ -0,0 +1,68 @@
+import asyncio
+import json
+
+from server.src.routes.stream import sse_event
+from server.src.services import sales_stream
+from server.src.services.sales_stream import SalesBroker, publish_sales, sales_broker
+from server.src.storage.rollups import merged_rollup_deltas
+
+def parse_events(payload: bytes) -> list[tuple[str, dict]]:
+    """Eventos (nome, dados) de um trecho do stream; comentarios de heartbeat sao ignorados."""
+    events = []
+    for block in payload.decode().split('\n\n'):
+        fields = dict(line.split(': ', 1) for line in block.split('\n') if line and not line.startswith(':'))
+        if fields:
+            events.append((fields['event'], json.loads(fields['data'])))
+    return events
+
+def make_sale(transaction_id: str) -> dict:
+    return {"transaction_id": transaction_id, "date": "2025-03-14", "totalAmount": 5.0, "totalCost": 2.0,
+            "totalProfit": 3.0, "items": [{"sweetId": "s1", "sweetName": "Pé-de-moleque", "quantity": 2}]}
+
+def test_sse_event_framing():
+    payload = sse_event('sale', {"nome": "Pé-de-moleque\nDoce", "total": 5.0})
+    assert payload.endswith(b'\n\n')
+    assert payload.count(b'\n') == 3
+    assert payload.startswith(b'event: sale\ndata: {')
+    assert parse_events(payload) == [('sale', {"nome": "Pé-de-moleque\nDoce", "total": 5.0})]
+
+def test_slow_clients_are_dropped():
+    async def scenario():
+        broker = SalesBroker(queue_size=1, max_clients=2)
+        slow, fast = broker.subscribe(), broker.subscribe()
+        assert broker.subscribe() is None
+
+        broker.publish({"n": 1})
+        await fast.get()
+        broker.publish({"n": 2})
+        assert len(broker) == 1
+        assert await slow.get() is None
+        assert await fast.get() == {"n": 2}
+
+    asyncio.run(scenario())
+
+def test_stream_sends_snapshot_then_sales(app, storage, auth_headers, monkeypatch):
+    monkeypatch.setattr(sales_stream, 'today', lambda: '2025-03-14')
+    first = make_sale('t-1')
+    storage.sales.create([first], merged_rollup_deltas([first]), {})
+
+    async def scenario():
+        async with app.test_client().request('/api/stream/sales', headers=auth_headers) as connection:
+            await connection.send_complete()
+            snapshot = parse_events(await connection.receive())
+            while not len(sales_broker):
+                await asyncio.sleep(0)
+            publish_sales([make_sale('t-2')])
+            sale = parse_events(await connection.receive())
+            await connection.disconnect()
+        return snapshot, sale
+
+    snapshot, sale = asyncio.run(scenario())
+
+    assert snapshot[0][0] == 'snapshot'
+    assert snapshot[0][1]["vendas"] == 1
+    assert snapshot[0][1]["top"] == [{"sweetId": "s1", "nome": "Pé-de-moleque", "quantidade": 2}]
+    assert sale == [('sale', {
+        "date": "2025-03-14", "transaction_ids": ["t-2"], "vendas": 1, "total": 5.0, "custo": 2.0, "lucro": 3.0,
+        "itens": {"s1": {"nome": "Pé-de-moleque", "quantidade": 2}}
+    })]
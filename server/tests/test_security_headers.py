@@ -0,0 +1,46 @@
+import asyncio
+
+from server.src.utils.security_headers import PREFLIGHT_BODY, SecurityHeadersMiddleware
+
+ALLOWED = 'https://app.example.com'
+
+async def ok_app(scope, receive, send):
+    await send({'type': 'http.response.start', 'status': 200, 'headers': [(b'content-type', b'text/plain')]})
+    await send({'type': 'http.response.body', 'body': b'ok'})
+
+def dispatch(method: str, origin: str | None = None) -> tuple[list[dict], list]:
+    middleware = SecurityHeadersMiddleware(ok_app, allowed_origins=f'{ALLOWED}, http://localhost:3000', max_age=600)
+    headers = [(b'origin', origin.encode())] if origin else []
+    sent = []
+
+    async def send(message):
+        sent.append(message)
+
+    asyncio.run(middleware({'type': 'http', 'method': method, 'headers': headers}, None, send))
+    return sent, dict(sent[0]['headers'])
+
+def test_allowed_origin_gets_cors_and_security_headers():
+    sent, headers = dispatch('GET', ALLOWED)
+    assert sent[1]['body'] == b'ok'
+    assert headers[b'content-type'] == b'text/plain'
+    assert headers[b'access-control-allow-origin'] == ALLOWED.encode()
+    assert b'Idempotent-Replayed' in headers[b'access-control-expose-headers']
+    assert headers[b'x-frame-options'] == b'DENY'
+    assert headers[b'vary'] == b'Origin'
+
+def test_unknown_origin_gets_only_security_headers():
+    _, headers = dispatch('GET', 'https://evil.example.com')
+    assert b'access-control-allow-origin' not in headers
+    assert headers[b'x-content-type-options'] == b'nosniff'
+
+def test_preflight_is_answered_without_the_app():
+    sent, headers = dispatch('OPTIONS', ALLOWED)
+    assert sent[0]['status'] == 200
+    assert sent[1]['body'] == PREFLIGHT_BODY
+    assert headers[b'access-control-max-age'] == b'600'
+    assert b'Idempotency-Key' in headers[b'access-control-allow-headers']
+
+def test_preflight_from_unknown_origin_is_not_allowed():
+    _, headers = dispatch('OPTIONS', 'https://evil.example.com')
+    assert b'access-control-allow-methods' not in headers
+    assert b'access-control-allow-origin' not in headers
@@ -0,0 +1,51 @@
+import pytest
+
+from server import serve
+
+@pytest.fixture
+def environ(monkeypatch):
+    for name in ('SERVER_WORKERS', 'WORKER_CLASS', 'HOST', 'PORT', 'BACKLOG', 'KEEP_ALIVE_TIMEOUT',
+                 'KEEP_ALIVE_MAX_REQUESTS', 'GRACEFUL_TIMEOUT', 'ACCESS_LOG', 'RECEIPT_WORKERS'):
+        # setenv antes do delenv: o monkeypatch restaura o ambiente mesmo se main() definir a variavel.
+        monkeypatch.setenv(name, '')
+        monkeypatch.delenv(name)
+    return monkeypatch
+
+def test_defaults(environ):
+    environ.setattr(serve.os, 'cpu_count', lambda: 4)
+    config = serve.build_config()
+
+    assert config.application_path == 'server.main:app'
+    assert config.bind == ['0.0.0.0:3001']
+    assert config.workers == 4
+    assert config.worker_class in ('asyncio', 'uvloop')
+    assert config.graceful_timeout == 30
+    assert config.accesslog is None
+
+def test_environment_overrides(environ):
+    environ.setenv('SERVER_WORKERS', '3')
+    environ.setenv('WORKER_CLASS', 'asyncio')
+    environ.setenv('PORT', '8080')
+    environ.setenv('BACKLOG', '128')
+    environ.setenv('KEEP_ALIVE_TIMEOUT', '5')
+    environ.setenv('GRACEFUL_TIMEOUT', '10')
+    environ.setenv('ACCESS_LOG', 'true')
+    config = serve.build_config()
+
+    assert config.bind == ['0.0.0.0:8080']
+    assert config.workers == 3
+    assert config.worker_class == 'asyncio'
+    assert config.backlog == 128
+    assert config.keep_alive_timeout == 5
+    assert config.graceful_timeout == 10
+    assert config.accesslog is not None
+
+def test_render_processes_are_split_between_workers(environ):
+    environ.setattr(serve.os, 'cpu_count', lambda: 8)
+    environ.setenv('SERVER_WORKERS', '3')
+    started = []
+    environ.setattr(serve, 'run', lambda config: started.append(config) or 0)
+
+    assert serve.main() == 0
+    assert started[0].workers == 3
+    assert serve.os.environ['RECEIPT_WORKERS'] == '2'
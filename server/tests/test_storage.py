@@ -0,0 +1,107 @@
+import pytest
+
+from server.src.storage.base import AlreadyStored, StockUnavailable
+from server.src.storage.fake_firestore import FakeFirestore
+from server.src.storage.firestore import firestore_storage
+from server.src.storage.memory import memory_storage
+from server.src.storage.rollups import merged_rollup_deltas
+from server.src.storage.sqlite import sqlite_storage
+
+@pytest.fixture(params=['memory', 'sqlite', 'firestore'])
+def storage(request, tmp_path):
+    if request.param == 'sqlite':
+        return sqlite_storage(str(tmp_path / 'sales.sqlite3'))
+    if request.param == 'firestore':
+        return firestore_storage(FakeFirestore())
+    return memory_storage()
+
+def make_sale(transaction_id: str, date: str = '2025-03-14', barcode: str | None = None, quantity: int = 2) -> dict:
+    return {
+        "transaction_id": transaction_id,
+        "id": transaction_id,
+        "date": date,
+        "barcode_str": barcode or f"20700000{transaction_id[-4:]:0>4}",
+        "items": [{"sweetId": "s1", "sweetName": "Brigadeiro", "quantity": quantity, "priceAtSale": 2.5}],
+        "totalAmount": 2.5 * quantity,
+        "totalCost": 1.0 * quantity,
+        "totalProfit": 1.5 * quantity,
+    }
+
+def create(storage, sales: list[dict], idempotency=None):
+    storage.sales.create(sales, merged_rollup_deltas(sales), {}, idempotency=idempotency)
+
+def test_create_and_read_back(storage):
+    sale = make_sale('t-0001')
+    create(storage, [sale])
+
+    stored = storage.sales.get_many(['t-0001', 'desconhecida'])
+    assert [s['transaction_id'] for s in stored] == ['t-0001']
+    assert stored[0]['totalAmount'] == 5.0
+    assert storage.sales.find_by_barcode(sale['barcode_str']) == 't-0001'
+    assert [s['transaction_id'] for s in storage.sales.by_date_range('2025-03-14', '2025-03-14', 10)] == ['t-0001']
+
+def test_duplicate_transaction_id_is_rejected_atomically(storage):
+    create(storage, [make_sale('t-0001')])
+    with pytest.raises(AlreadyStored):
+        create(storage, [make_sale('t-0002'), make_sale('t-0001', barcode='2070000009999')])
+
+    assert storage.sales.get_many(['t-0002']) == []
+    assert storage.rollups.get_daily('2025-03-14', '2025-03-14')[0]['vendas'] == 1
+
+def test_duplicate_barcode_is_rejected(storage):
+    create(storage, [make_sale('t-0001', barcode='2070000000015')])
+    with pytest.raises(AlreadyStored):
+        create(storage, [make_sale('t-0002', barcode='2070000000015')])
+
+def test_idempotency_key(storage):
+    create(storage, [make_sale('t-0001')], idempotency=('hash-1', 1))
+    assert storage.sales.find_idempotent('hash-1') == 't-0001'
+    assert storage.sales.find_idempotent('hash-2') is None
+
+    with pytest.raises(AlreadyStored):
+        create(storage, [make_sale('t-0002')], idempotency=('hash-1', 1))
+    assert storage.sales.get_many(['t-0002']) == []
+
+def test_rollups_follow_sales(storage):
+    create(storage, [make_sale('t-0001', quantity=2), make_sale('t-0002', quantity=3)])
+    create(storage, [make_sale('t-0003', date='2025-03-15', quantity=1)])
+
+    rollups = {r['date']: r for r in storage.rollups.get_daily('2025-03-14', '2025-03-15')}
+    assert rollups['2025-03-14']['vendas'] == 2
+    assert rollups['2025-03-14']['total'] == pytest.approx(12.5)
+    assert rollups['2025-03-14']['itens']['s1']['quantidade'] == 5
+    assert rollups['2025-03-15']['lucro'] == pytest.approx(1.5)
+    assert [r['date'] for r in storage.rollups.get_daily('2025-03-15', None)] == ['2025-03-15']
+
+def test_iter_pages(storage):
+    create(storage, [make_sale(f't-{i:04d}', date=f'2025-03-{10 + i % 3}') for i in range(7)])
+
+    pages = list(storage.sales.iter_pages(None, None, 3))
+    assert [len(page) for page in pages] == [3, 3, 1]
+    assert len({s['transaction_id'] for page in pages for s in page}) == 7
+    assert sum(len(page) for page in storage.sales.iter_pages('2025-03-11', '2025-03-11', 3)) == 2
+
+def test_sequence_leases_do_not_overlap(storage):
+    first = storage.sequences.lease('07', 100)
+    second = storage.sequences.lease('07', 100)
+    other = storage.sequences.lease('08', 10)
+    assert second == first + 100
+    assert other == 0
+
+def test_inventory_pages(storage):
+    if storage.inventory.tracks_stock:
+        assert list(storage.inventory.iter_pages('sweets', 10)) == []
+    else:
+        with pytest.raises(StockUnavailable):
+            list(storage.inventory.iter_pages('sweets', 10))
+
+def test_sqlite_persists_across_connections(tmp_path):
+    path = str(tmp_path / 'sales.sqlite3')
+    storage = sqlite_storage(path)
+    create(storage, [make_sale('t-0001')], idempotency=('hash-1', 1))
+    start = storage.sequences.lease('07', 100)
+
+    reopened = sqlite_storage(path)
+    assert reopened.sales.find_idempotent('hash-1') == 't-0001'
+    assert reopened.rollups.get_daily('2025-03-14', '2025-03-14')[0]['vendas'] == 1
+    assert reopened.sequences.lease('07', 100) == start + 100
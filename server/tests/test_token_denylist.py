@@ -0,0 +1,69 @@
+import time
+
+import pytest
+
+from server.src.services import token_denylist
+from server.src.services.token_denylist import BloomFilter, ExpiringSet, TokenDenylist
+from server.src.storage.memory import memory_storage
+
+def test_bloom_filter_has_no_false_negatives():
+    bloom = BloomFilter(4096)
+    added = [f"jti-{i}" for i in range(200)]
+    for jti in added:
+        bloom.add(jti)
+    assert all(jti in bloom for jti in added)
+    false_positives = sum(f"outro-{i}" in bloom for i in range(1000))
+    assert false_positives < 50
+
+@pytest.mark.parametrize('bloom_bits', [0, 1024])
+def test_expiring_set(bloom_bits):
+    now = time.time()
+    revoked = ExpiringSet(bucket_seconds=60, bloom_bits=bloom_bits)
+    assert revoked.add('a', now + 30)
+    assert revoked.add('b', now + 600)
+    assert not revoked.add('a', now + 30)
+    assert 'a' in revoked and 'b' in revoked
+    assert 'c' not in revoked
+
+    assert revoked.expire(now) == 0
+    assert revoked.expire(now + 120) == 1
+    assert 'a' not in revoked and 'b' in revoked
+    assert len(revoked) == 1
+
+def test_expire_installs_the_rebuilt_bloom_filter_only_when_complete(monkeypatch):
+    now = time.time()
+    revoked = ExpiringSet(bucket_seconds=60, bloom_bits=1024)
+    revoked.add('a', now + 30)
+    revoked.add('b', now + 600)
+    seen_during_rebuild = []
+
+    class CheckingBloomFilter(BloomFilter):
+        def add(self, jti):
+            # Leitura sem lock no meio da reconstrucao, como a de outra requisicao.
+            seen_during_rebuild.append('b' in revoked)
+            super().add(jti)
+
+    monkeypatch.setattr(token_denylist, 'BloomFilter', CheckingBloomFilter)
+    assert revoked.expire(now + 120) == 1
+    assert seen_during_rebuild == [True]
+    assert 'b' in revoked
+
+def test_expired_token_is_not_revoked_before_purge():
+    revoked = ExpiringSet(bucket_seconds=60)
+    revoked.add('a', time.time() - 1)
+    assert 'a' not in revoked
+    assert len(revoked) == 1
+
+def test_revocations_sync_between_workers(monkeypatch):
+    storage = memory_storage()
+    monkeypatch.setattr('server.src.services.token_denylist.get_storage', lambda: storage)
+    token = {"jti": "abc", "exp": time.time() + 600}
+    worker_a, worker_b = TokenDenylist(), TokenDenylist()
+
+    assert worker_a.revoke(token)
+    assert worker_a.is_revoked(token)
+    assert not worker_b.is_revoked(token)
+    assert worker_b.sync() == 1
+    assert worker_b.is_revoked(token)
+    assert not worker_b.is_revoked({"jti": "outro"})
+    assert not worker_a.revoke({"exp": time.time() + 600})
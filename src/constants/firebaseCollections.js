@@ -7,7 +7,10 @@ export const API_ENDPOINTS = {
   DASHBOARD: `${API_BASE_URL}/api/auth/dashboard`,
   LOGOUT: `${API_BASE_URL}/api/auth/logout`,
   REFRESH: `${API_BASE_URL}/api/auth/refresh`,
-  SALES_FINISH: `${API_BASE_URL}/api/sales/finish`
+  SALES_FINISH: `${API_BASE_URL}/api/sales/finish`,
+  REPORTS_SALES: `${API_BASE_URL}/api/reports/sales`,
+  REPORTS_PROFIT: `${API_BASE_URL}/api/reports/profit`,
+  REPORTS_TOP_PRODUCTS: `${API_BASE_URL}/api/reports/top-products`
 };
 
 export const FIRESTORE_COLLECTIONS = {
@@ -9,7 +9,7 @@ import { logger } from '../utils/logger';
 import QRCodeModal from '../components/modals/QRCodeModal';
 import ReceiptModal from '../components/modals/ReceiptModal';
 import LoadingPage from '../components/LoadingPage';
-import { pdvApiService } from '../services/pdvApiService';
+import { pdvApiService, RECEIPT_TOO_TALL } from '../services/pdvApiService';
 import { validators } from '../utils/validators';
 
 const PDVPage = ({ sweets, onNavigate, userData }) => {
@@ -265,6 +265,7 @@ const PDVPage = ({ sweets, onNavigate, userData }) => {
         }
 
         setIsProcessing(true);
+        let retryWithoutReceipt = false;
 
         try {
             const validation = salesService.validateSale(currentSaleDocument, safeSweets);
@@ -272,40 +273,27 @@ const PDVPage = ({ sweets, onNavigate, userData }) => {
                 throw new Error(validation.error);
             }
 
-            logger.info('Salvando venda no Firestore...');
-            const result = await salesService.finalizeSale(
+            logger.info('Registrando venda no servidor...', { withReceipt: shouldGenerateReceipt });
+            const apiResult = await pdvApiService.finishSale(
                 currentSaleDocument,
-                cart,
-                safeSweets,
-                userData
+                userData,
+                customerName,
+                paymentMethod,
+                { receipt: shouldGenerateReceipt }
             );
 
-            logger.info('Venda salva no Firestore', result);
+            logger.info('Venda registrada', { saleId: currentSaleDocument.id, transactionId: apiResult.transactionId });
 
-            if (shouldGenerateReceipt) {
-                try {
-                    logger.info('Gerando comprovante PDF...');
-                    await pdvApiService.finishSale(
-                        currentSaleDocument, 
-                        userData, 
-                        customerName,
-                        paymentMethod
-                    );
-                    toast.success(
-                        'Venda concluída com comprovante!',
-                        `Total: R$ ${orderTotal.toFixed(2).replace('.', ',')} - ${paymentMethod}`
-                    );
-                } catch (pdfError) {
-                    logger.warn('Falha ao gerar PDF', { 
-                        error: pdfError.message,
-                        venda_salva: true 
-                    });
-                    
-                    toast.warning(
-                        'Venda salva, mas comprovante falhou',
-                        `Erro: ${pdfError.message}. Verifique se o backend Python está rodando na porta 3001.`
-                    );
-                }
+            if (apiResult.receiptFailed) {
+                toast.warning(
+                    'Venda salva, comprovante falhou',
+                    `Reimprima o comprovante da transação ${apiResult.transactionId}`
+                );
+            } else if (shouldGenerateReceipt) {
+                toast.success(
+                    'Venda concluída com comprovante!',
+                    `Total: R$ ${orderTotal.toFixed(2).replace('.', ',')} - ${paymentMethod}`
+                );
             } else {
                 toast.success(`Venda concluída sem comprovante - ${paymentMethod}`);
             }
@@ -318,14 +306,29 @@ const PDVPage = ({ sweets, onNavigate, userData }) => {
             setPaymentMethod('PIX');
 
         } catch (error) {
-            logger.error('Erro ao finalizar venda', { error: error.message });
-            toast.error(
-                'Falha ao processar venda',
-                error.message || 'Tente novamente'
-            );
+            if (error.code === RECEIPT_TOO_TALL && shouldGenerateReceipt) {
+                setIsProcessing(false);
+                const result = await toast.confirm(
+                    'Comprovante muito longo',
+                    'O comprovante excede o tamanho máximo. Finalizar a venda sem comprovante?',
+                    'Finalizar sem comprovante',
+                    'Cancelar'
+                );
+                retryWithoutReceipt = result.isConfirmed;
+            } else {
+                logger.error('Erro ao finalizar venda', { error: error.message });
+                toast.error(
+                    'Falha ao processar venda',
+                    error.message || 'Tente novamente'
+                );
+            }
         } finally {
             setIsProcessing(false);
         }
+
+        if (retryWithoutReceipt) {
+            await handleFinalizeAndReceipt(false);
+        }
     };
 
     const handleCancelSale = () => {
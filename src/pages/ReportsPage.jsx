@@ -1,7 +1,8 @@
-import React, { useState, useMemo } from 'react'
+import React, { useState, useMemo, useEffect } from 'react'
 import { useFirestore } from '../hooks/useFirestore'
 import { FIRESTORE_COLLECTIONS } from '../constants/firebaseCollections'
 import { reportsService } from '../services/reportsService'
+import { reportsApiService } from '../services/reportsApiService'
 import { motion, AnimatePresence } from 'framer-motion'
 
 const ReportsPage = ({ sweetsExternal, salesExternal, ingredientsExternal, recipesExternal }) => {
@@ -16,9 +17,22 @@ const ReportsPage = ({ sweetsExternal, salesExternal, ingredientsExternal, recip
   const [stockThreshold, setStockThreshold] = useState(5)
   const [topLimit, setTopLimit] = useState(10)
 
-  const salesPeriod = useMemo(()=>reportsService.salesByPeriod(sales, periodType, startDate, endDate),[sales, periodType, startDate, endDate])
-  const profitPeriod = useMemo(()=>reportsService.profitMarginByPeriod(sales, periodType, startDate, endDate),[sales, periodType, startDate, endDate])
-  const topProducts = useMemo(()=>reportsService.topSellingProducts(sales, sweets, topLimit, startDate, endDate),[sales, sweets, topLimit, startDate, endDate])
+  const [serverReports, setServerReports] = useState(null)
+
+  useEffect(() => {
+    let cancelled = false
+    reportsApiService.fetchReports({ periodType, startDate, endDate, topLimit })
+      .then(result => { if (!cancelled) setServerReports(result) })
+      .catch(() => { if (!cancelled) setServerReports(null) })
+    return () => { cancelled = true }
+  }, [periodType, startDate, endDate, topLimit])
+
+  // Vendas anteriores aos rollups do servidor não aparecem neles: sem resultado, calcular localmente.
+  const serverOrLocal = (rows, computeLocal) => (rows && rows.length ? rows : computeLocal())
+
+  const salesPeriod = useMemo(()=>serverOrLocal(serverReports?.salesPeriod, ()=>reportsService.salesByPeriod(sales, periodType, startDate, endDate)),[serverReports, sales, periodType, startDate, endDate])
+  const profitPeriod = useMemo(()=>serverOrLocal(serverReports?.profitPeriod, ()=>reportsService.profitMarginByPeriod(sales, periodType, startDate, endDate)),[serverReports, sales, periodType, startDate, endDate])
+  const topProducts = useMemo(()=>serverOrLocal(serverReports?.topProducts, ()=>reportsService.topSellingProducts(sales, sweets, topLimit, startDate, endDate)),[serverReports, sales, sweets, topLimit, startDate, endDate])
   const lowStock = useMemo(()=>reportsService.lowStockAlerts(sweets, stockThreshold),[sweets, stockThreshold])
 
   const exportSalesPDF = () => reportsService.exportPDFReport('Vendas Por Periodo', [
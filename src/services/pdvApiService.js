@@ -1,8 +1,10 @@
 import { API_ENDPOINTS } from '../constants/firebaseCollections';
 import { logger } from '../utils/logger';
 
+export const RECEIPT_TOO_TALL = 'RECEIPT_TOO_TALL';
+
 export const pdvApiService = {
-  finishSale: async (saleDocument, userData, customerName, paymentMethod) => {
+  finishSale: async (saleDocument, userData, customerName, paymentMethod, { receipt = true } = {}) => {
     try {
       if (!saleDocument) {
         throw new Error('Sale document is required');
@@ -23,7 +25,9 @@ export const pdvApiService = {
         globalDiscountPercent: saleDocument.globalDiscountPercent,
         globalDiscountAmount: saleDocument.globalDiscountAmount,
         totalAmount: saleDocument.totalAmount,
-        description: `Venda ${saleDocument.id}`
+        description: `Venda ${saleDocument.id}`,
+        saleId: saleDocument.id,
+        receipt
       };
 
       logger.info('Sending sale to API', { saleId: saleDocument.id, paymentMethod, hasToken: !!token });
@@ -32,7 +36,8 @@ export const pdvApiService = {
         method: 'POST',
         headers: {
           'Content-Type': 'application/json',
-          'Authorization': `Bearer ${token}`
+          'Authorization': `Bearer ${token}`,
+          'Idempotency-Key': saleDocument.id
         },
         body: JSON.stringify(payload),
         credentials: 'include'
@@ -40,6 +45,13 @@ export const pdvApiService = {
 
       logger.info('API Response status', { status: response.status, statusText: response.statusText });
 
+      if (response.status === 422) {
+        const errorData = await response.json().catch(() => ({}));
+        const error = new Error(errorData.msg || 'Comprovante excede altura maxima');
+        error.code = RECEIPT_TOO_TALL;
+        throw error;
+      }
+
       if (!response.ok) {
         let errorMessage = 'Falha ao processar venda no servidor';
         try {
@@ -52,6 +64,21 @@ export const pdvApiService = {
         throw new Error(errorMessage);
       }
 
+      const transactionId = response.headers.get('X-Transaction-Id');
+
+      if (!receipt) {
+        logger.info('Sale processed without receipt', { saleId: saleDocument.id, transactionId });
+        return { success: true, transactionId };
+      }
+
+      // Venda gravada, mas o servidor não conseguiu gerar o PDF: a resposta é JSON, não o comprovante.
+      const contentType = response.headers.get('Content-Type') || '';
+      if (response.headers.get('X-Receipt-Status') === 'failed' || contentType.includes('application/json')) {
+        const data = await response.json().catch(() => ({}));
+        logger.warn('Sale stored but receipt failed', { saleId: saleDocument.id, transactionId });
+        return { success: true, transactionId: transactionId || data.transaction_id, receiptFailed: true };
+      }
+
       const blob = await response.blob();
       const url = window.URL.createObjectURL(blob);
       const link = document.createElement('a');
@@ -62,8 +89,8 @@ export const pdvApiService = {
       document.body.removeChild(link);
       window.URL.revokeObjectURL(url);
 
-      logger.info('Sale processed and receipt downloaded', { saleId: saleDocument.id });
-      return { success: true };
+      logger.info('Sale processed and receipt downloaded', { saleId: saleDocument.id, transactionId });
+      return { success: true, transactionId };
     } catch (error) {
       logger.error('Error finishing sale', { error: error.message });
       throw error;
@@ -0,0 +1,46 @@
+import { API_ENDPOINTS } from '../constants/firebaseCollections';
+import { logger } from '../utils/logger';
+
+const fetchReport = async (url, params) => {
+  const token = sessionStorage.getItem('jwt_token');
+  if (!token) {
+    throw new Error('JWT token not found. User may not be authenticated.');
+  }
+
+  const query = new URLSearchParams(
+    Object.entries(params).filter(([, value]) => value !== undefined && value !== null && value !== '')
+  );
+
+  const response = await fetch(`${url}?${query.toString()}`, {
+    headers: { 'Authorization': `Bearer ${token}` },
+    credentials: 'include'
+  });
+
+  if (!response.ok) {
+    throw new Error(`Falha ao carregar relatorio (${response.status})`);
+  }
+  return response.json();
+};
+
+export const reportsApiService = {
+  fetchReports: async ({ periodType, startDate, endDate, topLimit }) => {
+    try {
+      const filters = { period: periodType, start_date: startDate, end_date: endDate };
+      const [salesData, profitData, topData] = await Promise.all([
+        fetchReport(API_ENDPOINTS.REPORTS_SALES, filters),
+        fetchReport(API_ENDPOINTS.REPORTS_PROFIT, filters),
+        fetchReport(API_ENDPOINTS.REPORTS_TOP_PRODUCTS, { ...filters, limit: topLimit })
+      ]);
+
+      logger.info('Reports loaded from API', { periodType, periods: salesData.periods.length });
+      return {
+        salesPeriod: salesData.periods,
+        profitPeriod: profitData.periods,
+        topProducts: topData.products
+      };
+    } catch (error) {
+      logger.warn('Error loading reports from API', { error: error.message });
+      throw error;
+    }
+  }
+};
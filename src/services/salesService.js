@@ -1,7 +1,5 @@
 import { logger } from '../utils/logger';
 import { costCalculationService } from './costCalculationService';
-import { firestoreService } from './firestoreService';
-import { FIRESTORE_COLLECTIONS } from '../constants/firebaseCollections';
 
 export const salesService = {
   createSaleDocument: (cart, sweets, recipes, ingredients, userData, saleOptions) => {
@@ -30,7 +28,7 @@ export const salesService = {
       const itemDiscountsTotal = items.reduce((sum, item) => sum + item.discountedAmount, 0);
       const subtotal = items.reduce((sum, item) => sum + item.subtotal, 0);
       const globalDiscountPercent = saleOptions?.discountPercent || 0;
-      const globalDiscountAmount = subtotal * (globalDiscountPercent / 100);
+      const globalDiscountAmount = (subtotal - itemDiscountsTotal) * (globalDiscountPercent / 100);
       const totalAmount = saleOptions?.orderTotal || (subtotal - itemDiscountsTotal - globalDiscountAmount);
 
       const totalCost = items.reduce((sum, item) => sum + item.costTotal, 0);
@@ -86,47 +84,5 @@ export const salesService = {
       logger.error('Error validating sale', { error: error.message });
       return { isValid: false, error: error.message };
     }
-  },
-
-  finalizeSale: async (saleDocument, cart, sweets, userData) => {
-    try {
-      const updatePromises = [];
-
-      for (const item of cart) {
-        const sweet = sweets.find(s => s.id === item.id);
-        if (sweet) {
-          const newStock = Math.max(0, sweet.stock - item.quantity);
-          updatePromises.push(
-            firestoreService.updateDocument(
-              FIRESTORE_COLLECTIONS.SWEETS,
-              item.id,
-              { stock: newStock },
-              userData?.id || 'anonymous'
-            )
-          );
-        }
-      }
-
-      const saleData = {
-        ...saleDocument,
-        status: 'completed'
-      };
-
-      updatePromises.push(
-        firestoreService.addDocument(
-          FIRESTORE_COLLECTIONS.SALES,
-          saleData,
-          userData?.id || 'anonymous'
-        )
-      );
-
-      const results = await Promise.all(updatePromises);
-      logger.info('Sale finalized successfully', { saleId: saleDocument.id });
-      
-      return { success: true, saleId: saleDocument.id };
-    } catch (error) {
-      logger.error('Error finalizing sale', { error: error.message });
-      throw error;
-    }
   }
 };